@@ -1,6 +1,65 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
 from .models import User, Quiz, Question, QuizAttempt, StudentAnswer
+from . import answer_store
+
+# Below this many rows an exact COUNT(*) is cheap enough
+ESTIMATE_THRESHOLD = 10000
+
+
+def estimated_count(queryset):
+    """Row estimate from the planner statistics for an unfiltered queryset, or None"""
+    # The default manager's own filter (is_deleted=False) still counts as
+    # unfiltered: flagged rows are few and only wait for background deletion
+    unfiltered = queryset.model._default_manager.get_queryset().query.where
+    if queryset.query.where != unfiltered or queryset.query.distinct:
+        return None
+    table = queryset.model._meta.db_table
+    connection = connections[queryset.db]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            elif connection.vendor == 'sqlite':
+                # Filled in by ANALYZE (see run_maintenance); the first number is the row count
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        # No statistics table yet
+        return None
+    if row is None or row[0] is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= ESTIMATE_THRESHOLD else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Uses the planner's row estimate instead of COUNT(*) on large unfiltered changelists"""
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        return estimate if estimate is not None else super().count
+
+
+class RecentQuizFilter(admin.SimpleListFilter):
+    """Quiz filter that lists only the most recent quizzes instead of every one"""
+    title = 'quiz'
+    parameter_name = 'quiz'
+    limit = 20
+
+    def lookups(self, request, model_admin):
+        return list(Quiz.objects.order_by('-created_at').values_list('id', 'title')[:self.limit])
+
+    def queryset(self, request, queryset):
+        if self.value() and self.value().isdigit():
+            return queryset.filter(quiz_id=self.value())
+        return queryset
 
 
 @admin.register(User)
@@ -20,8 +79,10 @@ class CustomUserAdmin(UserAdmin):
 
 @admin.register(Quiz)
 class QuizAdmin(admin.ModelAdmin):
-    list_display = ['title', 'created_by', 'time_limit', 'is_active', 'created_at']
+    list_display = ['title', 'created_by', 'time_limit', 'is_active', 'start_time', 'created_at']
+    list_select_related = ['created_by']
     list_filter = ['is_active', 'created_at']
+    autocomplete_fields = ['created_by']
     search_fields = ['title', 'description']
     date_hierarchy = 'created_at'
 
@@ -29,20 +90,46 @@ class QuizAdmin(admin.ModelAdmin):
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
     list_display = ['quiz', 'question_text', 'correct_answer', 'marks', 'order']
-    list_filter = ['quiz', 'correct_answer']
+    list_select_related = ['quiz']
+    list_filter = [RecentQuizFilter, 'correct_answer']
     search_fields = ['question_text']
+    autocomplete_fields = ['quiz']
 
 
 @admin.register(QuizAttempt)
 class QuizAttemptAdmin(admin.ModelAdmin):
     list_display = ['student', 'quiz', 'score', 'total_marks', 'is_completed', 'started_at']
-    list_filter = ['is_completed', 'quiz', 'started_at']
-    search_fields = ['student__username', 'quiz__title']
-    date_hierarchy = 'started_at'
+    list_select_related = ['student', 'quiz']
+    list_filter = ['is_completed', RecentQuizFilter, 'started_at']
+    # Exact username matches use the unique index; quiz titles match by prefix
+    search_fields = ['student__username__exact', 'quiz__title__startswith']
+    autocomplete_fields = ['student', 'quiz']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['materialize_answer_rows']
+    
+    def get_queryset(self, request):
+        # The frozen result is only needed when one attempt is opened
+        return super().get_queryset(request).defer('result_snapshot')
+    
+    @admin.action(description='Create answer rows for drill-down')
+    def materialize_answer_rows(self, request, queryset):
+        # Attempts stored only as packed vectors get their StudentAnswer rows
+        created = sum(answer_store.materialize_rows(attempt) for attempt in queryset)
+        self.message_user(request, f'Created {created} answer rows.')
 
 
 @admin.register(StudentAnswer)
 class StudentAnswerAdmin(admin.ModelAdmin):
     list_display = ['attempt', 'question', 'selected_answer', 'is_correct']
+    # attempt and question are printed with their student, quiz and quiz title
+    list_select_related = ['attempt__student', 'attempt__quiz', 'question__quiz']
     list_filter = ['is_correct', 'selected_answer']
-    search_fields = ['attempt__student__username', 'question__question_text']
+    search_fields = ['attempt__student__username__exact']
+    autocomplete_fields = ['attempt', 'question']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
+    def get_queryset(self, request):
+        # select_related would otherwise pull every attempt's frozen result
+        return super().get_queryset(request).defer('attempt__result_snapshot')
@@ -0,0 +1,145 @@
+"""
+Scheduled start windows and exam-start admission control.
+
+A quiz with a start_time accepts no new attempts before it, and one with an
+end_time none after it. Around the start, new attempts are let in at most
+ADMISSION_RATE per second: each student who has no attempt yet reserves the
+first one-second slot that still has room, counted with ``cache.incr`` in
+``admission:<quiz>:<second>``. Students whose slot is now go straight in.
+The others get a signed ticket cookie holding their slot and are sent to the
+waiting room, a countdown page that is the same for every student of a quiz,
+cached once rendered, and that returns them to take_quiz when their slot
+comes. Nothing polls the server meanwhile, and students who already have an
+attempt (a reload mid-exam) are never queued.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import redirect
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from . import exam_cache
+from . import singleflight
+
+TICKET_SALT = 'quiz.admission'
+# Slot counters are kept this long after their second has passed
+SLOT_TIMEOUT = 60
+WAITING_PAGE_TIMEOUT = 60
+
+
+def enabled():
+    return getattr(settings, 'ADMISSION_CONTROL', True)
+
+
+def is_closed(quiz):
+    return quiz.end_time is not None and timezone.now() >= quiz.end_time
+
+
+def _slot_key(quiz_id, second):
+    return f'admission:{quiz_id}:{second}'
+
+
+def _hint_key(quiz_id):
+    return f'admission:{quiz_id}:next'
+
+
+def _waiting_page_key(quiz_id):
+    return f'quiz:waiting:{quiz_id}'
+
+
+def _render_waiting_page(quiz):
+    return render_to_string('quiz/waiting_room.html', {'quiz': quiz})
+
+
+def render_waiting_page(quiz):
+    html = _render_waiting_page(quiz)
+    singleflight.put(_waiting_page_key(quiz.id), html, WAITING_PAGE_TIMEOUT)
+    return html
+
+
+def get_waiting_page(quiz_id):
+    """The rendered waiting room of an active quiz, or None"""
+    def render_page():
+        quiz = exam_cache.get_quiz(quiz_id)
+        if quiz is None or not quiz.is_active:
+            return None
+        return _render_waiting_page(quiz)
+
+    return singleflight.get_or_compute(
+        _waiting_page_key(quiz_id), render_page, WAITING_PAGE_TIMEOUT, name='waiting_room',
+    )
+
+
+def _first_second(quiz, now):
+    if quiz.start_time is not None:
+        return max(int(now), int(quiz.start_time.timestamp()))
+    return int(now)
+
+
+def reserve_slot(quiz, now=None):
+    """Reserve a place in the first second with room left; returns that second as a timestamp"""
+    now = time.time() if now is None else now
+    rate = settings.ADMISSION_RATE
+    # Full seconds are skipped using a hint left by earlier arrivals; it is
+    # only a starting point, so a stale or lost hint costs a few extra incr()s
+    second = max(_first_second(quiz, now), cache.get(_hint_key(quiz.id)) or 0)
+    while True:
+        key = _slot_key(quiz.id, second)
+        timeout = int(second - now) + SLOT_TIMEOUT
+        cache.add(key, 0, timeout)
+        try:
+            taken = cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.set(key, 1, timeout)
+            taken = 1
+        if taken <= rate:
+            return second
+        cache.set(_hint_key(quiz.id), second + 1, timeout)
+        second += 1
+
+
+def _ticket_cookie(quiz_id):
+    return f'admission_{quiz_id}'
+
+
+def _read_ticket(request, quiz):
+    value = request.get_signed_cookie(
+        _ticket_cookie(quiz.id), default=None, salt=TICKET_SALT, max_age=settings.ADMISSION_TICKET_MAX_AGE,
+    )
+    if not value:
+        return None
+    user_id, _, second = value.partition(':')
+    if user_id != str(request.user.id) or not second.isdigit():
+        return None
+    return int(second)
+
+
+def admit(request, quiz):
+    """
+    None if the student may start the quiz now, otherwise a redirect to the
+    waiting room that carries their ticket.
+    """
+    now = time.time()
+    ticket = _read_ticket(request, quiz)
+    if ticket is None:
+        if enabled():
+            ticket = reserve_slot(quiz, now)
+        else:
+            # Without admission control only the start time holds students back
+            ticket = _first_second(quiz, now)
+    if ticket <= now:
+        return None
+
+    wait = math.ceil(ticket - now)
+    response = redirect(f'{reverse("waiting_room", args=[quiz.id])}?wait={wait}')
+    response.set_signed_cookie(
+        _ticket_cookie(quiz.id), f'{request.user.id}:{ticket}', salt=TICKET_SALT,
+        max_age=settings.ADMISSION_TICKET_MAX_AGE, path=reverse('take_quiz', args=[quiz.id]),
+        secure=settings.SESSION_COOKIE_SECURE, httponly=True, samesite='Lax',
+    )
+    return response
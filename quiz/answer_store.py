@@ -0,0 +1,105 @@
+"""
+Packed answer storage.
+
+Every graded attempt keeps its answers on the QuizAttempt row itself:
+``answer_vector`` holds one character per question, aligned to
+``question_order`` ('A'-'D', or '-' when unanswered), and
+``correct_bitmap`` has bit i set when question i was answered correctly.
+That is one row update per submission instead of one StudentAnswer row per
+question.
+
+With ANSWER_STORAGE = 'rows' the StudentAnswer rows are written as well.
+With 'packed' they are skipped, and materialize_rows() creates them on
+demand for admin drill-down.
+"""
+from django.conf import settings
+
+from .models import Question, StudentAnswer
+
+UNANSWERED = '-'
+
+
+def store_rows():
+    return getattr(settings, 'ANSWER_STORAGE', 'rows') == 'rows'
+
+
+def pack(answers):
+    """(answer_vector, correct_bitmap) for StudentAnswer objects in question order"""
+    vector = ''.join(answer.selected_answer or UNANSWERED for answer in answers)
+    bitmap = bytearray((len(vector) + 7) // 8)
+    for index, answer in enumerate(answers):
+        if answer.is_correct:
+            bitmap[index // 8] |= 1 << (index % 8)
+    return vector, bytes(bitmap)
+
+
+def apply(attempt, answers):
+    """Store the packed answers on the attempt, realigning question_order to the graded questions"""
+    attempt.question_order = ','.join(str(answer.question_id) for answer in answers)
+    attempt.answer_vector, attempt.correct_bitmap = pack(answers)
+
+
+def has_packed(attempt):
+    return attempt.answer_vector is not None and attempt.question_order is not None
+
+
+def unpack(attempt):
+    """Yield (question_id, selected_answer, is_correct) from the packed form"""
+    if not attempt.answer_vector:
+        return
+    question_ids = [int(qid) for qid in attempt.question_order.split(',')]
+    bitmap = bytes(attempt.correct_bitmap or b'')
+    for index, (question_id, selected) in enumerate(zip(question_ids, attempt.answer_vector)):
+        is_correct = index // 8 < len(bitmap) and bool(bitmap[index // 8] >> (index % 8) & 1)
+        yield question_id, (None if selected == UNANSWERED else selected), is_correct
+
+
+def build_answers(attempt):
+    """Unsaved StudentAnswer objects (with questions loaded) from the packed form"""
+    rows = list(unpack(attempt))
+    questions = Question.objects.in_bulk([question_id for question_id, _, _ in rows])
+    return [
+        StudentAnswer(
+            attempt=attempt, question=questions[question_id],
+            selected_answer=selected, is_correct=is_correct,
+        )
+        for question_id, selected, is_correct in rows
+        # Deleted questions are skipped
+        if question_id in questions
+    ]
+
+
+def materialize_rows(attempt):
+    """Create the StudentAnswer rows of a packed attempt; returns how many were added"""
+    if not has_packed(attempt) or StudentAnswer.objects.filter(attempt=attempt).exists():
+        return 0
+    return len(StudentAnswer.objects.bulk_create(build_answers(attempt), ignore_conflicts=True))
+
+
+def answer_matrix(quiz, attempts):
+    """
+    The answer each attempt gave to each question, in the quiz's own
+    question order: (questions, [(attempt, [letter, ...]), ...]).
+
+    Packed attempts need no extra query; older attempts without a vector are
+    read from their StudentAnswer rows in one query.
+    """
+    questions = list(Question.objects.filter(quiz=quiz).order_by('order', 'id'))
+    attempts = list(attempts)
+
+    unpacked_ids = [attempt.id for attempt in attempts if not has_packed(attempt)]
+    row_answers = {}
+    if unpacked_ids:
+        for attempt_id, question_id, selected in StudentAnswer.objects.filter(
+            attempt_id__in=unpacked_ids
+        ).values_list('attempt_id', 'question_id', 'selected_answer'):
+            row_answers.setdefault(attempt_id, {})[question_id] = selected
+
+    matrix = []
+    for attempt in attempts:
+        if has_packed(attempt):
+            selected_by_question = {question_id: selected for question_id, selected, _ in unpack(attempt)}
+        else:
+            selected_by_question = row_answers.get(attempt.id, {})
+        matrix.append((attempt, [selected_by_question.get(question.id) or UNANSWERED for question in questions]))
+    return questions, matrix
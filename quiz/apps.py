@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class QuizConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quiz'
+
+    def ready(self):
+        # Connect the signal receivers and register the system checks
+        from . import checks, signals
@@ -0,0 +1,262 @@
+"""
+Async versions of the student exam views for ASGI deployments.
+
+They mirror student_dashboard, take_quiz, submit_quiz and quiz_result in
+views.py. quiz/urls.py routes to them when ASYNC_STUDENT_VIEWS is enabled.
+Everything the templates touch is loaded up front with the async ORM,
+so rendering never falls back to a blocking query.
+"""
+import random
+import time
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import Http404
+from django.db import transaction
+from django.shortcuts import render, redirect, aget_object_or_404
+from django.utils import timezone
+
+from .models import QuizAttempt, StudentAnswer
+from . import leaderboard
+from . import live
+from . import results
+from . import answer_store
+from . import admission
+from . import exam_cache
+from . import submissions
+from . import metrics
+from . import conditional
+from .conditional import conditional_page
+
+
+async def _get_user(request):
+    # Swap the lazy user for the loaded one so templates and messages never
+    # trigger a synchronous query
+    user = await request.auser()
+    request.user = user
+    return user
+
+
+async def _ordered_questions(attempt, version=None):
+    # Served from the per-quiz exam cache; only a cold cache queries
+    return await sync_to_async(exam_cache.ordered_questions)(attempt, version)
+
+
+@login_required
+async def student_dashboard(request):
+    user = await _get_user(request)
+    # Allow students and superusers (who aren't admins) to access student dashboard
+    if user.role != 'student' and not (user.is_superuser and user.role != 'admin'):
+        messages.error(request, 'Access denied')
+        return redirect('login')
+
+    # Attempted quizzes with scores
+    attempted_quizzes = [
+        attempt async for attempt in QuizAttempt.objects.filter(
+            student=user,
+            is_completed=True
+        ).select_related('quiz').defer('result_snapshot')
+    ]
+
+    # Available quizzes (open and not attempted); the open quiz list is
+    # shared by every student, so it comes from the cache
+    attempted_quiz_ids = {attempt.quiz_id for attempt in attempted_quizzes}
+    available_quizzes = [
+        quiz for quiz in await sync_to_async(exam_cache.get_open_quizzes)()
+        if quiz.id not in attempted_quiz_ids
+    ]
+
+    context = {
+        'available_quizzes': available_quizzes,
+        'attempted_quizzes': attempted_quizzes,
+    }
+
+    return render(request, 'quiz/student_dashboard.html', context)
+
+
+@login_required
+async def take_quiz(request, quiz_id):
+    user = await _get_user(request)
+    if user.role != 'student':
+        messages.error(request, 'Access denied')
+        return redirect('admin_dashboard')
+
+    quiz = await sync_to_async(exam_cache.get_quiz)(quiz_id)
+    if quiz is None or not quiz.is_active:
+        raise Http404('No Quiz matches the given query.')
+
+    # Check if student has already attempted this quiz
+    attempt = await QuizAttempt.objects.filter(student=user, quiz=quiz).defer('result_snapshot').afirst()
+    if attempt and attempt.is_completed:
+        messages.error(request, 'You have already attempted this quiz')
+        return redirect('student_dashboard')
+
+    if not attempt:
+        if admission.is_closed(quiz):
+            messages.error(request, 'This quiz is closed')
+            return redirect('student_dashboard')
+
+        # Before the start time, or while the exam-start rush is being let in,
+        # wait for an admission slot
+        waiting = await sync_to_async(admission.admit)(request, quiz)
+        if waiting:
+            return waiting
+
+        questions = list(await sync_to_async(exam_cache.get_questions)(quiz.id, quiz.updated_at))
+        total_marks = sum(q.marks for q in questions)
+
+        # Shuffle questions for this student's attempt
+        random.shuffle(questions)
+
+        attempt = await QuizAttempt.objects.acreate(
+            student=user,
+            quiz=quiz,
+            total_marks=total_marks,
+            question_order=','.join(str(q.id) for q in questions)
+        )
+        metrics.ATTEMPTS_STARTED.inc()
+        live.publish_started(attempt)
+
+    context = {
+        'quiz': quiz,
+        'questions': await _ordered_questions(attempt, quiz.updated_at),
+        'attempt': attempt,
+    }
+
+    return render(request, 'quiz/take_quiz.html', context)
+
+
+@sync_to_async
+def _save_graded_attempt(attempt, answers):
+    """False if a concurrent submission completed the attempt first"""
+    # transaction.atomic() is sync-only, so the write runs in a worker thread
+    with transaction.atomic():
+        completed = QuizAttempt.objects.filter(id=attempt.id, is_completed=False).update(is_completed=True)
+        if not completed:
+            return False
+        if answer_store.store_rows():
+            StudentAnswer.objects.bulk_create(answers)
+        attempt.save()
+    leaderboard.record_attempt(attempt)
+    live.publish_submitted(attempt)
+    return True
+
+
+@login_required
+async def submit_quiz(request, attempt_id):
+    user = await _get_user(request)
+    if user.role != 'student':
+        messages.error(request, 'Access denied')
+        return redirect('admin_dashboard')
+
+    # Checked before the key is claimed, so a 404 never leaves a claim behind
+    attempt = await aget_object_or_404(QuizAttempt.objects.select_related('student'), id=attempt_id, student=user)
+
+    # A re-sent submission replays the first one's result; see quiz/submissions.py
+    submission_key = None
+    if request.method == 'POST':
+        submission_key = submissions.clean_key(request.POST.get('submission_key'))
+    if submission_key and not await sync_to_async(submissions.claim)(attempt_id, submission_key):
+        result = await sync_to_async(submissions.wait_for_result)(attempt_id, submission_key)
+        if result:
+            messages.success(request, f'Quiz submitted successfully! Your score: {result["score"]}/{result["total_marks"]}')
+            return redirect('quiz_result', attempt_id=result['attempt_id'])
+        # The first request failed or is stuck; carry on without the key
+        submission_key = None
+
+    if attempt.is_completed:
+        if submission_key:
+            await sync_to_async(submissions.release)(attempt_id, submission_key)
+        messages.error(request, 'This quiz has already been submitted')
+        return redirect('student_dashboard')
+
+    if request.method != 'POST':
+        return redirect('take_quiz', quiz_id=attempt.quiz_id)
+
+    grading_started = time.perf_counter()
+    try:
+        score = 0
+        answers = []
+        for question in await _ordered_questions(attempt):
+            # Unanswered questions are stored as None
+            selected_answer = request.POST.get(f'question_{question.id}') or None
+
+            is_correct = selected_answer is not None and selected_answer == question.correct_answer
+            if is_correct:
+                score += question.marks
+
+            answers.append(StudentAnswer(
+                attempt=attempt,
+                question=question,
+                selected_answer=selected_answer,
+                is_correct=is_correct
+            ))
+
+        attempt.score = score
+        attempt.is_completed = True
+        attempt.completed_at = timezone.now()
+        attempt.result_snapshot = results.build_snapshot(answers)
+        answer_store.apply(attempt, answers)
+        completed = await _save_graded_attempt(attempt, answers)
+    except Exception:
+        # Let a retry with the same key grade again
+        if submission_key:
+            await sync_to_async(submissions.release)(attempt_id, submission_key)
+        raise
+    if not completed:
+        if submission_key:
+            await sync_to_async(submissions.release)(attempt_id, submission_key)
+        messages.error(request, 'This quiz has already been submitted')
+        return redirect('student_dashboard')
+    if submission_key:
+        await sync_to_async(submissions.record_result)(attempt_id, submission_key, attempt)
+    metrics.SUBMISSIONS_GRADED.inc()
+    metrics.GRADING_SECONDS.observe(time.perf_counter() - grading_started)
+
+    messages.success(request, f'Quiz submitted successfully! Your score: {score}/{attempt.total_marks}')
+    return redirect('quiz_result', attempt_id=attempt.id)
+
+
+@login_required
+@conditional_page(conditional.quiz_result_etag, conditional.quiz_result_last_modified)
+async def quiz_result(request, attempt_id):
+    user = await _get_user(request)
+    # Allow both students (for their own results) and admins (for viewing student results)
+    attempt = await aget_object_or_404(QuizAttempt.objects.select_related('quiz', 'student'), id=attempt_id)
+
+    # Check access permissions
+    if user.role == 'student':
+        # Students can only view their own results
+        if attempt.student_id != user.id:
+            messages.error(request, 'Access denied')
+            return redirect('student_dashboard')
+    elif user.role != 'admin' and not user.is_superuser:
+        messages.error(request, 'Access denied')
+        return redirect('login')
+
+    if not attempt.is_completed:
+        messages.error(request, 'Quiz not yet completed')
+        if user.role == 'student':
+            return redirect('take_quiz', quiz_id=attempt.quiz_id)
+        return redirect('admin_dashboard')
+
+    # Answers and counts come from the snapshot frozen at grading time
+    snapshot = await sync_to_async(results.get_snapshot)(attempt)
+
+    # Rank comes from the cached per-quiz leaderboard
+    rank, ranked_count = await sync_to_async(leaderboard.get_rank)(attempt)
+
+    context = {
+        'attempt': attempt,
+        'answers': snapshot['answers'],
+        'correct_count': snapshot['correct_count'],
+        'wrong_count': snapshot['wrong_count'],
+        'unanswered_count': snapshot['unanswered_count'],
+        'total_questions': snapshot['total_questions'],
+        'rank': rank,
+        'ranked_count': ranked_count,
+        'leaderboard': await sync_to_async(leaderboard.get_leaderboard)(attempt.quiz_id),
+    }
+
+    return render(request, 'quiz/quiz_result.html', context)
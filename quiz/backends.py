@@ -0,0 +1,94 @@
+"""
+Authentication backend that loads request.user from the cache.
+
+AuthenticationMiddleware looks the session's user up on every request. With
+CachedModelBackend that lookup reads a slim record from the cache: the
+fields pages use (username, role, is_superuser, is_active, profile details)
+and the session auth hash, which stands in for the password hash when the
+session is verified. The user is rebuilt with the other fields deferred, so
+reading one of them, or saving the user, still works; it just costs a query.
+
+signals.py drops a user's record when the user is saved or deleted, and
+deletion.mark_student_deleted when it flags a student. A password change
+therefore also changes the cached hash, and sessions made with the old
+password end as they would without the cache. The record layout is
+versioned in the key, so a deploy that changes it never reads old records.
+
+Those deletes only reach every worker through a shared cache. With the
+local-memory cache the backend reads the database like ModelBackend, so a
+user deactivated in one process is signed out in all of them.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import router, transaction
+
+from .checks import cache_is_shared
+from . import metrics
+
+USER_RECORD_VERSION = 1
+USER_RECORD_FIELDS = (
+    'id', 'username', 'first_name', 'last_name', 'email', 'role', 'phone',
+    'roll_number', 'branch', 'date_joined', 'is_superuser', 'is_staff', 'is_active',
+)
+
+
+def _cache_key(user_id):
+    return f'auth:user:v{USER_RECORD_VERSION}:{user_id}'
+
+
+def _record(user):
+    record = {name: getattr(user, name) for name in USER_RECORD_FIELDS}
+    record['session_auth_hash'] = user.get_session_auth_hash()
+    return record
+
+
+def _from_record(record):
+    UserModel = get_user_model()
+    # from_db() wants the loaded fields in model order; the rest are deferred
+    names = [field.attname for field in UserModel._meta.concrete_fields if field.attname in record]
+    user = UserModel.from_db(router.db_for_read(UserModel), names, [record[name] for name in names])
+    user.cached_session_auth_hash = record['session_auth_hash']
+    return user
+
+
+def invalidate(user_id):
+    cache.delete(_cache_key(user_id))
+    # A request that read the old row before the write committed could put
+    # it back, so drop it again once the write is visible
+    transaction.on_commit(lambda: cache.delete(_cache_key(user_id)))
+
+
+class CachedModelBackend(ModelBackend):
+    def _cached_user(self, record):
+        user = _from_record(record)
+        return user if self.user_can_authenticate(user) else None
+
+    def get_user(self, user_id):
+        if not cache_is_shared():
+            return super().get_user(user_id)
+        key = _cache_key(user_id)
+        record = cache.get(key)
+        metrics.record_cache('auth_user', record is not None)
+        if record is not None:
+            return self._cached_user(record)
+        user = super().get_user(user_id)
+        if user is not None:
+            cache.set(key, _record(user), settings.USER_CACHE_TIMEOUT)
+        return user
+
+    async def aget_user(self, user_id):
+        # ModelBackend.aget_user queries directly, so the async views
+        # (request.auser()) need their own copy of the above
+        if not cache_is_shared():
+            return await super().aget_user(user_id)
+        key = _cache_key(user_id)
+        record = await cache.aget(key)
+        metrics.record_cache('auth_user', record is not None)
+        if record is not None:
+            return self._cached_user(record)
+        user = await super().aget_user(user_id)
+        if user is not None:
+            await cache.aset(key, _record(user), settings.USER_CACHE_TIMEOUT)
+        return user
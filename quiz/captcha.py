@@ -0,0 +1,67 @@
+"""
+Login page captcha.
+
+In the default "signed" mode the challenge travels with the form as a
+signed, time-limited token holding a random nonce and an HMAC of the code,
+so showing the login page creates no session row. Each token is accepted
+once: its nonce is recorded in the cache until the token expires, and a
+replayed token is rejected. The "session" mode keeps the code in the
+session as before.
+"""
+import secrets
+import string
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+CAPTCHA_CHARS = string.ascii_lowercase + string.digits
+CAPTCHA_LENGTH = 6
+TOKEN_SALT = 'quiz.captcha'
+
+
+def signed_mode():
+    return getattr(settings, 'CAPTCHA_MODE', 'signed') == 'signed'
+
+
+def _max_age():
+    return getattr(settings, 'CAPTCHA_MAX_AGE', 600)
+
+
+def _digest(nonce, code):
+    return salted_hmac(TOKEN_SALT, f'{nonce}:{code}').hexdigest()
+
+
+def new_challenge(request):
+    """Return (code, token) for a new random 6-character captcha"""
+    code = ''.join(secrets.choice(CAPTCHA_CHARS) for _ in range(CAPTCHA_LENGTH))
+    if not signed_mode():
+        request.session['captcha'] = code
+        return code, ''
+    nonce = secrets.token_urlsafe(12)
+    token = signing.dumps({'n': nonce, 'h': _digest(nonce, code)}, salt=TOKEN_SALT, compress=True)
+    return code, token
+
+
+def retry_challenge(request):
+    """Challenge to show again after a POST that did not log in"""
+    if signed_mode():
+        # Signed tokens are single-use
+        return new_challenge(request)
+    return request.session.get('captcha', ''), ''
+
+
+def verify(request, answer):
+    if not signed_mode():
+        return answer == request.session.get('captcha')
+
+    try:
+        payload = signing.loads(request.POST.get('captcha_token', ''), salt=TOKEN_SALT, max_age=_max_age())
+    except signing.BadSignature:
+        # Also covers expired tokens
+        return False
+    # Whatever the answer, the token is spent
+    if not cache.add(f'captcha:used:{payload["n"]}', 1, _max_age()):
+        return False
+    return constant_time_compare(payload['h'], _digest(payload['n'], answer))
@@ -0,0 +1,42 @@
+"""
+System checks for settings that only hold up with a shared cache.
+
+Signal-driven invalidation (signals.py) deletes cache entries in the
+process that made the change. With the local-memory cache every worker has
+its own copy, so the other workers keep theirs until it expires.
+"""
+from django.conf import settings
+from django.core.checks import Warning, register
+
+PER_PROCESS_CACHES = {'django.core.cache.backends.locmem.LocMemCache'}
+
+
+def cache_is_shared():
+    """True if every worker process reads and writes the same default cache"""
+    return settings.CACHES['default']['BACKEND'] not in PER_PROCESS_CACHES
+
+
+@register()
+def check_exam_cache(app_configs, **kwargs):
+    if cache_is_shared():
+        return []
+    return [Warning(
+        'The default cache is local to each process.',
+        hint=(
+            'Cached quizzes and questions are checked against Quiz.updated_at on every '
+            'read, which costs a query; configure a shared cache (Redis, Memcached) in '
+            'CACHES so an edit reaches every worker without it.'
+        ),
+        id='quiz.W001',
+    )]
+
+
+@register()
+def check_user_cache(app_configs, **kwargs):
+    if cache_is_shared() or not getattr(settings, 'USER_CACHE', False):
+        return []
+    return [Warning(
+        'USER_CACHE is on but the default cache is local to each process.',
+        hint='request.user is read from the database until CACHES names a shared cache.',
+        id='quiz.W002',
+    )]
@@ -0,0 +1,225 @@
+"""
+ETag and Last-Modified validators for pages that only change on a write.
+
+Each validator reads only the few columns the page depends on, so a
+matching If-None-Match / If-Modified-Since is answered with 304 Not Modified
+before the view loads answers or builds a document. They return None when
+the request should not be short-circuited (wrong role, missing object,
+attempt not completed), and the view then handles it as usual.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import User, Quiz, Question, QuizAttempt
+from . import leaderboard
+
+
+def _is_admin(user):
+    return user.role == 'admin' or user.is_superuser
+
+
+def _etag(*parts):
+    return hashlib.md5('|'.join(str(part) for part in parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def _latest(*values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def conditional_page(etag_func, last_modified_func=None):
+    """
+    Like django.views.decorators.http.condition, for sync and async views.
+
+    Matching GET/HEAD requests get a 304 before the view runs; every response
+    carries the validators and asks the browser to revalidate.
+    """
+    def validators(request, args, kwargs):
+        etag = etag_func(request, *args, **kwargs)
+        last_modified = last_modified_func(request, *args, **kwargs) if last_modified_func else None
+        return (quote_etag(etag) if etag else None), last_modified
+
+    def not_modified(request, etag, last_modified):
+        if request.method not in ('GET', 'HEAD') or (etag is None and last_modified is None):
+            return None
+        # Pending flash messages have to be rendered, so run the view
+        if len(getattr(request, '_messages', ())):
+            return None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified.timestamp() if last_modified else None,
+        )
+        return response if response is not None and response.status_code == 304 else None
+
+    def finish(request, response, etag, last_modified):
+        # A page that showed flash messages must not be replayed from the browser cache
+        if getattr(getattr(request, '_messages', None), 'used', False):
+            return response
+        if request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+            if etag and not response.has_header('ETag'):
+                response.headers['ETag'] = etag
+            if last_modified and not response.has_header('Last-Modified'):
+                response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+            patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+        return response
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                if hasattr(request, 'auser'):
+                    # Reuse the user login_required already loaded
+                    request.user = await request.auser()
+                etag, last_modified = await sync_to_async(validators)(request, args, kwargs)
+                response = not_modified(request, etag, last_modified)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return finish(request, response, etag, last_modified)
+        else:
+            @wraps(view_func)
+            def _wrapped_view(request, *args, **kwargs):
+                etag, last_modified = validators(request, args, kwargs)
+                response = not_modified(request, etag, last_modified)
+                if response is None:
+                    response = view_func(request, *args, **kwargs)
+                return finish(request, response, etag, last_modified)
+        return _wrapped_view
+    return decorator
+
+
+# quiz_result
+
+def _completed_attempt(request, attempt_id):
+    # Shared by the ETag and Last-Modified validators of the same request
+    if not hasattr(request, '_completed_attempt'):
+        request._completed_attempt = _load_completed_attempt(request, attempt_id)
+    return request._completed_attempt
+
+
+def _load_completed_attempt(request, attempt_id):
+    attempt = QuizAttempt.objects.filter(id=attempt_id, is_completed=True).values(
+        'id', 'student_id', 'quiz_id', 'score', 'started_at', 'completed_at'
+    ).first()
+    if attempt is None:
+        return None
+    if request.user.role == 'student' and attempt['student_id'] != request.user.id:
+        return None
+    if request.user.role != 'student' and not _is_admin(request.user):
+        return None
+    return attempt
+
+
+def quiz_result_etag(request, attempt_id):
+    attempt = _completed_attempt(request, attempt_id)
+    if attempt is None:
+        return None
+    # The page also shows the attempt's rank and the leaderboard, which move
+    # when others submit and when the quiz is regraded
+    rank, ranked_count = leaderboard.get_rank(QuizAttempt(
+        quiz_id=attempt['quiz_id'], score=attempt['score'],
+        started_at=attempt['started_at'], completed_at=attempt['completed_at'],
+    ))
+    return _etag(
+        'result', attempt['id'], attempt['completed_at'].timestamp(), attempt['score'],
+        rank, ranked_count, leaderboard.get_leaderboard(attempt['quiz_id']), request.user.id,
+    )
+
+
+def quiz_result_last_modified(request, attempt_id):
+    attempt = _completed_attempt(request, attempt_id)
+    return attempt['completed_at'] if attempt else None
+
+
+# student_profile
+
+def _student_profile_state(request, student_id):
+    # Shared by the ETag and Last-Modified validators of the same request
+    if not hasattr(request, '_student_profile_state'):
+        request._student_profile_state = _load_student_profile_state(request, student_id)
+    return request._student_profile_state
+
+
+def _load_student_profile_state(request, student_id):
+    if not _is_admin(request.user):
+        return None
+    student = User.objects.filter(id=student_id, role='student').values(
+        'username', 'email', 'phone', 'roll_number', 'branch', 'date_joined'
+    ).first()
+    if student is None:
+        return None
+    attempts = QuizAttempt.objects.filter(student_id=student_id).aggregate(
+        count=Count('id'),
+        last_started=Max('started_at'),
+        last_completed=Max('completed_at'),
+        quiz_updated=Max('quiz__updated_at'),
+        total_score=Sum('score'),
+    )
+    return student, attempts
+
+
+def student_profile_etag(request, student_id):
+    state = _student_profile_state(request, student_id)
+    if state is None:
+        return None
+    student, attempts = state
+    return _etag('profile', student_id, sorted(student.items()), sorted(attempts.items()))
+
+
+def student_profile_last_modified(request, student_id):
+    state = _student_profile_state(request, student_id)
+    if state is None:
+        return None
+    student, attempts = state
+    return _latest(
+        student['date_joined'], attempts['last_started'],
+        attempts['last_completed'], attempts['quiz_updated'],
+    )
+
+
+# Exports
+
+def results_export_etag(request, quiz_id):
+    if not _is_admin(request.user):
+        return None
+    quiz_updated = Quiz.objects.filter(id=quiz_id).values_list('updated_at', flat=True).first()
+    if quiz_updated is None:
+        return None
+    # Aggregates only: a new, regraded or removed attempt moves one of these
+    attempts = QuizAttempt.objects.filter(quiz_id=quiz_id, is_completed=True).aggregate(
+        count=Count('id'), last_id=Max('id'), last_completed=Max('completed_at'), total_score=Sum('score'),
+    )
+    # The Answers sheet prints the answer key; one row per question, not per student
+    answer_key = Question.objects.filter(quiz_id=quiz_id).values_list(
+        'id', 'correct_answer', 'marks',
+    ).order_by('order', 'id')
+    return _etag(
+        'results', request.path, quiz_id, quiz_updated.timestamp(),
+        sorted(attempts.items()), list(answer_key),
+    )
+
+
+def questions_export_etag(request, quiz_id):
+    if not _is_admin(request.user):
+        return None
+    quiz_updated = Quiz.objects.filter(id=quiz_id).values_list('updated_at', flat=True).first()
+    if quiz_updated is None:
+        return None
+    # Questions have no timestamp, so the export is keyed on their content
+    questions = Question.objects.filter(quiz_id=quiz_id).values_list(
+        'id', 'question_text', 'option_a', 'option_b', 'option_c', 'option_d',
+        'correct_answer', 'marks', 'order',
+    ).order_by('order', 'id')
+    return _etag('questions', request.path, quiz_id, quiz_updated.timestamp(), list(questions))
+
+
+def students_export_etag(request):
+    if not _is_admin(request.user):
+        return None
+    # Students are added and removed through the app; details edited in the
+    # Django admin show up once the export is fetched without If-None-Match
+    students = User.objects.filter(role='student').aggregate(count=Count('id'), last_id=Max('id'))
+    return _etag('students', request.path, sorted(students.items()))
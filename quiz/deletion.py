@@ -0,0 +1,162 @@
+"""
+Background deletion of quizzes and students.
+
+Django's ``Model.delete()`` loads every dependent row into memory to run the
+cascade, which for a popular quiz means hundreds of thousands of
+StudentAnswer objects and long table locks. Here the view only flags the
+quiz or student (and its attempts, and a quiz's questions) with
+``is_deleted``, which hides them from the default managers at once. A worker thread then removes the dependents
+bottom-up (answers, attempts, questions, then the row itself) with plain
+``DELETE ... WHERE id IN (...)`` statements of DELETION_BATCH_SIZE rows.
+
+Progress is kept in the cache for the delete modals to show. Deletions cut
+short by a restart are finished by ``run_maintenance``.
+"""
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from .models import User, Quiz, Question, QuizAttempt, StudentAnswer
+from . import backends
+from . import leaderboard
+from . import exam_cache
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_TIMEOUT = 60 * 60  # 1 hour
+
+_jobs = queue.Queue()
+_worker_lock = threading.Lock()
+_worker = None
+
+
+def _progress_key(kind, pk):
+    return f'quiz:deletion:{kind}:{pk}'
+
+
+def get_progress(kind, pk):
+    return cache.get(_progress_key(kind, pk))
+
+
+def _set_progress(kind, pk, deleted, total, done=False):
+    cache.set(_progress_key(kind, pk), {
+        'deleted': deleted,
+        'total': total,
+        'percent': 100 if done else (round(deleted * 100 / total) if total else 0),
+        'done': done,
+    }, PROGRESS_TIMEOUT)
+
+
+def mark_quiz_deleted(quiz):
+    with transaction.atomic():
+        Quiz.all_objects.filter(pk=quiz.pk).update(is_deleted=True)
+        QuizAttempt.all_objects.filter(quiz_id=quiz.pk).update(is_deleted=True)
+        Question.all_objects.filter(quiz_id=quiz.pk).update(is_deleted=True)
+    leaderboard.invalidate(quiz.pk)
+    exam_cache.invalidate(quiz.pk)
+
+
+def mark_student_deleted(student):
+    quiz_ids = list(QuizAttempt.all_objects.filter(student_id=student.pk).values_list('quiz_id', flat=True))
+    with transaction.atomic():
+        # is_active also ends any session the student still has
+        User.all_objects.filter(pk=student.pk).update(is_deleted=True, is_active=False)
+        QuizAttempt.all_objects.filter(student_id=student.pk).update(is_deleted=True)
+    # update() sends no signals, so the cached login goes here
+    backends.invalidate(student.pk)
+    for quiz_id in quiz_ids:
+        leaderboard.invalidate(quiz_id)
+
+
+def _dependents(kind, pk):
+    """Querysets to empty, children before parents"""
+    if kind == 'quiz':
+        return [
+            StudentAnswer.objects.filter(attempt__quiz_id=pk),
+            # Answers in other quizzes' attempts should not exist, but would block the questions
+            StudentAnswer.objects.filter(question__quiz_id=pk).exclude(attempt__quiz_id=pk),
+            QuizAttempt.all_objects.filter(quiz_id=pk),
+            Question.all_objects.filter(quiz_id=pk),
+        ]
+    return [
+        StudentAnswer.objects.filter(attempt__student_id=pk),
+        QuizAttempt.all_objects.filter(student_id=pk),
+    ]
+
+
+def purge(kind, pk, batch_size=None):
+    """Delete a flagged quiz or student and everything under it"""
+    batch_size = batch_size or settings.DELETION_BATCH_SIZE
+    dependents = _dependents(kind, pk)
+    total = sum(queryset.count() for queryset in dependents) + 1
+    deleted = 0
+    _set_progress(kind, pk, deleted, total)
+
+    for queryset in dependents:
+        model = queryset.model
+        while True:
+            pks = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            # Nothing below these rows is left, so skip the collector and
+            # issue a single DELETE for the batch
+            batch = model._base_manager.filter(pk__in=pks)
+            batch._raw_delete(batch.db)
+            deleted += len(pks)
+            _set_progress(kind, pk, deleted, total)
+
+    # The row itself goes through delete() for the small remaining
+    # relations (admin log entries, group memberships)
+    model = Quiz if kind == 'quiz' else User
+    model.all_objects.filter(pk=pk, is_deleted=True).delete()
+    _set_progress(kind, pk, total, total, done=True)
+
+
+def _run_worker():
+    while True:
+        kind, pk = _jobs.get()
+        try:
+            purge(kind, pk)
+        except Exception:
+            logger.exception('Background deletion of %s %s failed', kind, pk)
+        finally:
+            for connection in connections.all(initialized_only=True):
+                connection.close()
+            _jobs.task_done()
+
+
+def schedule(kind, pk):
+    """Queue a flagged quiz or student for removal by this process's worker thread"""
+    global _worker
+    _set_progress(kind, pk, 0, None)
+    # Start the purge only after the flag is committed
+    transaction.on_commit(lambda: _jobs.put((kind, pk)))
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run_worker, name='quiz-deletion', daemon=True)
+            _worker.start()
+
+
+def delete_quiz(quiz):
+    mark_quiz_deleted(quiz)
+    schedule('quiz', quiz.pk)
+    return get_progress('quiz', quiz.pk)
+
+
+def delete_student(student):
+    mark_student_deleted(student)
+    schedule('student', student.pk)
+    return get_progress('student', student.pk)
+
+
+def finish_pending(batch_size=None):
+    """Purge anything still flagged, e.g. after a restart; returns the count"""
+    pending = [('quiz', pk) for pk in Quiz.all_objects.filter(is_deleted=True).values_list('pk', flat=True)]
+    pending += [('student', pk) for pk in User.all_objects.filter(is_deleted=True).values_list('pk', flat=True)]
+    for kind, pk in pending:
+        purge(kind, pk, batch_size)
+    return len(pending)
@@ -0,0 +1,129 @@
+"""
+Per-quiz exam data kept in the cache: the quiz row and its questions, which
+also carry the answer key, plus the list of open quizzes the student
+dashboard shows. take_quiz, submit_quiz and student_dashboard read them from
+here, so once a quiz is warm, starting or grading an attempt runs no
+question queries. Saving or deleting a quiz or question drops its entries
+(see signals.py), and warm_quiz fills them ahead of an exam. Reads go
+through singleflight.get_or_compute, so a miss is recomputed once.
+
+That invalidation only reaches the process that made the change. With a
+per-process cache (see checks.py) the quiz is therefore read from the
+database, the questions are kept with the quiz's updated_at, which a
+question change also moves, and reloaded when it no longer matches, and the
+open quiz list is checked the same way against the latest updated_at and the
+number of quizzes.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .checks import cache_is_shared
+from .models import Quiz, Question
+from . import singleflight
+
+EXAM_CACHE_TIMEOUT = 60 * 60 * 6  # 6 hours
+# The dashboard list is dropped whenever a quiz or question changes; the
+# timeout only bounds how long a missed invalidation can last
+OPEN_QUIZZES_KEY = 'quiz:exam:open'
+OPEN_QUIZZES_TIMEOUT = 60 * 5  # 5 minutes
+
+
+def _quiz_key(quiz_id):
+    return f'quiz:exam:{quiz_id}:quiz'
+
+
+def _questions_key(quiz_id):
+    return f'quiz:exam:{quiz_id}:questions'
+
+
+def _load_quiz(quiz_id):
+    return Quiz.objects.filter(id=quiz_id).first()
+
+
+def refresh_quiz(quiz_id):
+    quiz = _load_quiz(quiz_id)
+    singleflight.put(_quiz_key(quiz_id), quiz, EXAM_CACHE_TIMEOUT)
+    return quiz
+
+
+def get_quiz(quiz_id):
+    """The quiz, or None if it doesn't exist (or is being deleted)"""
+    if not cache_is_shared():
+        # Reading the row costs the same as checking a cached copy
+        return _load_quiz(quiz_id)
+    return singleflight.get_or_compute(
+        _quiz_key(quiz_id), lambda: _load_quiz(quiz_id), EXAM_CACHE_TIMEOUT, name='exam_quiz',
+    )
+
+
+def _version(quiz_id):
+    return Quiz.objects.filter(id=quiz_id).values_list('updated_at', flat=True).first()
+
+
+def _load_questions(quiz_id):
+    # Read first, so a change made while loading leaves a stale version
+    version = _version(quiz_id)
+    return version, list(Question.objects.filter(quiz_id=quiz_id).order_by('order', 'id'))
+
+
+def refresh_questions(quiz_id):
+    entry = _load_questions(quiz_id)
+    singleflight.put(_questions_key(quiz_id), entry, EXAM_CACHE_TIMEOUT)
+    return entry[1]
+
+
+def get_questions(quiz_id, version=None):
+    """
+    The quiz's questions in their default order. A caller that has just
+    read the quiz passes its updated_at as version, which saves a query.
+    """
+    cached_version, questions = singleflight.get_or_compute(
+        _questions_key(quiz_id), lambda: _load_questions(quiz_id), EXAM_CACHE_TIMEOUT, name='exam_questions',
+    )
+    if not cache_is_shared() and cached_version != (version or _version(quiz_id)):
+        questions = refresh_questions(quiz_id)
+    return questions
+
+
+def _open_quizzes_version():
+    # Any quiz edit moves the latest updated_at; a deleted quiz lowers the count
+    latest = Quiz.objects.aggregate(updated_at=Max('updated_at'), count=Count('id'))
+    return latest['updated_at'], latest['count']
+
+
+def _load_open_quizzes():
+    # Read first, so a change made while loading leaves a stale version
+    version = _open_quizzes_version()
+    now = timezone.now()
+    return version, list(
+        Quiz.objects.filter(is_active=True).exclude(end_time__lte=now).annotate(question_count=Count('questions'))
+    )
+
+
+def get_open_quizzes():
+    """Active quizzes with their question_count, for the student dashboard"""
+    version, quizzes = singleflight.get_or_compute(
+        OPEN_QUIZZES_KEY, _load_open_quizzes, OPEN_QUIZZES_TIMEOUT, name='open_quizzes',
+    )
+    if not cache_is_shared() and version != _open_quizzes_version():
+        entry = _load_open_quizzes()
+        singleflight.put(OPEN_QUIZZES_KEY, entry, OPEN_QUIZZES_TIMEOUT)
+        quizzes = entry[1]
+    # The list is shared for a while, so closing times are checked on each read
+    now = timezone.now()
+    return [quiz for quiz in quizzes if quiz.end_time is None or quiz.end_time > now]
+
+
+def ordered_questions(attempt, version=None):
+    """The attempt's questions in its shuffled order; deleted questions are skipped"""
+    questions = get_questions(attempt.quiz_id, version)
+    if not attempt.question_order:
+        return questions
+    questions_by_id = {question.id: question for question in questions}
+    question_ids = [int(id) for id in attempt.question_order.split(',')]
+    return [questions_by_id[qid] for qid in question_ids if qid in questions_by_id]
+
+
+def invalidate(quiz_id):
+    cache.delete_many([_quiz_key(quiz_id), _questions_key(quiz_id), OPEN_QUIZZES_KEY])
@@ -0,0 +1,694 @@
+"""
+Excel, PDF and Word exports.
+
+This module pulls in openpyxl, reportlab and python-docx, so views import it
+lazily inside the export views instead of at module load.
+"""
+from io import BytesIO
+
+import openpyxl
+from django.http import HttpResponse
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+from . import answer_store
+from . import metrics
+
+
+@metrics.EXPORT_SECONDS.labels('results_excel').time()
+def results_excel(quiz, attempts):
+    # Create workbook with enhanced styling
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Quiz Results"
+    
+    # Enhanced styling
+    from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+    
+    # Color palette
+    header_fill = PatternFill(start_color="2563EB", end_color="2563EB", fill_type="solid")  # Blue
+    header_font = Font(bold=True, color="FFFFFF", size=12)
+    alternate_fill1 = PatternFill(start_color="F8FAFC", end_color="F8FAFC", fill_type="solid")  # Light gray
+    alternate_fill2 = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")  # White
+    border = Border(
+        left=Side(style='thin', color='D1D5DB'),
+        right=Side(style='thin', color='D1D5DB'),
+        top=Side(style='thin', color='D1D5DB'),
+        bottom=Side(style='thin', color='D1D5DB')
+    )
+    
+    # Add title with enhanced styling
+    ws.merge_cells('A1:F1')
+    title_cell = ws['A1']
+    title_cell.value = f'Quiz Results: {quiz.title}'
+    title_cell.font = Font(bold=True, size=16, color="1E40AF")
+    title_cell.alignment = Alignment(horizontal='center', vertical='center')
+    title_cell.fill = PatternFill(start_color="DBEAFE", end_color="DBEAFE", fill_type="solid")
+    
+    # Add subtitle with date
+    from datetime import datetime
+    ws.merge_cells('A2:F2')
+    subtitle_cell = ws['A2']
+    subtitle_cell.value = f'Generated on: {datetime.now().strftime("%B %d, %Y at %I:%M %p")}'
+    subtitle_cell.font = Font(italic=True, size=10, color="6B7280")
+    subtitle_cell.alignment = Alignment(horizontal='center', vertical='center')
+    
+    # Add headers with enhanced styling
+    headers = ['S.No', 'Student Name', 'Roll Number', 'Score', 'Total Marks', 'Percentage']
+    for col_num, header in enumerate(headers, 1):
+        cell = ws.cell(row=4, column=col_num)
+        cell.value = header
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+        cell.border = border
+    
+    # Add data with alternating row colors and enhanced styling
+    for idx, attempt in enumerate(attempts, 1):
+        row_num = idx + 4
+        # Alternate row colors
+        row_fill = alternate_fill1 if idx % 2 == 0 else alternate_fill2
+        
+        # S.No
+        cell = ws.cell(row=row_num, column=1, value=idx)
+        cell.fill = row_fill
+        cell.alignment = Alignment(horizontal='center')
+        cell.border = border
+        
+        # Student Name
+        cell = ws.cell(row=row_num, column=2, value=attempt.student.username)
+        cell.fill = row_fill
+        cell.alignment = Alignment(horizontal='left')
+        cell.border = border
+        
+        # Roll Number
+        cell = ws.cell(row=row_num, column=3, value=attempt.student.roll_number or 'N/A')
+        cell.fill = row_fill
+        cell.alignment = Alignment(horizontal='center')
+        cell.border = border
+        
+        # Score
+        cell = ws.cell(row=row_num, column=4, value=attempt.score)
+        cell.fill = row_fill
+        cell.alignment = Alignment(horizontal='center')
+        cell.border = border
+        # Highlight high scores
+        if attempt.percentage() >= 75:
+            cell.font = Font(color="16A34A", bold=True)  # Green for excellent
+        elif attempt.percentage() >= 50:
+            cell.font = Font(color="CA8A04")  # Yellow for good
+        else:
+            cell.font = Font(color="DC2626")  # Red for poor
+        
+        # Total Marks
+        cell = ws.cell(row=row_num, column=5, value=attempt.total_marks)
+        cell.fill = row_fill
+        cell.alignment = Alignment(horizontal='center')
+        cell.border = border
+        
+        # Percentage with color coding
+        cell = ws.cell(row=row_num, column=6, value=f"{attempt.percentage()}%")
+        cell.fill = row_fill
+        cell.alignment = Alignment(horizontal='center')
+        cell.border = border
+        # Color code percentages
+        if attempt.percentage() >= 75:
+            cell.font = Font(color="16A34A", bold=True)  # Green for excellent
+        elif attempt.percentage() >= 50:
+            cell.font = Font(color="CA8A04")  # Yellow for good
+        else:
+            cell.font = Font(color="DC2626")  # Red for poor
+    
+    # Adjust column widths for better readability
+    column_widths = {
+        1: 8,   # S.No
+        2: 25,  # Student Name
+        3: 15,  # Roll Number
+        4: 10,  # Score
+        5: 12,  # Total Marks
+        6: 12   # Percentage
+    }
+    
+    for col_idx, width in column_widths.items():
+        column_letter = openpyxl.utils.get_column_letter(col_idx)
+        ws.column_dimensions[column_letter].width = width
+    
+    # Second sheet: every student's answer to every question, from the packed answer vectors
+    questions, matrix = answer_store.answer_matrix(quiz, attempts)
+    answers_ws = wb.create_sheet("Answers")
+    answers_headers = ['Student Name', 'Roll Number'] + [f'Q{idx}' for idx in range(1, len(questions) + 1)]
+    for col_num, header in enumerate(answers_headers, 1):
+        cell = answers_ws.cell(row=1, column=col_num, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+    # Row 2 holds the answer key
+    answers_ws.cell(row=2, column=1, value='Answer key').font = Font(bold=True)
+    for col_num, question in enumerate(questions, 3):
+        answers_ws.cell(row=2, column=col_num, value=question.correct_answer).font = Font(bold=True)
+    for row_num, (attempt, selected) in enumerate(matrix, 3):
+        answers_ws.cell(row=row_num, column=1, value=attempt.student.username)
+        answers_ws.cell(row=row_num, column=2, value=attempt.student.roll_number or 'N/A')
+        for col_num, (letter, question) in enumerate(zip(selected, questions), 3):
+            cell = answers_ws.cell(row=row_num, column=col_num, value=letter)
+            if letter == question.correct_answer:
+                cell.font = Font(color="16A34A")
+    answers_ws.column_dimensions['A'].width = 25
+    answers_ws.column_dimensions['B'].width = 15
+    
+    # Create response
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{quiz.title}_results.xlsx"'
+    wb.save(response)
+    
+    return response
+
+
+@metrics.EXPORT_SECONDS.labels('results_pdf').time()
+def results_pdf(quiz, attempts):
+    # Create PDF with enhanced styling
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=50, bottomMargin=50)
+    elements = []
+    
+    # Enhanced styles
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.colors import HexColor
+    from reportlab.platypus import Spacer, Table, TableStyle
+    from reportlab.lib.units import inch
+    
+    # Title style
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        fontSize=24,
+        textColor=HexColor('#1E3A8A'),
+        spaceAfter=25,
+        alignment=1,  # Center
+        fontName='Helvetica-Bold'
+    )
+    
+    # Subtitle style
+    subtitle_style = ParagraphStyle(
+        'CustomSubtitle',
+        fontSize=14,
+        textColor=HexColor('#4B5563'),
+        spaceAfter=35,
+        alignment=1,  # Center
+        fontName='Helvetica'
+    )
+    
+    # Header style
+    header_style = ParagraphStyle(
+        'Header',
+        fontSize=16,
+        textColor=HexColor('#FFFFFF'),
+        spaceAfter=20,
+        alignment=1,  # Center
+        fontName='Helvetica-Bold'
+    )
+    
+    # Add title and subtitle
+    from datetime import datetime
+    from reportlab.platypus import Paragraph
+    
+    title = Paragraph(f"Quiz Results: {quiz.title}", title_style)
+    subtitle = Paragraph(f"Generated on: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", subtitle_style)
+    
+    elements.append(title)
+    elements.append(subtitle)
+    elements.append(Spacer(1, 30))
+    
+    # Create table data with only roll number, email, and score
+    data = [['S.No', 'Roll Number', 'Email', 'Score']]
+    
+    # Add data rows - show only clean score value
+    for idx, attempt in enumerate(attempts, 1):
+        data.append([
+            str(idx),
+            attempt.student.roll_number or 'N/A',
+            attempt.student.email,
+            str(attempt.score)  # Show only the numeric score value
+        ])
+    
+    # Create table with enhanced styling
+    table = Table(data, colWidths=[0.8*inch, 1.8*inch, 2.5*inch, 1.2*inch])
+    
+    # Table styling with attractive design
+    table_style = TableStyle([
+        # Header styling with gradient-like effect
+        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#1E40AF')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), HexColor('#FFFFFF')),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 14),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 15),
+        ('TOPPADDING', (0, 0), (-1, 0), 15),
+        
+        # Data rows styling
+        ('ALIGN', (0, 1), (0, -1), 'CENTER'),    # S.No
+        ('ALIGN', (1, 1), (1, -1), 'CENTER'),    # Roll Number
+        ('ALIGN', (2, 1), (2, -1), 'LEFT'),      # Email
+        ('ALIGN', (3, 1), (3, -1), 'CENTER'),    # Score
+        
+        # Font styling
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (2, -1), 12),
+        
+        # Grid and borders with attractive styling
+        ('GRID', (0, 0), (-1, -1), 2, HexColor('#1E40AF')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        
+        # Alternate row colors for better readability
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [HexColor('#EFF6FF'), HexColor('#FFFFFF')]),
+        
+        # Add some spacing
+        ('TOPPADDING', (0, 1), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 10),
+    ])
+    
+    table.setStyle(table_style)
+    elements.append(table)
+    
+    # Add summary statistics if there are attempts
+    if attempts:
+        elements.append(Spacer(1, 40))
+        
+        # Summary title
+        summary_title = Paragraph("Performance Summary", header_style)
+        elements.append(summary_title)
+        elements.append(Spacer(1, 20))
+        
+        # Calculate statistics
+        total_students = len(attempts)
+        avg_score = sum([attempt.score for attempt in attempts]) / total_students if total_students > 0 else 0
+        avg_percentage = sum([attempt.percentage() for attempt in attempts]) / total_students if total_students > 0 else 0
+        highest_score = max([attempt.score for attempt in attempts]) if attempts else 0
+        lowest_score = min([attempt.score for attempt in attempts]) if attempts else 0
+        
+        # Summary data with attractive styling
+        summary_data = [
+            ['Metric', 'Value'],
+            ['Total Students', str(total_students)],
+            ['Average Score', f"{avg_score:.2f}"],
+            ['Average Percentage', f"{avg_percentage:.2f}%"],
+            ['Highest Score', str(highest_score)],
+            ['Lowest Score', str(lowest_score)]
+        ]
+        
+        # Create summary table
+        summary_table = Table(summary_data, colWidths=[2.5*inch, 2.5*inch])
+        summary_table.setStyle(TableStyle([
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 12),
+            ('GRID', (0, 0), (-1, -1), 2, HexColor('#1E40AF')),
+            ('BACKGROUND', (0, 0), (-1, 0), HexColor('#1E40AF')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), HexColor('#FFFFFF')),
+            ('BACKGROUND', (0, 1), (-1, -1), HexColor('#EFF6FF')),
+            ('TOPPADDING', (0, 0), (-1, -1), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ]))
+        
+        elements.append(summary_table)
+    
+    # Build PDF
+    doc.build(elements)
+    
+    # Return response
+    buffer.seek(0)
+    response = HttpResponse(buffer, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{quiz.title}_results.pdf"'
+    
+    return response
+
+
+@metrics.EXPORT_SECONDS.labels('students_excel').time()
+def students_excel(students):
+    # Create workbook with attractive styling
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Student List"
+    
+    # Modern color palette
+    header_fill = PatternFill(start_color="4361EE", end_color="4361EE", fill_type="solid")  # Modern blue
+    header_font = Font(bold=True, color="FFFFFF", size=12)
+    alternate_fill1 = PatternFill(start_color="F8F9FA", end_color="F8F9FA", fill_type="solid")  # Light gray
+    alternate_fill2 = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")  # White
+    border = Border(
+        left=Side(style='thin', color='DEE2E6'),
+        right=Side(style='thin', color='DEE2E6'),
+        top=Side(style='thin', color='DEE2E6'),
+        bottom=Side(style='thin', color='DEE2E6')
+    )
+    
+    # Add title with attractive styling
+    ws.merge_cells('A1:E1')
+    title_cell = ws['A1']
+    title_cell.value = 'JNTU Quiz Portal - Student List Report'
+    title_cell.font = Font(bold=True, size=18, color="4361EE")
+    title_cell.alignment = Alignment(horizontal='center', vertical='center')
+    title_cell.fill = PatternFill(start_color="F1F3F9", end_color="F1F3F9", fill_type="solid")
+    
+    # Add subtitle with date
+    from datetime import datetime
+    ws.merge_cells('A2:E2')
+    subtitle_cell = ws['A2']
+    subtitle_cell.value = f'Generated on: {datetime.now().strftime("%B %d, %Y at %I:%M %p")}'
+    subtitle_cell.font = Font(italic=True, size=11, color="6C757D")
+    subtitle_cell.alignment = Alignment(horizontal='center', vertical='center')
+    
+    # Add headers with enhanced styling
+    headers = ['No.', 'Roll Number', 'Phone', 'Email', 'Branch']
+    for col_num, header in enumerate(headers, 1):
+        cell = ws.cell(row=4, column=col_num)
+        cell.value = header
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+        cell.border = border
+    
+    # Add data with alternating row colors and enhanced styling
+    for idx, student in enumerate(students, 1):
+        row_num = idx + 4
+        # Alternate row colors
+        row_fill = alternate_fill1 if idx % 2 == 0 else alternate_fill2
+        
+        # No.
+        cell = ws.cell(row=row_num, column=1, value=idx)
+        cell.fill = row_fill
+        cell.alignment = Alignment(horizontal='center')
+        cell.border = border
+        
+        # Roll Number
+        cell = ws.cell(row=row_num, column=2, value=student.roll_number or 'N/A')
+        cell.fill = row_fill
+        cell.alignment = Alignment(horizontal='center')
+        cell.border = border
+        
+        # Phone
+        cell = ws.cell(row=row_num, column=3, value=student.phone)
+        cell.fill = row_fill
+        cell.alignment = Alignment(horizontal='center')
+        cell.border = border
+        
+        # Email
+        cell = ws.cell(row=row_num, column=4, value=student.email)
+        cell.fill = row_fill
+        cell.alignment = Alignment(horizontal='left')
+        cell.border = border
+        
+        # Branch
+        cell = ws.cell(row=row_num, column=5, value=student.branch or 'N/A')
+        cell.fill = row_fill
+        cell.alignment = Alignment(horizontal='center')
+        cell.border = border
+    
+    # Adjust column widths for better readability
+    column_widths = {
+        1: 8,   # No.
+        2: 15,  # Roll Number
+        3: 15,  # Phone
+        4: 25,  # Email
+        5: 20   # Branch
+    }
+    
+    for col_idx, width in column_widths.items():
+        column_letter = openpyxl.utils.get_column_letter(col_idx)
+        ws.column_dimensions[column_letter].width = width
+    
+    # Create response
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = 'attachment; filename="student_list.xlsx"'
+    wb.save(response)
+    
+    return response
+
+
+@metrics.EXPORT_SECONDS.labels('students_pdf').time()
+def students_pdf(students):
+    # Create PDF with enhanced styling
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=50, bottomMargin=50)
+    elements = []
+    
+    # Enhanced styles
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.colors import HexColor
+    from reportlab.platypus import Spacer, Table, TableStyle
+    from reportlab.lib.units import inch
+    
+    # Title style
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        fontSize=24,
+        textColor=HexColor('#1E3A8A'),
+        spaceAfter=25,
+        alignment=1,  # Center
+        fontName='Helvetica-Bold'
+    )
+    
+    # Subtitle style
+    subtitle_style = ParagraphStyle(
+        'CustomSubtitle',
+        fontSize=14,
+        textColor=HexColor('#4B5563'),
+        spaceAfter=35,
+        alignment=1,  # Center
+        fontName='Helvetica'
+    )
+    
+    # Add title and subtitle
+    from datetime import datetime
+    from reportlab.platypus import Paragraph
+    
+    title = Paragraph("JNTU Quiz Portal - Student List Report", title_style)
+    subtitle = Paragraph(f"Generated on: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", subtitle_style)
+    
+    elements.append(title)
+    elements.append(subtitle)
+    elements.append(Spacer(1, 30))
+    
+    # Create table data
+    data = [['No.', 'Roll Number', 'Phone', 'Email', 'Branch']]
+    
+    # Add data rows
+    for idx, student in enumerate(students, 1):
+        data.append([
+            str(idx),
+            student.roll_number or 'N/A',
+            student.phone,
+            student.email,
+            student.branch or 'N/A'
+        ])
+    
+    # Create table with enhanced styling
+    table = Table(data, colWidths=[0.5*inch, 1.2*inch, 1.2*inch, 2.1*inch, 1.6*inch])
+    
+    # Table styling with attractive design
+    table_style = TableStyle([
+        # Header styling with gradient-like effect
+        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#1E40AF')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), HexColor('#FFFFFF')),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('TOPPADDING', (0, 0), (-1, 0), 12),
+        
+        # Data rows styling
+        ('ALIGN', (0, 1), (0, -1), 'CENTER'),    # No.
+        ('ALIGN', (1, 1), (1, -1), 'CENTER'),    # Roll Number
+        ('ALIGN', (2, 1), (2, -1), 'CENTER'),    # Phone
+        ('ALIGN', (3, 1), (3, -1), 'LEFT'),      # Email
+        ('ALIGN', (4, 1), (4, -1), 'CENTER'),    # Branch
+        ('FONTSIZE', (4, 1), (4, -1), 11),       # Slightly larger font for Branch
+        
+        # Font styling
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (4, -1), 10),
+        
+        # Grid and borders with attractive styling
+        ('GRID', (0, 0), (-1, -1), 2, HexColor('#1E40AF')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        
+        # Alternate row colors for better readability
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [HexColor('#EFF6FF'), HexColor('#FFFFFF')]),
+        
+        # Add some spacing
+        ('TOPPADDING', (0, 1), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 10),
+    ])
+    
+    table.setStyle(table_style)
+    elements.append(table)
+    
+    # Build PDF
+    doc.build(elements)
+    
+    # Return response
+    buffer.seek(0)
+    response = HttpResponse(buffer, content_type='application/pdf')
+    response['Content-Disposition'] = 'attachment; filename="student_list.pdf"'
+    
+    return response
+
+
+@metrics.EXPORT_SECONDS.labels('questions_pdf').time()
+def questions_pdf(quiz, questions):
+    # Create PDF
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=50, bottomMargin=50)
+    elements = []
+    
+    # Enhanced styles
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.colors import HexColor
+    from reportlab.platypus import Spacer
+    
+    # Title style
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        fontSize=24,
+        textColor=HexColor('#1E3A8A'),
+        spaceAfter=25,
+        alignment=1,  # Center
+        fontName='Helvetica-Bold'
+    )
+    
+    # Subtitle style
+    subtitle_style = ParagraphStyle(
+        'CustomSubtitle',
+        fontSize=14,
+        textColor=HexColor('#4B5563'),
+        spaceAfter=35,
+        alignment=1,  # Center
+        fontName='Helvetica'
+    )
+    
+    # Question style
+    question_style = ParagraphStyle(
+        'Question',
+        fontSize=12,
+        textColor=HexColor('#000000'),
+        spaceAfter=15,
+        fontName='Helvetica-Bold'
+    )
+    
+    # Option style
+    option_style = ParagraphStyle(
+        'Option',
+        fontSize=11,
+        textColor=HexColor('#374151'),
+        leftIndent=20,
+        spaceAfter=8,
+        fontName='Helvetica'
+    )
+    
+    # Answer style
+    answer_style = ParagraphStyle(
+        'Answer',
+        fontSize=11,
+        textColor=HexColor('#059669'),
+        spaceAfter=20,
+        fontName='Helvetica-Bold'
+    )
+    
+    # Add title and subtitle
+    from datetime import datetime
+    from reportlab.platypus import Paragraph
+    
+    title = Paragraph(f"Quiz Questions: {quiz.title}", title_style)
+    subtitle = Paragraph(f"Generated on: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", subtitle_style)
+    
+    elements.append(title)
+    elements.append(subtitle)
+    elements.append(Spacer(1, 30))
+    
+    # Add questions
+    for idx, question in enumerate(questions, 1):
+        # Question text
+        question_text = Paragraph(f"<b>Q{idx}:</b> {question.question_text}", question_style)
+        elements.append(question_text)
+        elements.append(Spacer(1, 10))
+        
+        # Options
+        option_a = Paragraph(f"<b>A.</b> {question.option_a}", option_style)
+        option_b = Paragraph(f"<b>B.</b> {question.option_b}", option_style)
+        option_c = Paragraph(f"<b>C.</b> {question.option_c}", option_style)
+        option_d = Paragraph(f"<b>D.</b> {question.option_d}", option_style)
+        
+        elements.append(option_a)
+        elements.append(option_b)
+        elements.append(option_c)
+        elements.append(option_d)
+        elements.append(Spacer(1, 10))
+        
+        # Correct answer
+        correct_answer = Paragraph(f"<b>Correct Answer:</b> Option {question.correct_answer}", answer_style)
+        elements.append(correct_answer)
+        elements.append(Spacer(1, 20))
+    
+    # Build PDF
+    doc.build(elements)
+    
+    # Return response
+    buffer.seek(0)
+    response = HttpResponse(buffer, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{quiz.title}_questions.pdf"'
+    
+    return response
+
+
+@metrics.EXPORT_SECONDS.labels('questions_docx').time()
+def questions_docx(quiz, questions):
+    # Create DOCX document
+    document = Document()
+    
+    # Add title
+    title = document.add_heading(f'Quiz Questions: {quiz.title}', 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    # Add subtitle with date
+    from datetime import datetime
+    subtitle = document.add_paragraph(f'Generated on: {datetime.now().strftime("%B %d, %Y at %I:%M %p")}')
+    subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    # Add a line break
+    document.add_paragraph()
+    
+    # Add questions
+    for idx, question in enumerate(questions, 1):
+        # Question text
+        document.add_paragraph(f'Q{idx}: {question.question_text}', style='Heading 2')
+        
+        # Options
+        document.add_paragraph(f'A. {question.option_a}', style='Normal')
+        document.add_paragraph(f'B. {question.option_b}', style='Normal')
+        document.add_paragraph(f'C. {question.option_c}', style='Normal')
+        document.add_paragraph(f'D. {question.option_d}', style='Normal')
+        
+        # Correct answer
+        document.add_paragraph(f'Correct Answer: Option {question.correct_answer}', style='Normal')
+        
+        # Add spacing between questions
+        document.add_paragraph()
+    
+    # Save document to BytesIO buffer
+    buffer = BytesIO()
+    document.save(buffer)
+    buffer.seek(0)
+    
+    # Return response
+    response = HttpResponse(buffer.getvalue(), content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+    response['Content-Disposition'] = f'attachment; filename="{quiz.title}_questions.docx"'
+    
+    return response
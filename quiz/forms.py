@@ -51,11 +51,21 @@ class LoginForm(forms.Form):
 class QuizForm(forms.ModelForm):
     class Meta:
         model = Quiz
-        fields = ['title', 'description', 'time_limit', 'is_active']
+        fields = ['title', 'description', 'time_limit', 'is_active', 'start_time', 'end_time']
         widgets = {
             'description': forms.Textarea(attrs={'rows': 4}),
+            'start_time': forms.DateTimeInput(attrs={'type': 'datetime-local'}, format='%Y-%m-%dT%H:%M'),
+            'end_time': forms.DateTimeInput(attrs={'type': 'datetime-local'}, format='%Y-%m-%dT%H:%M'),
         }
 
+    def clean(self):
+        cleaned_data = super().clean()
+        start_time = cleaned_data.get('start_time')
+        end_time = cleaned_data.get('end_time')
+        if start_time and end_time and end_time <= start_time:
+            raise forms.ValidationError('The end time must be after the start time')
+        return cleaned_data
+
 
 class QuestionForm(forms.ModelForm):
     class Meta:
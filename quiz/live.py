@@ -0,0 +1,135 @@
+"""
+Live exam progress for proctors, sent as server-sent events.
+
+take_quiz and submit_quiz publish to an in-process hub per quiz. The hub
+recomputes the counts at most once per COALESCE_INTERVAL no matter how many
+proctors are watching, and every proctor is sent that shared snapshot.
+Snapshots are also refreshed every MAX_STALENESS seconds, which picks up
+events published by other worker processes.
+
+Under ASGI each proctor gets a long-lived stream (event_stream) that waits
+with asyncio, so open streams hold no worker thread. A WSGI worker would be
+tied up for the whole stream, so there poll_stream sends the current
+snapshot and ends, and EventSource reconnects after POLL_INTERVAL: short
+polling against the same shared snapshot, with the same page code.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import QuizAttempt
+
+COALESCE_INTERVAL = 0.5  # seconds between recomputations
+MAX_STALENESS = 5  # seconds before a snapshot is refreshed without events
+KEEPALIVE_INTERVAL = 15  # seconds between keepalive comments
+STREAM_DURATION = 300  # seconds before the stream closes and EventSource reconnects
+POLL_INTERVAL = 2  # seconds between reconnects when each response is one snapshot
+RECENT_SUBMISSIONS = 10
+
+_hubs = {}
+_hubs_lock = threading.Lock()
+
+
+class QuizProgressHub:
+    def __init__(self, quiz_id):
+        self.quiz_id = quiz_id
+        self.lock = threading.Lock()
+        self.version = 0
+        self.snapshot = None
+        self.computed_at = 0
+        self.dirty = True
+        self.recent_submissions = deque(maxlen=RECENT_SUBMISSIONS)
+
+    def publish(self, event, **data):
+        with self.lock:
+            if event == 'submitted':
+                self.recent_submissions.appendleft(data)
+            self.dirty = True
+
+    def _refresh(self):
+        counts = QuizAttempt.objects.filter(quiz_id=self.quiz_id).aggregate(
+            started=Count('id'),
+            submitted=Count('id', filter=Q(is_completed=True)),
+        )
+        self.snapshot = {
+            'quiz_id': self.quiz_id,
+            'started': counts['started'],
+            'in_progress': counts['started'] - counts['submitted'],
+            'submitted': counts['submitted'],
+            'recent_submissions': list(self.recent_submissions),
+            'updated_at': timezone.now().isoformat(),
+        }
+        self.version += 1
+        self.computed_at = time.monotonic()
+        self.dirty = False
+
+    def current(self):
+        """(version, snapshot), recomputed at most once per COALESCE_INTERVAL"""
+        with self.lock:
+            since = time.monotonic() - self.computed_at
+            stale = self.dirty or since >= MAX_STALENESS
+            # Callers that arrive during a recomputation wait for it and share it
+            if self.snapshot is None or (stale and since >= COALESCE_INTERVAL):
+                self._refresh()
+            return self.version, self.snapshot
+
+
+def get_hub(quiz_id):
+    with _hubs_lock:
+        hub = _hubs.get(quiz_id)
+        if hub is None:
+            hub = _hubs[quiz_id] = QuizProgressHub(quiz_id)
+        return hub
+
+
+def publish_started(attempt):
+    get_hub(attempt.quiz_id).publish('started')
+
+
+def publish_submitted(attempt):
+    get_hub(attempt.quiz_id).publish(
+        'submitted',
+        username=attempt.student.username,
+        score=attempt.score,
+        total_marks=attempt.total_marks,
+        completed_at=attempt.completed_at.isoformat() if attempt.completed_at else None,
+    )
+
+
+def _event(snapshot):
+    return f'event: progress\ndata: {json.dumps(snapshot)}\n\n'
+
+
+def poll_stream(quiz_id):
+    """The current snapshot, then EventSource reconnects after POLL_INTERVAL"""
+    snapshot = get_hub(quiz_id).current()[1]
+    yield f'retry: {POLL_INTERVAL * 1000}\n\n'
+    yield _event(snapshot)
+
+
+async def event_stream(quiz_id):
+    """A snapshot whenever it changes, for STREAM_DURATION; needs ASGI"""
+    hub = get_hub(quiz_id)
+    current = sync_to_async(hub.current)
+    last_version = None
+    last_sent = time.monotonic()
+    closes_at = last_sent + STREAM_DURATION
+
+    # Ask the browser to wait a moment before reconnecting
+    yield 'retry: 2000\n\n'
+    while time.monotonic() < closes_at:
+        version, snapshot = await current()
+        now = time.monotonic()
+        if version != last_version:
+            last_version, last_sent = version, now
+            yield _event(snapshot)
+        elif now - last_sent >= KEEPALIVE_INTERVAL:
+            last_sent = now
+            yield ': keepalive\n\n'
+        await asyncio.sleep(COALESCE_INTERVAL)
@@ -0,0 +1,148 @@
+"""
+Database housekeeping: expired sessions, abandoned attempts, interrupted
+background deletions and planner stats.
+
+Run it with ``python manage.py run_maintenance`` from cron, or set
+MAINTENANCE_INTERVAL so every worker runs it in a background thread. Only one
+worker runs a given interval when they share a cache. Deletes go in batches
+of MAINTENANCE_BATCH_SIZE rows, each in its own short transaction, so
+sessions and submissions are never blocked behind one huge DELETE.
+"""
+import json
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connections, router
+from django.utils import timezone
+
+from .models import QuizAttempt, StudentAnswer
+from . import deletion
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 'quiz:maintenance:lock'
+
+_runner_lock = threading.Lock()
+_runner = None
+
+
+def _delete_in_batches(queryset, batch_size):
+    model = queryset.model
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        model.objects.filter(pk__in=pks).delete()
+        deleted += len(pks)
+
+
+def delete_expired_sessions(batch_size):
+    """Same as clearsessions, but in batches"""
+    expired = Session.objects.filter(expire_date__lt=timezone.now()).order_by()
+    return _delete_in_batches(expired, batch_size)
+
+
+def purge_stale_attempts(batch_size, grace_minutes):
+    """Delete incomplete attempts whose quiz time limit ran out more than grace_minutes ago"""
+    now = timezone.now()
+    stale = QuizAttempt.objects.filter(is_completed=False).order_by()
+    deleted = 0
+    # One cutoff per distinct time limit keeps the filter a plain indexed
+    # comparison on every database
+    time_limits = stale.values_list('quiz__time_limit', flat=True).distinct()
+    for time_limit in list(time_limits):
+        cutoff = now - timedelta(minutes=time_limit + grace_minutes)
+        deleted += _delete_in_batches(
+            stale.filter(quiz__time_limit=time_limit, started_at__lt=cutoff), batch_size,
+        )
+    return deleted
+
+
+def optimize_database(vacuum=False):
+    """Refresh planner statistics, and reclaim space if vacuum is set"""
+    tables = [Session._meta.db_table, QuizAttempt._meta.db_table, StudentAnswer._meta.db_table]
+    connection = connections[router.db_for_write(QuizAttempt)]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            if vacuum:
+                # Rewrites the whole file and locks it while running
+                cursor.execute('VACUUM')
+            cursor.execute('PRAGMA optimize')
+            for table in tables:
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(table)}')
+        elif connection.vendor == 'postgresql':
+            command = 'VACUUM (ANALYZE)' if vacuum else 'ANALYZE'
+            for table in tables:
+                cursor.execute(f'{command} {connection.ops.quote_name(table)}')
+        else:
+            return False
+    return True
+
+
+def run_maintenance(batch_size=None, vacuum=False):
+    """Run every task once and return the per-run metrics"""
+    batch_size = batch_size or settings.MAINTENANCE_BATCH_SIZE
+    started = time.perf_counter()
+    report = {'event': 'maintenance_run'}
+
+    task_started = time.perf_counter()
+    report['sessions_deleted'] = delete_expired_sessions(batch_size)
+    report['sessions_seconds'] = round(time.perf_counter() - task_started, 3)
+
+    task_started = time.perf_counter()
+    report['attempts_purged'] = purge_stale_attempts(batch_size, settings.MAINTENANCE_STALE_ATTEMPT_GRACE)
+    report['attempts_seconds'] = round(time.perf_counter() - task_started, 3)
+
+    task_started = time.perf_counter()
+    report['deletions_finished'] = deletion.finish_pending(batch_size)
+    report['deletions_seconds'] = round(time.perf_counter() - task_started, 3)
+
+    task_started = time.perf_counter()
+    report['optimized'] = optimize_database(vacuum=vacuum)
+    report['vacuumed'] = vacuum and report['optimized']
+    report['optimize_seconds'] = round(time.perf_counter() - task_started, 3)
+
+    report['total_seconds'] = round(time.perf_counter() - started, 3)
+
+    metrics.MAINTENANCE_ROWS_DELETED.labels('sessions').inc(report['sessions_deleted'])
+    metrics.MAINTENANCE_ROWS_DELETED.labels('stale_attempts').inc(report['attempts_purged'])
+    metrics.MAINTENANCE_SECONDS.observe(report['total_seconds'])
+    logger.info(json.dumps(report))
+    return report
+
+
+def _run_periodically(interval):
+    while True:
+        time.sleep(interval)
+        # Workers sharing a cache take turns; the lock lasts one interval
+        if not cache.add(LOCK_KEY, 1, interval):
+            continue
+        try:
+            run_maintenance()
+        except Exception:
+            logger.exception('Maintenance run failed')
+        finally:
+            # The thread keeps its own connection; don't hold it between runs
+            for connection in connections.all(initialized_only=True):
+                connection.close()
+
+
+def start_periodic_runner():
+    """Start the background runner once per process"""
+    global _runner
+    interval = settings.MAINTENANCE_INTERVAL
+    if interval <= 0 or _runner is not None:
+        return
+    with _runner_lock:
+        if _runner is None:
+            _runner = threading.Thread(
+                target=_run_periodically, args=(interval,), name='quiz-maintenance', daemon=True,
+            )
+            _runner.start()
@@ -0,0 +1,84 @@
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from quiz import answer_store, results
+from quiz.management.fixtures import create_exam, delete_exam
+from quiz.models import QuizAttempt, StudentAnswer
+
+
+def database_bytes():
+    """Size of the database on disk, or None where it can't be read cheaply"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('PRAGMA page_count')
+            pages = cursor.fetchone()[0]
+            cursor.execute('PRAGMA freelist_count')
+            free = cursor.fetchone()[0]
+            cursor.execute('PRAGMA page_size')
+            return (pages - free) * cursor.fetchone()[0]
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_database_size(current_database())')
+            return cursor.fetchone()[0]
+    return None
+
+
+class Command(BaseCommand):
+    help = 'Compare StudentAnswer rows with the packed answer vector: storage, grading writes and the answer sheet export'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=500)
+        parser.add_argument('--questions', type=int, default=50)
+
+    def handle(self, *args, **options):
+        for layout in ('rows', 'packed'):
+            self.run_layout(layout, options['students'], options['questions'])
+
+    def run_layout(self, layout, student_count, question_count):
+        run_id = uuid.uuid4().hex[:8]
+        quiz, students = create_exam(run_id, student_count, question_count, with_attempts=True)
+        try:
+            questions = list(quiz.questions.order_by('order', 'id'))
+            attempts = list(QuizAttempt.objects.filter(quiz=quiz))
+            rng = random.Random(run_id)
+
+            size_before = database_bytes()
+            started = time.perf_counter()
+            for attempt in attempts:
+                answers = []
+                for question in questions:
+                    selected = rng.choice('ABCD')
+                    answers.append(StudentAnswer(
+                        attempt=attempt, question=question,
+                        selected_answer=selected, is_correct=selected == question.correct_answer,
+                    ))
+                attempt.score = sum(answer.is_correct for answer in answers)
+                attempt.is_completed = True
+                attempt.completed_at = timezone.now()
+                # The same writes submit_quiz makes for each layout: the frozen
+                # result and the packed vector always, the rows only for 'rows'
+                attempt.result_snapshot = results.build_snapshot(answers)
+                answer_store.apply(attempt, answers)
+                with transaction.atomic():
+                    if layout == 'rows':
+                        StudentAnswer.objects.bulk_create(answers)
+                    attempt.save()
+            grading = time.perf_counter() - started
+            size_after = database_bytes()
+
+            started = time.perf_counter()
+            _, matrix = answer_store.answer_matrix(quiz, QuizAttempt.objects.filter(quiz=quiz))
+            export = time.perf_counter() - started
+        finally:
+            delete_exam(quiz, students)
+
+        self.stdout.write(self.style.SUCCESS(f'{layout}: {student_count} attempts x {question_count} questions'))
+        self.stdout.write(f'  grading writes: {grading:.2f}s total, {grading * 1000 / student_count:.2f} ms per submission')
+        self.stdout.write(f'  answer sheet: {len(matrix)} rows in {export * 1000:.0f} ms')
+        if size_before is not None:
+            growth = size_after - size_before
+            self.stdout.write(f'  database growth: {growth / 1024:.0f} KiB, {growth / student_count:.0f} bytes per attempt')
@@ -0,0 +1,74 @@
+import time
+import uuid
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from quiz import backends
+from quiz.management.fixtures import create_exam, delete_exam
+
+BACKENDS = [
+    ('database (ModelBackend)', 'django.contrib.auth.backends.ModelBackend'),
+    ('cached (CachedModelBackend)', 'quiz.backends.CachedModelBackend'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare queries and time per request with request.user loaded from the database and from the cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per page and backend')
+        parser.add_argument('--questions', type=int, default=20)
+
+    def handle(self, *args, **options):
+        requests = options['requests']
+        run_id = uuid.uuid4().hex[:8]
+        quiz, students = create_exam(run_id, 1, options['questions'], with_attempts=True)
+        student = students[0]
+        pages = [
+            ('student_dashboard', reverse('student_dashboard')),
+            ('take_quiz', reverse('take_quiz', args=[quiz.id])),
+            ('profile', reverse('profile')),
+        ]
+        self.stdout.write(f'Database: {connection.vendor}, {requests} requests per page')
+
+        try:
+            for label, backend in BACKENDS:
+                # This one process is every reader, so even the local-memory
+                # cache stands in for a shared one here
+                with (
+                    override_settings(AUTHENTICATION_BACKENDS=[backend]),
+                    mock.patch.object(backends, 'cache_is_shared', return_value=True),
+                ):
+                    self.stdout.write(label)
+                    backends.invalidate(student.id)
+                    client = Client()
+                    client.force_login(student)
+                    for page, url in pages:
+                        # The first request fills the caches the page itself uses
+                        client.get(url)
+                        self.report(page, *self.measure(client, url, requests))
+        finally:
+            backends.invalidate(student.id)
+            delete_exam(quiz, students)
+
+    def measure(self, client, url, requests):
+        user_queries = 0
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            for _ in range(requests):
+                client.get(url)
+            elapsed = time.perf_counter() - start
+        for query in context.captured_queries:
+            if query['sql'].startswith('SELECT') and 'FROM "quiz_user"' in query['sql']:
+                user_queries += 1
+        return len(context.captured_queries) / requests, user_queries / requests, elapsed / requests * 1000
+
+    def report(self, page, queries, user_queries, ms):
+        self.stdout.write(
+            f'  {page:<18} {queries:5.2f} queries/request ({user_queries:.2f} on quiz_user), {ms:6.2f} ms/request'
+        )
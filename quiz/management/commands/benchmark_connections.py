@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from quiz.models import Quiz, Question, QuizAttempt
+
+
+class Command(BaseCommand):
+    help = 'Compare the take_quiz read queries on a fresh connection against a reused one'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quiz-id', type=int, help='Quiz to load (defaults to the first active quiz)')
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        iterations = options['iterations']
+        quiz = self.get_quiz(options['quiz_id'], alias)
+
+        connection = connections[alias]
+        self.stdout.write(f'Database: {connection.vendor} ({alias}), quiz: "{quiz.title}", {iterations} iterations')
+
+        # New connection for every "request", as with CONN_MAX_AGE=0
+        fresh = []
+        for _ in range(iterations):
+            connection.close()
+            start = time.perf_counter()
+            self.run_take_quiz_queries(quiz.id, alias)
+            fresh.append(time.perf_counter() - start)
+
+        # One connection reused across "requests", as with CONN_MAX_AGE>0 or a pool
+        connection.ensure_connection()
+        reused = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            self.run_take_quiz_queries(quiz.id, alias)
+            reused.append(time.perf_counter() - start)
+
+        fresh_ms = sum(fresh) / iterations * 1000
+        reused_ms = sum(reused) / iterations * 1000
+        self.stdout.write(f'  fresh connection:  {fresh_ms:.3f} ms per request')
+        self.stdout.write(f'  reused connection: {reused_ms:.3f} ms per request')
+        self.stdout.write(self.style.SUCCESS(
+            f'  connection setup: {fresh_ms - reused_ms:.3f} ms per request removed by connection reuse'
+        ))
+
+    def get_quiz(self, quiz_id, alias):
+        quizzes = Quiz.objects.using(alias)
+        quiz = quizzes.filter(id=quiz_id).first() if quiz_id else quizzes.filter(is_active=True).first()
+        if quiz is None:
+            raise CommandError('No quiz found to benchmark')
+        return quiz
+
+    def run_take_quiz_queries(self, quiz_id, alias):
+        # The reads take_quiz performs before rendering
+        quiz = Quiz.objects.using(alias).get(id=quiz_id, is_active=True)
+        QuizAttempt.objects.using(alias).filter(quiz=quiz).first()
+        list(Question.objects.using(alias).filter(quiz=quiz))
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+from quiz.management.fixtures import create_exam, delete_exam
+
+
+class Command(BaseCommand):
+    help = 'Simulate an exam start (every student opens take_quiz at once) under WSGI and ASGI'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200)
+        parser.add_argument('--questions', type=int, default=30)
+        parser.add_argument(
+            '--wsgi-threads', type=int, default=8,
+            help='Concurrent requests a WSGI deployment can serve (workers x threads)',
+        )
+        parser.add_argument('--mode', choices=['wsgi', 'asgi'], help='Run a single mode in this process')
+        parser.add_argument(
+            '--admission', action='store_true',
+            help='Keep exam-start admission control on; students past ADMISSION_RATE are sent to the waiting room',
+        )
+
+    def handle(self, *args, **options):
+        if options['mode']:
+            return self.run_mode(options)
+
+        # The URLconf picks sync or async views at import time, so each mode
+        # runs in its own process with ASYNC_STUDENT_VIEWS set accordingly
+        for mode, async_views in (('wsgi', 'False'), ('asgi', 'True')):
+            env = dict(
+                os.environ, ASYNC_STUDENT_VIEWS=async_views, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE,
+                ADMISSION_CONTROL=str(options['admission']),
+            )
+            command = [
+                sys.executable, sys.argv[0], 'benchmark_exam_start', '--mode', mode,
+                '--students', str(options['students']),
+                '--questions', str(options['questions']),
+                '--wsgi-threads', str(options['wsgi_threads']),
+            ]
+            completed = subprocess.run(command, capture_output=True, text=True, env=env)
+            self.stdout.write(completed.stdout.rstrip())
+            if completed.returncode:
+                self.stderr.write(completed.stderr)
+
+    def run_mode(self, options):
+        run_id = uuid.uuid4().hex[:8]
+        quiz, students = create_exam(run_id, options['students'], options['questions'])
+        url = reverse('take_quiz', args=[quiz.id])
+
+        try:
+            if options['mode'] == 'wsgi':
+                latencies, elapsed, statuses = self.run_wsgi(students, url, options['wsgi_threads'])
+                label = f'WSGI ({options["wsgi_threads"]} concurrent requests)'
+            else:
+                latencies, elapsed, statuses = asyncio.run(self.run_asgi(students, url))
+                label = 'ASGI (async student views)'
+        finally:
+            delete_exam(quiz, students)
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+        self.stdout.write(self.style.SUCCESS(label))
+        self.stdout.write(f'  {len(students)} students, {elapsed:.2f}s total, {len(students) / elapsed:.1f} req/s')
+        # A redirect is a student queued in the waiting room
+        failures = sum(1 for status in statuses if status not in (200, 302))
+        self.stdout.write(f'  latency p50 {p50:.1f} ms, p95 {p95:.1f} ms, failures {failures}')
+        if settings.ADMISSION_CONTROL:
+            self.stdout.write(f'  admitted {statuses.count(200)}, sent to the waiting room {statuses.count(302)}')
+
+    def run_wsgi(self, students, url, threads):
+        clients = []
+        for student in students:
+            client = Client()
+            client.force_login(student)
+            clients.append(client)
+        connection.close()
+
+        def open_quiz(client):
+            start = time.perf_counter()
+            try:
+                status = client.get(url).status_code
+            finally:
+                connection.close()
+            return time.perf_counter() - start, status
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(open_quiz, clients))
+        elapsed = time.perf_counter() - start
+        return [r[0] for r in results], elapsed, [r[1] for r in results]
+
+    async def run_asgi(self, students, url):
+        clients = []
+        for student in students:
+            client = AsyncClient()
+            await sync_to_async(client.force_login)(student)
+            clients.append(client)
+
+        async def open_quiz(client):
+            start = time.perf_counter()
+            response = await client.get(url)
+            return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(open_quiz(client) for client in clients))
+        elapsed = time.perf_counter() - start
+        return [r[0] for r in results], elapsed, [r[1] for r in results]
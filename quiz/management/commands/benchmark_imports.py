@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter so nothing is already imported
+WORKER_SCRIPT = '''
+import django
+django.setup()
+import quiz.urls
+{extra_import}
+try:
+    import resource
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+except ImportError:
+    print(0)
+'''
+
+EXPORT_PACKAGES = ('openpyxl', 'reportlab', 'docx')
+
+
+class Command(BaseCommand):
+    help = 'Measure worker import time (python -X importtime) and RSS with and without the export libraries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        runs = options['runs']
+        scenarios = [
+            ('eager exports (before)', 'import quiz.exports'),
+            ('lazy exports (after)', ''),
+        ]
+
+        for label, extra_import in scenarios:
+            results = [self.measure(extra_import) for _ in range(runs)]
+            total_ms = sorted(r['total_ms'] for r in results)[runs // 2]
+            export_ms = sorted(r['export_ms'] for r in results)[runs // 2]
+            rss_kb = sorted(r['rss_kb'] for r in results)[runs // 2]
+
+            self.stdout.write(self.style.SUCCESS(label))
+            self.stdout.write(f'  total import time:   {total_ms:.1f} ms (median of {runs})')
+            self.stdout.write(f'  export libraries:    {export_ms:.1f} ms')
+            if rss_kb:
+                self.stdout.write(f'  peak RSS:            {rss_kb / 1024:.1f} MB')
+
+    def measure(self, extra_import):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', WORKER_SCRIPT.format(extra_import=extra_import)],
+            capture_output=True, text=True, env=env, check=True,
+        )
+
+        total_us = 0
+        export_us = 0
+        for line in completed.stderr.splitlines():
+            # Format: "import time: <self us> | <cumulative us> | <module>"
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, module = line[len('import time:'):].split('|')
+            total_us += int(self_us)
+            if module.strip() in EXPORT_PACKAGES:
+                export_us += int(cumulative_us)
+
+        # ru_maxrss is in KB on Linux and bytes on macOS
+        rss = int(completed.stdout.strip().splitlines()[-1])
+        rss_kb = rss / 1024 if sys.platform == 'darwin' else rss
+
+        return {'total_ms': total_us / 1000, 'export_ms': export_us / 1000, 'rss_kb': rss_kb}
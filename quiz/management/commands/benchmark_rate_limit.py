@@ -0,0 +1,67 @@
+import logging
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from quiz.captcha import new_challenge
+from quiz.models import User
+
+
+class Command(BaseCommand):
+    help = 'Compare the cost of a rate-limited login POST with a login that reaches password hashing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        run_id = uuid.uuid4().hex[:8]
+        user = User(username=f'bench_login_{run_id}', role='student', phone='0')
+        user.set_password('correct-password')
+        user.save()
+
+        try:
+            # Limits high enough that nothing is rejected
+            with override_settings(RATE_LIMITS={'login_ip': f'{count * 10}/60', 'login_failures': f'{count * 10}/60', 'register_ip': '5/60'}):
+                hashed = self.measure(count, user.username, f'bench-{run_id}-hashed')
+
+            # The first request uses up the per-IP limit, so every measured one is rejected
+            with override_settings(RATE_LIMITS={'login_ip': '1/3600', 'login_failures': '1/3600', 'register_ip': '5/60'}):
+                ip = f'bench-{run_id}-rejected'
+                # Django logs a warning for every 4xx response
+                logging.getLogger('django.request').setLevel(logging.ERROR)
+                Client(REMOTE_ADDR=ip).post('/', {'username': user.username, 'password': 'x', 'captcha': 'x'})
+                rejected = self.measure(count, user.username, ip, expect_status=429)
+        finally:
+            user.delete()
+
+        self.report('failed login (captcha ok, password hashed)', hashed)
+        self.report('rejected with 429', rejected)
+        speedup = statistics.median(hashed) / statistics.median(rejected)
+        self.stdout.write(self.style.SUCCESS(f'A rejection costs {speedup:.0f}x less than a hashed login'))
+
+    @override_settings(CAPTCHA_MODE='signed')
+    def measure(self, count, username, ip, expect_status=None):
+        client = Client(REMOTE_ADDR=ip)
+        timings = []
+        for _ in range(count):
+            # A valid captcha so the request reaches authenticate()
+            captcha, captcha_token = new_challenge(None)
+            started = time.perf_counter()
+            response = client.post('/', {
+                'username': username, 'password': 'wrong-password',
+                'captcha': captcha, 'captcha_token': captcha_token,
+            })
+            timings.append((time.perf_counter() - started) * 1000)
+            if expect_status and response.status_code != expect_status:
+                raise AssertionError(f'Expected {expect_status}, got {response.status_code}')
+        return timings
+
+    def report(self, label, timings):
+        timings = sorted(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(f'{label}:')
+        self.stdout.write(f'  median {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms over {len(timings)} requests')
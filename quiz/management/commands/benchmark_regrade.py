@@ -0,0 +1,83 @@
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from quiz import answer_store
+from quiz.management.fixtures import create_exam, delete_exam
+from quiz.models import Question, QuizAttempt, StudentAnswer
+from quiz.regrade import regrade
+
+INSERT_BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = 'Time re-grading a quiz after its answer key changes (dry run, one question, whole quiz)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=100000)
+        parser.add_argument('--questions', type=int, default=20)
+        parser.add_argument(
+            '--layout', choices=['packed', 'rows'], default='packed',
+            help='packed: answer vectors only; rows: StudentAnswer rows only, as graded before vectors',
+        )
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        self.stdout.write(f'Creating {options["attempts"]} graded attempts ({options["layout"]})...')
+        quiz, students = create_exam(run_id, options['attempts'], options['questions'])
+        try:
+            self.grade(quiz, students, options['layout'])
+            questions = list(quiz.questions.order_by('order', 'id'))
+
+            # The key of the first question was wrong: 'A' should have been 'B'
+            Question.objects.filter(id=questions[0].id).update(correct_answer='B')
+            self.run('dry run, one question', quiz, [questions[0].id], dry_run=True)
+            self.run('one question', quiz, [questions[0].id])
+
+            # Then half of the key turns out to be wrong
+            Question.objects.filter(id__in=[q.id for q in questions[::2]]).update(correct_answer='C')
+            self.run('whole quiz', quiz, None)
+        finally:
+            delete_exam(quiz, students)
+
+    def grade(self, quiz, students, layout):
+        questions = list(quiz.questions.order_by('order', 'id'))
+        question_order = ','.join(str(question.id) for question in questions)
+        rng = random.Random(quiz.id)
+        attempts = []
+        answers = []
+        for student in students:
+            attempt = QuizAttempt(
+                student=student, quiz=quiz, total_marks=len(questions),
+                question_order=question_order, is_completed=True,
+            )
+            graded = []
+            for question in questions:
+                selected = rng.choice('ABCD')
+                graded.append(StudentAnswer(
+                    attempt=attempt, question=question,
+                    selected_answer=selected, is_correct=selected == question.correct_answer,
+                ))
+            attempt.score = sum(answer.is_correct for answer in graded)
+            if layout == 'packed':
+                answer_store.apply(attempt, graded)
+            else:
+                answers.extend(graded)
+            attempts.append(attempt)
+        QuizAttempt.objects.bulk_create(attempts, batch_size=INSERT_BATCH_SIZE)
+        for answer in answers:
+            # Picks up the primary key bulk_create set on the attempt
+            answer.attempt = answer.attempt
+        StudentAnswer.objects.bulk_create(answers, batch_size=INSERT_BATCH_SIZE)
+
+    def run(self, label, quiz, question_ids, dry_run=False):
+        started = time.perf_counter()
+        report = regrade(quiz, question_ids=question_ids, dry_run=dry_run)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'{label}: {elapsed:.2f}s'))
+        self.stdout.write(
+            f'  {report["answers_changed"]} answer rows, {report["attempts_changed"]} attempts changed, '
+            f'{len(report["score_changes"])} scores changed'
+        )
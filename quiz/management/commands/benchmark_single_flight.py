@@ -0,0 +1,108 @@
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from prometheus_client import REGISTRY
+
+from quiz import exam_cache, singleflight
+from quiz.management.fixtures import create_exam, delete_exam
+
+
+def refreshes(name):
+    total = 0
+    for reason in ('miss', 'expired', 'early', 'timeout'):
+        total += REGISTRY.get_sample_value('quiz_cache_refreshes_total', {'cache': name, 'reason': reason}) or 0
+    return total
+
+
+class Command(BaseCommand):
+    help = 'Show how many times a value is recomputed when many requests miss the same cache key at once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=200)
+        parser.add_argument('--compute-ms', type=int, default=200, help='Time a recomputation takes')
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        compute_seconds = options['compute_ms'] / 1000
+        calls = []
+        calls_lock = threading.Lock()
+
+        def compute():
+            with calls_lock:
+                calls.append(1)
+            time.sleep(compute_seconds)
+            return 'value'
+
+        def plain_get(key):
+            # The usual get / compute / set, for comparison
+            value = cache.get(key)
+            if value is None:
+                value = compute()
+                cache.set(key, value, 60)
+            return value
+
+        def coalesced_get(key):
+            return singleflight.get_or_compute(key, compute, 60, name='benchmark')
+
+        run_id = uuid.uuid4().hex[:8]
+        scenarios = [
+            ('plain cache, cold key', plain_get, None),
+            ('single flight, cold key', coalesced_get, None),
+            ('single flight, soft-expired key', coalesced_get, 'stale'),
+        ]
+        for index, (label, get, state) in enumerate(scenarios):
+            key = f'benchmark:single-flight:{run_id}:{index}'
+            if state == 'stale':
+                # Past its soft expiry but inside the stale window
+                cache.set(key, ('old', time.time() - 1, compute_seconds), 60)
+            calls.clear()
+            latencies, results = self.stampede(threads, lambda: get(key))
+            self.report(label, threads, len(calls), latencies, results)
+            cache.delete(key)
+
+        # The real exam cache: every thread asks for the same cold question list
+        quiz, students = create_exam(run_id, 0, 50)
+        try:
+            exam_cache.invalidate(quiz.id)
+            before = refreshes('exam_questions')
+
+            def load_questions():
+                try:
+                    return len(exam_cache.get_questions(quiz.id))
+                finally:
+                    connection.close()
+
+            latencies, results = self.stampede(threads, load_questions)
+            self.report('exam_cache.get_questions, cold quiz', threads, int(refreshes('exam_questions') - before),
+                        latencies, results)
+        finally:
+            delete_exam(quiz, students)
+
+    def stampede(self, threads, call):
+        barrier = threading.Barrier(threads)
+        latencies = [0.0] * threads
+        results = [None] * threads
+
+        def worker(index):
+            barrier.wait()
+            started = time.perf_counter()
+            results[index] = call()
+            latencies[index] = time.perf_counter() - started
+
+        workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return sorted(latencies), results
+
+    def report(self, label, threads, recomputations, latencies, results):
+        style = self.style.SUCCESS if recomputations == 1 else self.style.WARNING
+        self.stdout.write(style(f'{label}: {recomputations} recomputation(s) for {threads} concurrent misses'))
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+        self.stdout.write(f'  latency p50 {p50:.0f} ms, p95 {p95:.0f} ms, distinct results {len(set(map(str, results)))}')
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.models import Quiz
+from quiz.regrade import regrade
+
+
+class Command(BaseCommand):
+    help = "Re-grade a quiz's completed attempts against its current answer key"
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_id', type=int)
+        parser.add_argument('--question', type=int, action='append', dest='questions', help='Only this question (repeatable)')
+        parser.add_argument('--dry-run', action='store_true', help='Report the score changes without saving them')
+
+    def handle(self, *args, **options):
+        try:
+            quiz = Quiz.objects.get(id=options['quiz_id'])
+        except Quiz.DoesNotExist:
+            raise CommandError(f'Quiz {options["quiz_id"]} does not exist')
+
+        report = regrade(quiz, question_ids=options['questions'], dry_run=options['dry_run'])
+        for attempt_id, username, old_score, new_score in report['score_changes']:
+            self.stdout.write(f'  attempt {attempt_id} ({username}): {old_score} -> {new_score}')
+        self.stdout.write(f'Questions re-graded:  {report["questions"]}')
+        self.stdout.write(f'Answer rows changed:  {report["answers_changed"]}')
+        self.stdout.write(f'Attempts changed:     {report["attempts_changed"]}')
+        summary = f'{len(report["score_changes"])} score(s) changed'
+        if report['dry_run']:
+            self.stdout.write(self.style.WARNING(f'Dry run: {summary}, nothing saved'))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from quiz.maintenance import run_maintenance
+
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions and abandoned attempts in batches, then refresh database statistics'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows per DELETE (default MAINTENANCE_BATCH_SIZE)')
+        parser.add_argument('--vacuum', action='store_true', help='Also VACUUM to reclaim space (locks SQLite while it runs)')
+
+    def handle(self, *args, **options):
+        report = run_maintenance(batch_size=options['batch_size'], vacuum=options['vacuum'])
+
+        self.stdout.write(f'Expired sessions deleted:  {report["sessions_deleted"]} ({report["sessions_seconds"]}s)')
+        self.stdout.write(f'Stale attempts purged:     {report["attempts_purged"]} ({report["attempts_seconds"]}s)')
+        self.stdout.write(f'Pending deletions done:    {report["deletions_finished"]} ({report["deletions_seconds"]}s)')
+        if report['optimized']:
+            action = 'VACUUM + ANALYZE' if report['vacuumed'] else 'ANALYZE'
+            self.stdout.write(f'{action}:{" " * (25 - len(action))} done ({report["optimize_seconds"]}s)')
+        else:
+            self.stdout.write('Statistics refresh:        not supported on this database')
+        self.stdout.write(self.style.SUCCESS(f'Maintenance finished in {report["total_seconds"]}s'))
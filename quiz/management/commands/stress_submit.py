@@ -0,0 +1,88 @@
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.test import Client
+from django.urls import reverse
+
+from quiz.management.fixtures import create_exam, delete_exam
+from quiz.models import QuizAttempt, StudentAnswer
+
+
+class Command(BaseCommand):
+    help = 'Submit a quiz from many concurrent students and count "database is locked" errors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--submitters', type=int, default=200)
+        parser.add_argument('--questions', type=int, default=20)
+        parser.add_argument(
+            '--duplicates', type=int, default=1,
+            help='Send each submission this many times at once, with the same submission key',
+        )
+        parser.add_argument('--keep', action='store_true', help='Keep the generated quiz and students')
+
+    def handle(self, *args, **options):
+        submitters = options['submitters']
+        duplicates = max(options['duplicates'], 1)
+        run_id = uuid.uuid4().hex[:8]
+
+        self.stdout.write(
+            f'Database: {connection.vendor}, {submitters} concurrent submitters, {duplicates} copies of each submit'
+        )
+        quiz, students = create_exam(run_id, submitters, options['questions'], with_attempts=True)
+
+        attempts = {
+            attempt.student_id: attempt
+            for attempt in QuizAttempt.objects.filter(quiz=quiz)
+        }
+        post_data = {f'question_{qid}': 'A' for qid in quiz.questions.values_list('id', flat=True)}
+
+        # Log every student in up front so only the submits run concurrently
+        clients = []
+        for student in students:
+            client = Client()
+            client.force_login(student)
+            for _ in range(duplicates):
+                clients.append((client, attempts[student.id]))
+        connection.close()
+
+        barrier = threading.Barrier(len(clients))
+        results = {'ok': 0, 'locked': 0, 'other': 0}
+        results_lock = threading.Lock()
+
+        def submit(client, attempt):
+            try:
+                barrier.wait()
+                data = dict(post_data, submission_key=f'{run_id}-{attempt.id}')
+                response = client.post(reverse('submit_quiz', args=[attempt.id]), data)
+                outcome = 'ok' if response.status_code == 302 else 'other'
+            except OperationalError as exc:
+                outcome = 'locked' if 'locked' in str(exc) else 'other'
+            except Exception:
+                outcome = 'other'
+            finally:
+                connection.close()
+            with results_lock:
+                results[outcome] += 1
+
+        threads = [threading.Thread(target=submit, args=pair) for pair in clients]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        graded = QuizAttempt.objects.filter(quiz=quiz, is_completed=True).count()
+        answer_rows = StudentAnswer.objects.filter(attempt__quiz=quiz).count()
+        self.stdout.write(f'  elapsed: {elapsed:.2f}s')
+        self.stdout.write(f'  successful submits: {results["ok"]}, graded attempts: {graded}')
+        self.stdout.write(f'  answer rows: {answer_rows}')
+        self.stdout.write(f'  other errors: {results["other"]}')
+        style = self.style.SUCCESS if results['locked'] == 0 else self.style.ERROR
+        self.stdout.write(style(f'  "database is locked" errors: {results["locked"]}'))
+
+        if not options['keep']:
+            delete_exam(quiz, students)
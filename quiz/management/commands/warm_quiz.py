@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.warming import upcoming_quiz_ids, warm_quiz
+
+
+class Command(BaseCommand):
+    help = 'Preload quizzes into the caches before an exam (quiz, questions, leaderboard, waiting room, templates)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_ids', nargs='*', type=int)
+        parser.add_argument(
+            '--upcoming', type=int, metavar='MINUTES',
+            help='Also warm every active quiz that starts within this many minutes (for cron)',
+        )
+
+    def handle(self, *args, **options):
+        quiz_ids = list(options['quiz_ids'])
+        if options['upcoming'] is not None:
+            quiz_ids += [quiz_id for quiz_id in upcoming_quiz_ids(options['upcoming']) if quiz_id not in quiz_ids]
+        if not quiz_ids and options['upcoming'] is None:
+            raise CommandError('Give one or more quiz ids, or --upcoming MINUTES')
+
+        for quiz_id in quiz_ids:
+            report = warm_quiz(quiz_id)
+            if not report['found']:
+                self.stderr.write(self.style.ERROR(f'Quiz {quiz_id} does not exist'))
+                continue
+            self.stdout.write(f'Quiz {quiz_id} "{report["title"]}"')
+            for name, detail, seconds in report['steps']:
+                self.stdout.write(f'  {name + ":":<14} {detail} ({seconds * 1000:.1f} ms)')
+            self.stdout.write(self.style.SUCCESS(f'  warmed in {report["total_seconds"] * 1000:.1f} ms'))
+        if not quiz_ids:
+            self.stdout.write('No quizzes start in that window')
@@ -0,0 +1,34 @@
+"""Throwaway exam data for the benchmark and stress-test management commands."""
+from quiz.models import User, Quiz, Question, QuizAttempt
+
+
+def create_exam(run_id, student_count, question_count, with_attempts=False):
+    admin = User.objects.create(username=f'bench_admin_{run_id}', role='admin', phone='0', password='!')
+    quiz = Quiz.objects.create(title=f'Benchmark {run_id}', description='Generated by a benchmark command', created_by=admin)
+    Question.objects.bulk_create([
+        Question(
+            quiz=quiz, question_text=f'Question {i}', option_a='A', option_b='B',
+            option_c='C', option_d='D', correct_answer='A', order=i,
+        )
+        for i in range(question_count)
+    ])
+
+    # Unusable password hashes keep setup fast
+    User.objects.bulk_create([
+        User(username=f'bench_{run_id}_{i}', role='student', phone=str(i), password='!')
+        for i in range(student_count)
+    ])
+    students = list(User.objects.filter(username__startswith=f'bench_{run_id}_'))
+
+    if with_attempts:
+        question_order = ','.join(str(qid) for qid in quiz.questions.values_list('id', flat=True))
+        QuizAttempt.objects.bulk_create([
+            QuizAttempt(student=student, quiz=quiz, total_marks=question_count, question_order=question_order)
+            for student in students
+        ])
+    return quiz, students
+
+
+def delete_exam(quiz, students):
+    User.objects.filter(id__in=[student.id for student in students]).delete()
+    quiz.created_by.delete()
@@ -0,0 +1,67 @@
+"""
+Prometheus metrics for the exam-critical paths, served at /metrics.
+
+The collectors are prometheus_client counters and histograms, which are
+thread-safe and cheap to update. With several worker processes (gunicorn or
+uvicorn --workers), point PROMETHEUS_MULTIPROC_DIR at an empty directory
+before the workers start: each process then writes its samples to mmap'd
+files there and /metrics merges them, whichever worker serves the scrape.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+# Grading and exports are expected in the tens of milliseconds to seconds
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+LOGINS = Counter(
+    'quiz_logins_total', 'Login attempts by outcome', ['outcome'],
+)
+ATTEMPTS_STARTED = Counter(
+    'quiz_attempts_started_total', 'Quiz attempts created by take_quiz',
+)
+SUBMISSIONS_GRADED = Counter(
+    'quiz_submissions_graded_total', 'Submissions graded by submit_quiz',
+)
+GRADING_SECONDS = Histogram(
+    'quiz_submit_grading_seconds', 'Time to grade and save a submission',
+    buckets=LATENCY_BUCKETS,
+)
+EXPORT_SECONDS = Histogram(
+    'quiz_export_seconds', 'Time to build an export document', ['export_type'],
+    buckets=LATENCY_BUCKETS,
+)
+MAINTENANCE_ROWS_DELETED = Counter(
+    'quiz_maintenance_rows_deleted_total', 'Rows removed by maintenance runs', ['task'],
+)
+MAINTENANCE_SECONDS = Histogram(
+    'quiz_maintenance_run_seconds', 'Duration of a full maintenance run',
+    buckets=LATENCY_BUCKETS + (60, 300),
+)
+CACHE_REQUESTS = Counter(
+    'quiz_cache_requests_total', 'Cache lookups by cache and result (hit or miss)', ['cache', 'result'],
+)
+CACHE_REFRESHES = Counter(
+    'quiz_cache_refreshes_total', 'Cached values recomputed, by cache and reason', ['cache', 'reason'],
+)
+
+
+def multiprocess_enabled():
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+def record_cache(cache_name, hit):
+    CACHE_REQUESTS.labels(cache_name, 'hit' if hit else 'miss').inc()
+
+
+def render():
+    """Return (body, content_type) for the metrics endpoint"""
+    if multiprocess_enabled():
+        # Merge the files written by every worker process
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
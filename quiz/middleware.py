@@ -0,0 +1,283 @@
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from . import metrics
+from . import profiling
+from . import ratelimit
+from . import routers
+
+
+class ReplicaStickinessMiddleware:
+    """Keep a user's reads on the primary for a short while after they write"""
+
+    cookie_name = 'replica_pin'
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        tokens = self.start(request)
+        try:
+            response = self.get_response(request)
+            self.finish(response)
+        finally:
+            self.reset(tokens)
+        return response
+
+    async def __acall__(self, request):
+        tokens = self.start(request)
+        try:
+            response = await self.get_response(request)
+            self.finish(response)
+        finally:
+            self.reset(tokens)
+        return response
+
+    def start(self, request):
+        pinned_until = request.COOKIES.get(self.cookie_name, '')
+        pinned = pinned_until.isdigit() and int(pinned_until) > time.time()
+        return routers._pinned_to_primary.set(pinned), routers._wrote.set(False)
+
+    def finish(self, response):
+        if routers._wrote.get() and routers.replica_configured():
+            sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+            response.set_cookie(
+                self.cookie_name,
+                str(int(time.time()) + sticky_seconds),
+                max_age=sticky_seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+
+    def reset(self, tokens):
+        pinned_token, wrote_token = tokens
+        routers._pinned_to_primary.reset(pinned_token)
+        routers._wrote.reset(wrote_token)
+
+
+class ConditionalGetStatsMiddleware:
+    """Count conditional-GET hits (304) and misses on pages that send validators"""
+
+    sync_capable = True
+    async_capable = True
+
+    _lock = threading.Lock()
+    _counts = {'hits': 0, 'misses': 0}
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        self.record(response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        self.record(response)
+        return response
+
+    @classmethod
+    def record(cls, response):
+        if response.status_code == 304:
+            key = 'hits'
+        elif response.status_code == 200 and (response.has_header('ETag') or response.has_header('Last-Modified')):
+            key = 'misses'
+        else:
+            return
+        with cls._lock:
+            cls._counts[key] += 1
+        metrics.record_cache('conditional_get', key == 'hits')
+
+    @classmethod
+    def stats(cls):
+        with cls._lock:
+            hits, misses = cls._counts['hits'], cls._counts['misses']
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else 0,
+        }
+
+
+class RequestProfilingMiddleware:
+    """Profile a sample of requests; see quiz/profiling.py"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.01)
+        profiling.install()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        token = profiling.start()
+        response = None
+        try:
+            response = self.get_response(request)
+        finally:
+            profiling.finish(token, request, response)
+        return response
+
+    async def __acall__(self, request):
+        if random.random() >= self.sample_rate:
+            return await self.get_response(request)
+
+        token = profiling.start()
+        response = None
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiling.finish(token, request, response)
+        return response
+
+
+class RateLimitMiddleware:
+    """
+    Answer over-limit login and registration POSTs with 429.
+
+    Sits ahead of the session and auth middleware, so a rejected request
+    never touches the database or hashes a password.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.check(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.check(request) or await self.get_response(request)
+
+    def check(self, request):
+        if request.method != 'POST':
+            return None
+        if request.path_info == reverse('login'):
+            response = ratelimit.check_login(request)
+            if response is not None:
+                metrics.LOGINS.labels('rate_limited').inc()
+            return response
+        if request.path_info == reverse('register'):
+            return ratelimit.check_register(request)
+        return None
+
+
+class CompressionMiddleware:
+    """
+    Compress HTML and JSON responses of COMPRESSION_MIN_SIZE bytes or more.
+
+    Brotli is used when the ``brotli`` package is installed and the browser
+    accepts it, gzip otherwise. Exports (xlsx, pdf, docx) are already
+    compressed or binary, and streaming responses are sent as they are
+    produced, so both are left alone. As in Django's GZipMiddleware, gzip
+    output gets random padding against BREACH and strong ETags are weakened,
+    which the conditional-GET checks still match.
+
+    Brotli output is not padded: the format has no field that can hold it,
+    like gzip's file name, and padding the page itself would change the
+    body. That padding is only a hardening, though. The secret BREACH goes
+    after on these pages is the CSRF token, and Django masks it
+    differently on every response. The session id travels in a cookie,
+    which is never compressed.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    content_types = ('text/html', 'application/json')
+    brotli_quality = 5  # 11 is far too slow to run on every response
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'COMPRESSION_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    @staticmethod
+    def accepted_encodings(request):
+        encodings = set()
+        for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+            coding, _, params = part.partition(';')
+            if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+                encodings.add(coding.strip().lower())
+        return encodings
+
+    def compress(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if response.get('Content-Type', '').split(';')[0].strip() not in self.content_types:
+            return response
+        if len(response.content) < self.min_size:
+            return response
+
+        # Caches must keep the compressed and plain copies apart
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encodings = self.accepted_encodings(request)
+        if brotli is not None and 'br' in encodings:
+            encoding, compressed = 'br', brotli.compress(response.content, quality=self.brotli_quality)
+        elif 'gzip' in encodings:
+            encoding, compressed = 'gzip', compress_string(response.content, max_random_bytes=100)
+        else:
+            return response
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0004_quizattempt_question_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='result_snapshot',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0005_quizattempt_result_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['-started_at', '-id'], name='quiz_attempt_started_idx'),
+        ),
+    ]
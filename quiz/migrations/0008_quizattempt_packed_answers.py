@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0007_soft_delete_flags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='answer_vector',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quizattempt',
+            name='correct_bitmap',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
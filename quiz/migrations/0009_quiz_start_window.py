@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0008_quizattempt_packed_answers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='end_time',
+            field=models.DateTimeField(blank=True, help_text='When the quiz stops accepting new attempts', null=True),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='start_time',
+            field=models.DateTimeField(blank=True, help_text='When students may start the quiz', null=True),
+        ),
+    ]
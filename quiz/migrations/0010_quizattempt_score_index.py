@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0009_quiz_start_window'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['quiz', 'is_completed', 'score'], name='quiz_attempt_score_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+def flag_questions_of_deleted_quizzes(apps, schema_editor):
+    # Quizzes flagged before questions had the flag are still waiting to be purged
+    Question = apps.get_model('quiz', 'Question')
+    Question.objects.filter(quiz__is_deleted=True).update(is_deleted=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0010_quizattempt_score_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='is_deleted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(flag_questions_of_deleted_quizzes, migrations.RunPython.noop),
+    ]
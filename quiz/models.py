@@ -1,7 +1,19 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.core.validators import MinLengthValidator
 
+# Objects marked for background deletion (see quiz/deletion.py) are hidden
+# from the default managers; all_objects still sees them
+class ActiveUserManager(UserManager):
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
+class ActiveManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 # Custom User Model
 class User(AbstractUser):
     ROLE_CHOICES = (
@@ -15,7 +27,18 @@ class User(AbstractUser):
     # Student-specific fields
     roll_number = models.CharField(max_length=20, blank=True, null=True)
     branch = models.CharField(max_length=100, blank=True, null=True)
+    is_deleted = models.BooleanField(default=False)
+    
+    objects = ActiveUserManager()
+    all_objects = UserManager()
     
+    def get_session_auth_hash(self):
+        # Users loaded from the cache (quiz/backends.py) carry the hash instead
+        # of the password; once the password is loaded or set it is used again
+        if 'password' in self.get_deferred_fields() and hasattr(self, 'cached_session_auth_hash'):
+            return self.cached_session_auth_hash
+        return super().get_session_auth_hash()
+
     def __str__(self):
         return f"{self.username} ({self.role})"
 
@@ -29,6 +52,13 @@ class Quiz(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     time_limit = models.IntegerField(help_text="Time limit in minutes", default=30)
     is_active = models.BooleanField(default=True)
+    # Optional start window; see quiz/admission.py
+    start_time = models.DateTimeField(blank=True, null=True, help_text="When students may start the quiz")
+    end_time = models.DateTimeField(blank=True, null=True, help_text="When the quiz stops accepting new attempts")
+    is_deleted = models.BooleanField(default=False)
+    
+    objects = ActiveManager()
+    all_objects = models.Manager()
     
     class Meta:
         verbose_name_plural = "Quizzes"
@@ -54,6 +84,11 @@ class Question(models.Model):
     ])
     marks = models.IntegerField(default=1)
     order = models.IntegerField(default=0)
+    # Set together with the quiz's flag
+    is_deleted = models.BooleanField(default=False)
+    
+    objects = ActiveManager()
+    all_objects = models.Manager()
     
     class Meta:
         ordering = ['order', 'id']
@@ -72,10 +107,26 @@ class QuizAttempt(models.Model):
     total_marks = models.IntegerField(default=0)
     is_completed = models.BooleanField(default=False)
     question_order = models.TextField(blank=True, null=True)
+    # Frozen questions and answers captured at grading time (see quiz/results.py)
+    result_snapshot = models.JSONField(blank=True, null=True)
+    # Packed answers aligned to question_order (see quiz/answer_store.py)
+    answer_vector = models.TextField(blank=True, null=True)
+    correct_bitmap = models.BinaryField(blank=True, null=True)
+    # Set together with the quiz's or student's flag
+    is_deleted = models.BooleanField(default=False)
+    
+    objects = ActiveManager()
+    all_objects = models.Manager()
     
     class Meta:
         unique_together = ('student', 'quiz')
         ordering = ['-started_at']
+        indexes = [
+            # Newest-first listings (admin changelist adds the id tie-breaker)
+            models.Index(fields=['-started_at', '-id'], name='quiz_attempt_started_idx'),
+            # Score order within a quiz's completed attempts (quiz/stats.py percentiles)
+            models.Index(fields=['quiz', 'is_completed', 'score'], name='quiz_attempt_score_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.username} - {self.quiz.title}"
@@ -0,0 +1,180 @@
+"""
+Sampled per-request profiling.
+
+RequestProfilingMiddleware (quiz/middleware.py) picks a fraction of requests
+and records wall time, DB query count and time, template render time and
+repeated queries for each. Repeats are queries with identical SQL run more
+than once in one request, which is how a per-question
+``Question.objects.get`` loop shows up. Samples are aggregated per view in
+memory, logged as one JSON line each on the ``quiz.profiling`` logger, and
+shown to admins at profiling-stats/.
+"""
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends import django as django_backend
+
+logger = logging.getLogger(__name__)
+
+# The sample being recorded for the current request, if any. Context
+# variables follow the request into sync_to_async worker threads, so
+# async views are covered too.
+_current = ContextVar('quiz_profiling_sample', default=None)
+
+_stats = {}
+_stats_lock = threading.Lock()
+_install_lock = threading.Lock()
+_installed = False
+
+
+class Sample:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+        self.queries = Counter()
+
+    def duplicates(self):
+        return {sql: count for sql, count in self.queries.items() if count > 1}
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    sample = _current.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.query_time += time.perf_counter() - started
+        sample.query_count += 1
+        # Parameters are passed separately, so the same query shape has the same SQL
+        sample.queries[sql] += 1
+
+
+def _wrap_connection(connection):
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    _wrap_connection(connection)
+
+
+def install():
+    """Hook the query and template timers in; safe to call more than once"""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        connection_created.connect(_on_connection_created, dispatch_uid='quiz_profiling')
+        for connection in connections.all(initialized_only=True):
+            _wrap_connection(connection)
+
+        # Time the outermost render of each template (includes and extends
+        # are part of it)
+        original_render = django_backend.Template.render
+
+        def render(self, context=None, request=None):
+            sample = _current.get()
+            if sample is None:
+                return original_render(self, context, request)
+            started = time.perf_counter()
+            try:
+                return original_render(self, context, request)
+            finally:
+                sample.template_time += time.perf_counter() - started
+
+        django_backend.Template.render = render
+        _installed = True
+
+
+def start():
+    return _current.set(Sample())
+
+
+def finish(token, request, response):
+    sample = _current.get()
+    _current.reset(token)
+    if sample is None:
+        return
+
+    wall_time = time.perf_counter() - sample.started
+    match = getattr(request, 'resolver_match', None)
+    view = match.view_name if match else 'unresolved'
+    duplicates = sample.duplicates()
+    duplicate_count = sum(count - 1 for count in duplicates.values())
+    worst_duplicate = max(duplicates, key=duplicates.get) if duplicates else None
+
+    with _stats_lock:
+        entry = _stats.setdefault(view, {
+            'samples': 0,
+            'wall_ms_total': 0.0,
+            'wall_ms_max': 0.0,
+            'queries_total': 0,
+            'query_ms_total': 0.0,
+            'template_ms_total': 0.0,
+            'duplicate_queries_total': 0,
+            'worst_duplicate': None,
+            'worst_duplicate_count': 0,
+        })
+        entry['samples'] += 1
+        entry['wall_ms_total'] += wall_time * 1000
+        entry['wall_ms_max'] = max(entry['wall_ms_max'], wall_time * 1000)
+        entry['queries_total'] += sample.query_count
+        entry['query_ms_total'] += sample.query_time * 1000
+        entry['template_ms_total'] += sample.template_time * 1000
+        entry['duplicate_queries_total'] += duplicate_count
+        if worst_duplicate and duplicates[worst_duplicate] > entry['worst_duplicate_count']:
+            entry['worst_duplicate'] = worst_duplicate
+            entry['worst_duplicate_count'] = duplicates[worst_duplicate]
+
+    logger.info(json.dumps({
+        'event': 'request_profile',
+        'view': view,
+        'method': request.method,
+        'status': response.status_code if response is not None else None,
+        'wall_ms': round(wall_time * 1000, 2),
+        'queries': sample.query_count,
+        'query_ms': round(sample.query_time * 1000, 2),
+        'template_ms': round(sample.template_time * 1000, 2),
+        'duplicate_queries': duplicate_count,
+        'worst_duplicate': worst_duplicate,
+    }))
+
+
+def get_stats():
+    """Per-view averages over the samples taken by this worker process"""
+    with _stats_lock:
+        entries = {view: dict(entry) for view, entry in _stats.items()}
+
+    views = []
+    for view, entry in entries.items():
+        samples = entry['samples']
+        views.append({
+            'view': view,
+            'samples': samples,
+            'avg_wall_ms': round(entry['wall_ms_total'] / samples, 2),
+            'max_wall_ms': round(entry['wall_ms_max'], 2),
+            'avg_queries': round(entry['queries_total'] / samples, 2),
+            'avg_query_ms': round(entry['query_ms_total'] / samples, 2),
+            'avg_template_ms': round(entry['template_ms_total'] / samples, 2),
+            'avg_duplicate_queries': round(entry['duplicate_queries_total'] / samples, 2),
+            'worst_duplicate': entry['worst_duplicate'],
+            'worst_duplicate_count': entry['worst_duplicate_count'],
+        })
+    # Views that account for the most total time first
+    views.sort(key=lambda v: v['avg_wall_ms'] * v['samples'], reverse=True)
+    return views
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,135 @@
+"""
+Cache-backed rate limits for login and registration.
+
+Each limit is a bucket of ``count`` tokens that refills over ``period``
+seconds. Token use is counted with ``cache.incr`` in fixed windows of one
+period, and the previous window is weighted by how much of it still overlaps
+the last ``period`` seconds. That approximates a continuously refilling
+bucket with only atomic increments, so concurrent workers never race on
+read-modify-write.
+
+RateLimitMiddleware runs the checks ahead of the session and auth
+middleware, so a rejected request costs a couple of cache operations and no
+database or password-hashing work. Limits are shared between workers when
+the cache is (Redis, Memcached, database); with the default local-memory
+cache each worker process keeps its own counters.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+
+def parse_rate(rate):
+    """'20/60' -> (20, 60): 20 tokens refilled every 60 seconds"""
+    count, period = rate.split('/')
+    return int(count), int(period)
+
+
+def client_ip(request):
+    if getattr(settings, 'RATE_LIMIT_TRUST_X_FORWARDED_FOR', False):
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            # The left-most address is the original client
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _keys(scope, identifier, period, now):
+    digest = hashlib.sha1(identifier.encode(), usedforsecurity=False).hexdigest()
+    window = int(now // period)
+    return f'ratelimit:{scope}:{digest}:{window}', f'ratelimit:{scope}:{digest}:{window - 1}', window
+
+
+def _used(current, previous, window, period, now):
+    # Share of the previous window still inside the last `period` seconds
+    overlap = 1 - (now - window * period) / period
+    return current + previous * overlap
+
+
+class RateLimit:
+    def __init__(self, scope, rate):
+        self.scope = scope
+        self.count, self.period = parse_rate(rate)
+
+    def _state(self, identifier, now):
+        current_key, previous_key, window = _keys(self.scope, identifier, self.period, now)
+        counts = cache.get_many([current_key, previous_key])
+        return current_key, counts.get(current_key, 0), counts.get(previous_key, 0), window
+
+    def retry_after(self, identifier):
+        """Seconds until a token is free, or 0 if one is available now"""
+        now = time.time()
+        _, current, previous, window = self._state(identifier, now)
+        if _used(current, previous, window, self.period, now) < self.count:
+            return 0
+        return max(1, int((window + 1) * self.period - now))
+
+    def consume(self, identifier):
+        """Take a token; returns retry_after, 0 if the request may proceed"""
+        now = time.time()
+        current_key, current, previous, window = self._state(identifier, now)
+        if _used(current, previous, window, self.period, now) >= self.count:
+            return max(1, int((window + 1) * self.period - now))
+
+        # Counters outlive their window by one period so they can be weighted
+        cache.add(current_key, 0, self.period * 2)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr(); start the window again
+            cache.set(current_key, 1, self.period * 2)
+            current = 1
+        # The check above can pass in several workers at once; the count incr()
+        # returned includes all of them, so it has the final say
+        if _used(current, previous, window, self.period, now) > self.count:
+            try:
+                cache.decr(current_key)
+            except ValueError:
+                pass
+            return max(1, int((window + 1) * self.period - now))
+        return 0
+
+
+def _limit(name):
+    return RateLimit(name, settings.RATE_LIMITS[name])
+
+
+def enabled():
+    return getattr(settings, 'RATE_LIMIT_ENABLED', True)
+
+
+def too_many_requests(retry_after):
+    response = HttpResponse(
+        'Too many attempts. Please wait a moment and try again.',
+        status=429, content_type='text/plain',
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def check_login(request):
+    """Per-IP limit on login POSTs, plus a lockout for usernames with too many failures"""
+    if not enabled():
+        return None
+    retry_after = _limit('login_ip').consume(client_ip(request))
+    if not retry_after:
+        username = (request.POST.get('username') or '').strip().lower()
+        if username:
+            retry_after = _limit('login_failures').retry_after(username)
+    return too_many_requests(retry_after) if retry_after else None
+
+
+def record_login_failure(request):
+    username = (request.POST.get('username') or '').strip().lower()
+    if enabled() and username:
+        _limit('login_failures').consume(username)
+
+
+def check_register(request):
+    if not enabled():
+        return None
+    retry_after = _limit('register_ip').consume(client_ip(request))
+    return too_many_requests(retry_after) if retry_after else None
@@ -0,0 +1,242 @@
+"""
+Re-grading after an answer key is corrected.
+
+When a question's correct_answer (or marks) changes, the graded attempts of
+its quiz are brought up to date inside one transaction:
+
+- StudentAnswer.is_correct is flipped with at most two UPDATEs per answer
+  letter, touching only the rows whose flag actually changes.
+- Attempts with a packed answer vector (see answer_store) have their
+  correctness bitmap, score, total marks and result snapshot recomputed in
+  Python, in batches of REGRADE_BATCH_SIZE attempts, and written back with
+  one executemany() per batch.
+- Older attempts without a vector get their score and total marks rebuilt
+  from their StudentAnswer rows by one aggregate query, which grades the
+  regraded questions from selected_answer, and their snapshot is cleared so
+  quiz_result rebuilds it.
+
+With dry_run the new scores are computed from reads alone, outside any
+transaction, so a preview never takes the write lock.
+"""
+import operator
+from contextlib import nullcontext
+from functools import reduce
+
+from django.db import connections, router, transaction
+from django.db.models import Exists, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Question, QuizAttempt, StudentAnswer
+from . import leaderboard
+from . import results
+
+REGRADE_BATCH_SIZE = 1000
+
+
+def _by_letter(key):
+    questions_by_letter = {}
+    for question_id, (letter, _) in key.items():
+        questions_by_letter.setdefault(letter, []).append(question_id)
+    return questions_by_letter
+
+
+def _regrade_rows(key, dry_run=False):
+    """Flip StudentAnswer.is_correct for the questions in key; returns rows changed"""
+    changed = 0
+    for letter, question_ids in _by_letter(key).items():
+        answers = StudentAnswer.objects.filter(question_id__in=question_ids)
+        to_correct = answers.filter(selected_answer=letter, is_correct=False)
+        # exclude() keeps unanswered (NULL) rows, which are never correct
+        to_wrong = answers.filter(is_correct=True).exclude(selected_answer=letter)
+        if dry_run:
+            changed += to_correct.count() + to_wrong.count()
+        else:
+            changed += to_correct.update(is_correct=True)
+            changed += to_wrong.update(is_correct=False)
+    return changed
+
+
+def _patch_snapshot(snapshot, positions, key, bitmap):
+    """Update the snapshot rows of regraded questions in place; None if it can't be patched"""
+    if not snapshot or snapshot.get('version') != results.SNAPSHOT_VERSION:
+        return None
+    rows = snapshot['answers']
+    for index, question_id in positions:
+        if index >= len(rows):
+            return None
+        letter, marks = key[question_id]
+        rows[index]['question']['correct_answer'] = letter
+        rows[index]['question']['marks'] = marks
+        rows[index]['is_correct'] = bool(bitmap[index // 8] >> (index % 8) & 1)
+    correct_count = sum(1 for row in rows if row['is_correct'])
+    unanswered_count = sum(1 for row in rows if not row['is_correct'] and row['selected_answer'] is None)
+    snapshot['correct_count'] = correct_count
+    snapshot['unanswered_count'] = unanswered_count
+    snapshot['wrong_count'] = len(rows) - correct_count - unanswered_count
+    return snapshot
+
+
+def _snapshot_stale(snapshot, positions, key):
+    """True if the snapshot shows another correct answer or marks for a regraded question"""
+    rows = (snapshot or {}).get('answers') or []
+    return any(
+        index < len(rows)
+        and (rows[index]['question']['correct_answer'], rows[index]['question']['marks']) != key[question_id]
+        for index, question_id in positions
+    )
+
+
+def _regrade_packed(quiz, key, marks, dry_run=False):
+    """Recompute bitmaps and scores of packed attempts; returns {attempt_id: new score} of those changed"""
+    changed = {}
+    attempts = QuizAttempt.objects.filter(
+        quiz=quiz, is_completed=True, answer_vector__isnull=False,
+    ).only(
+        'id', 'question_order', 'answer_vector', 'correct_bitmap', 'score', 'total_marks', 'result_snapshot',
+    ).order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(attempts.filter(pk__gt=last_pk)[:REGRADE_BATCH_SIZE])
+        if not batch:
+            return changed
+        last_pk = batch[-1].pk
+
+        updated = []
+        for attempt in batch:
+            question_ids = [int(qid) for qid in attempt.question_order.split(',')] if attempt.question_order else []
+            bitmap = bytearray(attempt.correct_bitmap or b'')
+            bitmap.extend(bytes(max(0, (len(question_ids) + 7) // 8 - len(bitmap))))
+            positions = []
+            for index, (question_id, selected) in enumerate(zip(question_ids, attempt.answer_vector)):
+                if question_id not in key:
+                    continue
+                positions.append((index, question_id))
+                if selected == key[question_id][0]:
+                    bitmap[index // 8] |= 1 << (index % 8)
+                else:
+                    bitmap[index // 8] &= ~(1 << (index % 8))
+            if not positions:
+                continue
+
+            # Deleted questions no longer count, as with the StudentAnswer rows
+            score = sum(
+                marks.get(question_id, 0)
+                for index, question_id in enumerate(question_ids)
+                if bitmap[index // 8] >> (index % 8) & 1
+            )
+            total_marks = sum(marks.get(question_id, 0) for question_id in question_ids)
+            bitmap = bytes(bitmap)
+            if (
+                score == attempt.score and total_marks == attempt.total_marks
+                and bitmap == bytes(attempt.correct_bitmap or b'')
+                and not _snapshot_stale(attempt.result_snapshot, positions, key)
+            ):
+                continue
+            attempt.score = score
+            attempt.total_marks = total_marks
+            attempt.correct_bitmap = bitmap
+            attempt.result_snapshot = _patch_snapshot(attempt.result_snapshot, positions, key, bitmap)
+            updated.append(attempt)
+            changed[attempt.pk] = score
+
+        if not dry_run:
+            _save_attempts(updated, ('score', 'total_marks', 'correct_bitmap', 'result_snapshot'))
+
+
+def _save_attempts(attempts, names):
+    # bulk_update() builds a CASE WHEN per field and row, which costs more
+    # than the regrading itself; a prepared UPDATE run per row does not
+    if not attempts:
+        return
+    connection = connections[router.db_for_write(QuizAttempt)]
+    fields = [QuizAttempt._meta.get_field(name) for name in names]
+    quote = connection.ops.quote_name
+    sql = 'UPDATE {} SET {} WHERE {} = %s'.format(
+        quote(QuizAttempt._meta.db_table),
+        ', '.join(f'{quote(field.column)} = %s' for field in fields),
+        quote(QuizAttempt._meta.pk.column),
+    )
+    params = [
+        [field.get_db_prep_save(getattr(attempt, field.attname), connection) for field in fields] + [attempt.pk]
+        for attempt in attempts
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def _regrade_legacy(quiz, key, dry_run=False):
+    """
+    Rebuild scores of attempts graded before packed vectors that answered a
+    regraded question; returns {attempt_id: new score} of those rewritten.
+
+    The regraded questions are graded from selected_answer rather than
+    is_correct, so this gives the same result before or without the flips
+    _regrade_rows makes.
+    """
+    correct = reduce(operator.or_, [
+        Q(question_id__in=question_ids, selected_answer=letter)
+        for letter, question_ids in _by_letter(key).items()
+    ], Q(is_correct=True) & ~Q(question_id__in=list(key)))
+    rows = StudentAnswer.objects.filter(attempt=OuterRef('pk')).order_by().values('attempt')
+    attempts = QuizAttempt.objects.filter(quiz=quiz, is_completed=True, answer_vector__isnull=True).annotate(
+        new_score=Coalesce(Subquery(rows.filter(correct).annotate(total=Sum('question__marks')).values('total')), 0),
+        new_total=Coalesce(Subquery(rows.annotate(total=Sum('question__marks')).values('total')), 0),
+    ).filter(
+        # Their snapshots show the old key, so all of them are rewritten
+        Exists(rows.filter(question_id__in=list(key)))
+    ).values_list('id', 'new_score', 'new_total')
+
+    changed = {}
+    updated = []
+    for attempt_id, score, total_marks in attempts.iterator():
+        changed[attempt_id] = score
+        updated.append(QuizAttempt(id=attempt_id, score=score, total_marks=total_marks, result_snapshot=None))
+    if not dry_run:
+        for start in range(0, len(updated), REGRADE_BATCH_SIZE):
+            _save_attempts(updated[start:start + REGRADE_BATCH_SIZE], ('score', 'total_marks', 'result_snapshot'))
+    return changed
+
+
+def regrade(quiz, question_ids=None, dry_run=False):
+    """
+    Re-grade the quiz's completed attempts against the current answer key,
+    for all questions or only question_ids. Returns a report with the score
+    changes as (attempt_id, username, old_score, new_score).
+    """
+    questions = Question.objects.filter(quiz=quiz)
+    if question_ids is not None:
+        questions = questions.filter(id__in=question_ids)
+    key = {
+        question_id: (letter, question_marks)
+        for question_id, letter, question_marks in questions.values_list('id', 'correct_answer', 'marks')
+    }
+    marks = dict(Question.objects.filter(quiz=quiz).values_list('id', 'marks'))
+    completed = QuizAttempt.objects.filter(quiz=quiz, is_completed=True)
+
+    # A dry run only reads, so it stays out of the write transaction
+    with nullcontext() if dry_run else transaction.atomic():
+        old_scores = list(completed.values_list('id', 'student__username', 'score'))
+        new_scores = {}
+        answers_changed = 0
+        if key:
+            new_scores.update(_regrade_legacy(quiz, key, dry_run))
+            answers_changed = _regrade_rows(key, dry_run)
+            new_scores.update(_regrade_packed(quiz, key, marks, dry_run))
+        attempts_changed = len(new_scores)
+
+        score_changes = [
+            (attempt_id, username, score, new_scores[attempt_id])
+            for attempt_id, username, score in old_scores
+            if new_scores.get(attempt_id, score) != score
+        ]
+        if not dry_run and attempts_changed:
+            transaction.on_commit(lambda: leaderboard.invalidate(quiz.id))
+
+    return {
+        'quiz_id': quiz.id,
+        'questions': len(key),
+        'dry_run': dry_run,
+        'answers_changed': answers_changed,
+        'attempts_changed': attempts_changed,
+        'score_changes': score_changes,
+    }
@@ -0,0 +1,64 @@
+"""
+Frozen result snapshots for completed attempts.
+
+At grading time the questions, options, correct answers and the student's
+choices are serialized onto ``QuizAttempt.result_snapshot``. quiz_result
+renders from that single JSON value instead of joining every Question row
+on each view, and the page keeps showing what the student was graded
+against even if a question is edited later.
+"""
+from .models import StudentAnswer
+from . import answer_store
+
+SNAPSHOT_VERSION = 1
+
+
+def build_snapshot(answers):
+    """Build the snapshot from StudentAnswer objects with their questions loaded"""
+    rows = []
+    correct_count = 0
+    unanswered_count = 0
+    for answer in answers:
+        question = answer.question
+        if answer.is_correct:
+            correct_count += 1
+        elif answer.selected_answer is None:
+            unanswered_count += 1
+        rows.append({
+            'question': {
+                'question_text': question.question_text,
+                'option_a': question.option_a,
+                'option_b': question.option_b,
+                'option_c': question.option_c,
+                'option_d': question.option_d,
+                'correct_answer': question.correct_answer,
+                'marks': question.marks,
+            },
+            'selected_answer': answer.selected_answer,
+            'is_correct': answer.is_correct,
+        })
+
+    return {
+        'version': SNAPSHOT_VERSION,
+        'correct_count': correct_count,
+        'wrong_count': len(rows) - correct_count - unanswered_count,
+        'unanswered_count': unanswered_count,
+        'total_questions': len(rows),
+        'answers': rows,
+    }
+
+
+def get_snapshot(attempt):
+    """Return the attempt's snapshot, building it once for attempts graded before snapshots existed"""
+    snapshot = attempt.result_snapshot
+    if snapshot and snapshot.get('version') == SNAPSHOT_VERSION:
+        return snapshot
+
+    if answer_store.has_packed(attempt):
+        answers = answer_store.build_answers(attempt)
+    else:
+        answers = StudentAnswer.objects.filter(attempt=attempt).select_related('question').order_by('id')
+    snapshot = build_snapshot(answers)
+    attempt.result_snapshot = snapshot
+    attempt.save(update_fields=['result_snapshot'])
+    return snapshot
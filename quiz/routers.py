@@ -0,0 +1,55 @@
+"""
+Database routing for the optional read replica.
+
+Reads only go to the ``replica`` alias inside views wrapped with
+``read_from_replica`` (reporting pages and exports). Everything else, and every
+write, stays on ``default``. After a user writes, ``ReplicaStickinessMiddleware``
+pins that user's reads to the primary for ``REPLICA_STICKY_SECONDS`` so they
+always see their own changes even if the replica is lagging.
+"""
+import contextvars
+from functools import wraps
+
+from django.conf import settings
+
+REPLICA_ALIAS = 'replica'
+
+# Per-request routing state; contextvars keep it correct for threads and async tasks
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+_pinned_to_primary = contextvars.ContextVar('pinned_to_primary', default=False)
+_wrote = contextvars.ContextVar('wrote', default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def read_from_replica(view_func):
+    """Send the view's reads to the replica, unless the user was just writing"""
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        token = _use_replica.set(True)
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+    return _wrapped_view
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and not _pinned_to_primary.get() and replica_configured():
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data, so relations across them are fine
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives its schema through replication
+        return db != REPLICA_ALIAS
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import User, Quiz, Question
+from . import backends
+from . import exam_cache
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """Apply the SQLite production PRAGMAs to every new connection"""
+    if connection.vendor != 'sqlite' or not getattr(settings, 'SQLITE_TUNING', False):
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f'PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT * 1000)}')
+        cursor.execute(f'PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}')
+        cursor.execute(f'PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}')
+
+
+@receiver(request_started)
+def start_maintenance_runner(sender, **kwargs):
+    """Start the periodic maintenance thread in processes that serve requests"""
+    if settings.MAINTENANCE_INTERVAL > 0:
+        from .maintenance import start_periodic_runner
+        start_periodic_runner()
+
+
+@receiver([post_save, post_delete], sender=Quiz)
+def invalidate_cached_quiz(sender, instance, **kwargs):
+    """Drop the cached exam data of a saved or deleted quiz"""
+    exam_cache.invalidate(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_cached_questions(sender, instance, origin=None, **kwargs):
+    """A question changed, so its quiz's cached questions and answer key are stale"""
+    exam_cache.invalidate(instance.quiz_id)
+    if not isinstance(origin, Quiz):
+        # Other processes' copies are checked against the quiz's updated_at
+        Quiz.all_objects.filter(id=instance.quiz_id).update(updated_at=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the user's cached auth record, so the next request reloads it"""
+    backends.invalidate(instance.id)
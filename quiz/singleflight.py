@@ -0,0 +1,106 @@
+"""
+Single-flight cache reads for values that are expensive to rebuild.
+
+get_or_compute() stores each value with a soft expiry inside a longer cache
+timeout, and rebuilds it under a per-key lock taken with ``cache.add``:
+
+- On a miss only the lock holder runs ``compute``; everyone else waits for
+  its value (up to LOCK_TIMEOUT) instead of running the same queries.
+- After the soft expiry the value is stale for another ``stale_timeout``
+  seconds. One caller refreshes it while the rest are served the stale copy.
+- Before the soft expiry a caller may refresh early, with a probability that
+  grows as expiry nears and with how long the value took to compute
+  ("XFetch"), so hot keys are usually rebuilt before they ever go stale.
+
+The lock is only as shared as the cache: with the local-memory cache each
+worker process refreshes its own copy once.
+"""
+import math
+import random
+import time
+
+from django.core.cache import cache
+
+from . import metrics
+
+LOCK_TIMEOUT = 10  # seconds; also how long callers wait for a value being filled
+WAIT_INTERVAL = 0.02  # seconds between checks while waiting
+STALE_TIMEOUT = 60  # seconds a soft-expired value is still served
+EARLY_REFRESH_BETA = 1.0  # above 1 refreshes earlier, below 1 later
+
+
+def _lock_key(key):
+    return f'{key}:fill'
+
+
+def put(key, value, timeout, stale_timeout=STALE_TIMEOUT, compute_seconds=0):
+    """Store a value that is fresh for timeout seconds"""
+    cache.set(key, (value, time.time() + timeout, compute_seconds), timeout + stale_timeout)
+
+
+def replace(key, value, stale_timeout=STALE_TIMEOUT):
+    """Swap in a new value but keep the soft expiry; False if nothing is cached"""
+    entry = cache.get(key)
+    if entry is None:
+        return False
+    _, expires_at, compute_seconds = entry
+    cache.set(key, (value, expires_at, compute_seconds), max(expires_at - time.time(), 0) + stale_timeout)
+    return True
+
+
+def expire(key, stale_timeout=STALE_TIMEOUT):
+    """Mark the value stale, so the next reader rebuilds it while others get this copy"""
+    entry = cache.get(key)
+    if entry is not None:
+        cache.set(key, (entry[0], time.time(), entry[2]), stale_timeout)
+
+
+def peek(key):
+    """The cached value, fresh or stale, or None"""
+    entry = cache.get(key)
+    return None if entry is None else entry[0]
+
+
+def _compute(key, compute, timeout, stale_timeout, name, reason):
+    metrics.CACHE_REFRESHES.labels(name, reason).inc()
+    started = time.perf_counter()
+    value = compute()
+    put(key, value, timeout, stale_timeout, time.perf_counter() - started)
+    return value
+
+
+def get_or_compute(key, compute, timeout, stale_timeout=STALE_TIMEOUT, name='default'):
+    """Return the cached value for key, computing it at most once at a time"""
+    lock_key = _lock_key(key)
+    entry = cache.get(key)
+    metrics.record_cache(name, entry is not None)
+
+    if entry is not None:
+        value, expires_at, compute_seconds = entry
+        now = time.time()
+        early = compute_seconds * EARLY_REFRESH_BETA * -math.log(1 - random.random())
+        if now + early < expires_at:
+            return value
+        if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+            # Someone else is refreshing it; serve the stale value meanwhile
+            return value
+        try:
+            return _compute(key, compute, timeout, stale_timeout, name, 'early' if now < expires_at else 'expired')
+        finally:
+            cache.delete(lock_key)
+
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            return _compute(key, compute, timeout, stale_timeout, name, 'miss')
+        finally:
+            cache.delete(lock_key)
+
+    # Another caller is filling the key; wait for its value
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    # The filler died or is stuck; don't wait any longer
+    return _compute(key, compute, timeout, stale_timeout, name, 'timeout')
@@ -0,0 +1,119 @@
+"""
+Score distribution helpers for quiz result review.
+
+Everything here is computed inside the database (aggregates and window
+functions) so the cost stays flat as the number of attempts grows.
+"""
+import math
+
+from django.db.models import Count, F, IntegerField, ExpressionWrapper, Window
+from django.db.models.functions import Least, PercentRank, RowNumber
+
+from .models import QuizAttempt
+
+HISTOGRAM_BINS = 10
+PERCENTILES = (10, 20, 30, 40, 50, 60, 70, 80, 90)
+
+
+def completed_attempts(quiz):
+    return QuizAttempt.objects.filter(quiz=quiz, is_completed=True)
+
+
+def score_histogram(quiz, bins=HISTOGRAM_BINS):
+    """Count attempts per percentage band (0-10%, 10-20%, ... 90-100%)"""
+    # Integer division happens in the database; a full score lands in the top band
+    bucket = Least(
+        ExpressionWrapper(F('score') * bins / F('total_marks'), output_field=IntegerField()),
+        bins - 1,
+    )
+    rows = (
+        completed_attempts(quiz)
+        .filter(total_marks__gt=0)
+        .annotate(bucket=bucket)
+        .values('bucket')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    counts = {row['bucket']: row['count'] for row in rows}
+    width = 100 // bins
+    return [
+        {
+            'band': f'{i * width}-{(i + 1) * width}%',
+            'count': counts.get(i, 0),
+        }
+        for i in range(bins)
+    ]
+
+
+def score_percentiles(quiz, percentiles=PERCENTILES):
+    """
+    Nearest-rank percentiles of the raw score: a count and one ROW_NUMBER()
+    query that keeps only the wanted ranks. Both are served by the
+    (quiz, is_completed, score) index.
+    """
+    attempts = completed_attempts(quiz)
+    total = attempts.count()
+    if not total:
+        return {f'p{p}': None for p in percentiles}
+
+    ranks = {p: max(1, math.ceil(p / 100 * total)) for p in percentiles}
+    rows = (
+        attempts
+        .annotate(rank=Window(expression=RowNumber(), order_by=F('score').asc()))
+        .filter(rank__in=set(ranks.values()))
+        .values_list('rank', 'score')
+    )
+    scores = dict(rows)
+    return {f'p{p}': scores[rank] for p, rank in ranks.items()}
+
+
+def percentile_summary(quiz):
+    """Just the percentile bands, for pages that don't need every student's rank"""
+    return {
+        'quiz_id': quiz.id,
+        'percentiles': score_percentiles(quiz),
+    }
+
+
+def student_percentile_ranks(quiz, student_id=None):
+    """Percentile rank (0-100) of each student's score using PERCENT_RANK()"""
+    fields = ('student_id', 'student__username', 'student__roll_number', 'score')
+    attempts = completed_attempts(quiz)
+
+    if student_id is not None:
+        # A WHERE on the student would run before the window, so rank a single
+        # student with the PERCENT_RANK formula: (rows below) / (rows - 1)
+        rows = list(attempts.filter(student_id=student_id).values(*fields))
+        if rows:
+            total = attempts.count()
+            below = attempts.filter(score__lt=rows[0]['score']).count()
+            rows[0]['percent_rank'] = below / (total - 1) if total > 1 else 0
+    else:
+        rows = (
+            attempts
+            .annotate(percent_rank=Window(expression=PercentRank(), order_by=F('score').asc()))
+            .values(*fields, 'percent_rank')
+            .order_by('-score', 'student__roll_number')
+        )
+
+    return [
+        {
+            'student_id': row['student_id'],
+            'username': row['student__username'],
+            'roll_number': row['student__roll_number'],
+            'score': row['score'],
+            'percentile_rank': round(row['percent_rank'] * 100, 2),
+        }
+        for row in rows
+    ]
+
+
+def score_distribution(quiz, student_id=None):
+    return {
+        'quiz_id': quiz.id,
+        'quiz_title': quiz.title,
+        'total_attempts': completed_attempts(quiz).count(),
+        'histogram': score_histogram(quiz),
+        'percentiles': score_percentiles(quiz),
+        'students': student_percentile_ranks(quiz, student_id=student_id),
+    }
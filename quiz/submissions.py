@@ -0,0 +1,64 @@
+"""
+Idempotent quiz submission.
+
+take_quiz.html sends a random ``submission_key`` with the answers, kept in
+sessionStorage so a re-sent form carries the same key. The first POST with a
+key claims it in the cache with ``cache.add`` and grades; when it is done the
+result (score and total) is stored under the key. A retry finds the key and
+replays that result, waiting briefly if the first POST is still grading, so
+a double click or a re-POST over a flaky connection costs a cache lookup and
+never re-enters grading.
+
+Submissions without a key, or whose key was lost from the cache, are still
+protected by submit_quiz marking the attempt completed with a conditional
+UPDATE before writing any answers.
+"""
+import re
+import time
+
+from django.core.cache import cache
+
+SUBMISSION_KEY_TIMEOUT = 60 * 60 * 24  # 1 day
+# A claim outlives any normal grading time; if the worker died it expires
+PENDING_TIMEOUT = 60
+PENDING = 'pending'
+WAIT_TIMEOUT = 5  # seconds a retry waits for the first POST to finish
+WAIT_INTERVAL = 0.05
+
+KEY_PATTERN = re.compile(r'[A-Za-z0-9-]{8,64}')
+
+
+def clean_key(value):
+    return value if value and KEY_PATTERN.fullmatch(value) else None
+
+
+def _cache_key(attempt_id, submission_key):
+    return f'quiz:submission:{attempt_id}:{submission_key}'
+
+
+def claim(attempt_id, submission_key):
+    """True if this request is the first with the key and should grade"""
+    return cache.add(_cache_key(attempt_id, submission_key), PENDING, PENDING_TIMEOUT)
+
+
+def release(attempt_id, submission_key):
+    """Give up a claim when grading failed, so a retry grades again"""
+    cache.delete(_cache_key(attempt_id, submission_key))
+
+
+def record_result(attempt_id, submission_key, attempt):
+    cache.set(_cache_key(attempt_id, submission_key), {
+        'attempt_id': attempt.id,
+        'score': attempt.score,
+        'total_marks': attempt.total_marks,
+    }, SUBMISSION_KEY_TIMEOUT)
+
+
+def wait_for_result(attempt_id, submission_key):
+    """The stored result of the first POST, or None if it never finished"""
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while True:
+        result = cache.get(_cache_key(attempt_id, submission_key))
+        if result != PENDING or time.monotonic() >= deadline:
+            return None if result == PENDING else result
+        time.sleep(WAIT_INTERVAL)
@@ -1,3 +1,1014 @@
-from django.test import TestCase
+import importlib
+import json
+import math
+import os
+import re
+import runpy
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import OperationalError, connection, connections
+from django.test import AsyncClient, Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, reverse
+from django.utils import timezone
+
+from .management.fixtures import create_exam
+from .models import User, Quiz, Question, QuizAttempt, StudentAnswer
+from . import (
+    admin, admission, async_views, backends, checks, conditional, deletion, exam_cache, leaderboard, live, maintenance,
+    profiling, ratelimit, regrade, routers, singleflight, stats, submissions, urls,
+)
+
+
+def create_admin(username='admin'):
+    return User.objects.create_user(username, role='admin', phone='0')
+
+
+def create_student(username, **extra):
+    return User.objects.create_user(username, role='student', phone='1', **extra)
+
+
+class ScorePercentileTests(TestCase):
+    def setUp(self):
+        self.admin = create_admin()
+        self.quiz = Quiz.objects.create(title='Quiz', description='d', created_by=self.admin)
+        self.scores = [(i * 7) % 11 for i in range(23)]
+        for i, score in enumerate(self.scores):
+            QuizAttempt.objects.create(
+                student=create_student(f's{i}'), quiz=self.quiz, score=score, total_marks=10,
+                is_completed=True, completed_at=timezone.now(),
+            )
+
+    def test_percentiles_match_nearest_rank(self):
+        ordered = sorted(self.scores)
+        with self.assertNumQueries(2):
+            percentiles = stats.score_percentiles(self.quiz)
+        for p in stats.PERCENTILES:
+            self.assertEqual(percentiles[f'p{p}'], ordered[max(1, math.ceil(p / 100 * len(ordered))) - 1])
+
+    def test_view_results_gets_percentiles_only(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('score_distribution', args=[self.quiz.id]), {'only': 'percentiles'})
+        data = response.json()
+        self.assertEqual(set(data), {'quiz_id', 'percentiles'})
+        self.assertEqual(data['percentiles'], stats.score_percentiles(self.quiz))
+
+
+class LeaderboardWriterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.quiz = Quiz.objects.create(title='Quiz', description='d', created_by=create_admin())
+        self.key = leaderboard._cache_key(self.quiz.id)
+        self.lock_key = f'{self.key}:lock'
+
+    def complete_attempt(self, username, score):
+        return QuizAttempt.objects.create(
+            student=create_student(username), quiz=self.quiz, score=score, total_marks=10,
+            is_completed=True, completed_at=timezone.now(),
+        )
+
+    def usernames(self):
+        return [entry[4] for entry in leaderboard.get_entries(self.quiz.id)]
+
+    def test_contended_writer_waits_and_inserts(self):
+        self.complete_attempt('first', 5)
+        leaderboard.get_entries(self.quiz.id)
+        attempt = self.complete_attempt('second', 7)
+
+        # Another writer holds the lock for a moment
+        cache.add(self.lock_key, 1, 10)
+        threading.Timer(0.05, cache.delete, args=[self.lock_key]).start()
+        leaderboard.record_attempt(attempt)
+
+        self.assertEqual(singleflight.peek(self.key)[0][4], 'second')
+        self.assertEqual(self.usernames(), ['second', 'first'])
+
+    def test_writer_that_gives_up_never_drops_the_list(self):
+        self.complete_attempt('first', 5)
+        leaderboard.get_entries(self.quiz.id)
+        attempt = self.complete_attempt('second', 7)
+
+        cache.add(self.lock_key, 1, 10)
+        with mock.patch.object(leaderboard, 'LOCK_WAIT', 0):
+            leaderboard.record_attempt(attempt)
+        # Still served, marked stale, and rebuilt with the attempt on the next read
+        self.assertIsNotNone(cache.get(self.key))
+        self.assertEqual(self.usernames(), ['second', 'first'])
+        self.assertIsNone(cache.get(leaderboard._dirty_key(self.quiz.id)))
+
+    def test_lock_holder_expires_a_dirty_list(self):
+        self.complete_attempt('first', 5)
+        leaderboard.get_entries(self.quiz.id)
+        missed = self.complete_attempt('missed', 9)
+        attempt = self.complete_attempt('second', 7)
+
+        # A writer that gave up on the lock left the flag; the holder writes after it
+        cache.set(leaderboard._dirty_key(self.quiz.id), 1)
+        leaderboard.record_attempt(attempt)
+        self.assertLessEqual(cache.get(self.key)[1], time.time())
+        self.assertEqual(self.usernames(), ['missed', 'second', 'first'])
+        self.assertEqual(leaderboard.get_rank(missed), (1, 3))
+
+
+    def test_insert_keeps_a_stale_list_stale(self):
+        self.complete_attempt('first', 5)
+        leaderboard.get_entries(self.quiz.id)
+        singleflight.expire(self.key)
+        expires_at = cache.get(self.key)[1]
+
+        leaderboard.record_attempt(self.complete_attempt('second', 7))
+        self.assertEqual(cache.get(self.key)[1], expires_at)
+        self.assertEqual(singleflight.peek(self.key)[0][4], 'second')
+
+
+class SingleFlightTests(TransactionTestCase):
+    def test_each_key_is_computed_once(self):
+        cache.clear()
+        keys = [f'test:singleflight:{index}' for index in range(4)]
+        callers = 200
+        computed = {key: 0 for key in keys}
+        computed_lock = threading.Lock()
+        barrier = threading.Barrier(callers)
+        values = []
+
+        def compute(key):
+            with computed_lock:
+                computed[key] += 1
+            # Slow enough that every caller arrives while the first computes
+            time.sleep(0.1)
+            return key, Quiz.objects.count()
+
+        def read(key):
+            try:
+                barrier.wait()
+                values.append(singleflight.get_or_compute(key, lambda: compute(key), 60))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=read, args=[keys[index % len(keys)]]) for index in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(computed, {key: 1 for key in keys})
+        self.assertEqual(sorted(values), sorted((keys[index % len(keys)], 0) for index in range(callers)))
+
+
+class ConcurrentSubmitTests(TransactionTestCase):
+    """Many students submitting at once, against the file database on SQLite"""
+
+    submitters = 200
+    questions = 10
+
+    def submit_all(self, requests):
+        """POST every (client, url, data) at the same moment; returns outcome counts"""
+        barrier = threading.Barrier(len(requests))
+        results = {'ok': 0, 'locked': 0, 'other': 0}
+        results_lock = threading.Lock()
+
+        def submit(client, url, data):
+            try:
+                barrier.wait()
+                response = client.post(url, data)
+                outcome = 'ok' if response.status_code == 302 else 'other'
+            except OperationalError as exc:
+                outcome = 'locked' if 'locked' in str(exc) else 'other'
+            finally:
+                connection.close()
+            with results_lock:
+                results[outcome] += 1
+
+        threads = [threading.Thread(target=submit, args=request) for request in requests]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_no_lock_errors(self):
+        cache.clear()
+        quiz, students = create_exam('concurrent', self.submitters, self.questions, with_attempts=True)
+        data = {f'question_{qid}': 'A' for qid in quiz.questions.values_list('id', flat=True)}
+        requests = []
+        for attempt in QuizAttempt.objects.filter(quiz=quiz).select_related('student'):
+            client = Client()
+            client.force_login(attempt.student)
+            requests.append((client, reverse('submit_quiz', args=[attempt.id]), data))
+
+        results = self.submit_all(requests)
+        self.assertEqual(results, {'ok': self.submitters, 'locked': 0, 'other': 0})
+        self.assertEqual(QuizAttempt.objects.filter(quiz=quiz, is_completed=True).count(), self.submitters)
+
+
+# Runs view_results.html's startLiveProgress against a stand-in DOM that
+# fails on innerHTML, then prints the nodes it put in the widget
+LIVE_WIDGET_HARNESS = '''
+const [script, data] = process.argv.slice(1);
+let onProgress;
+let nodes = [];
+const container = {
+    dataset: {url: '/live'},
+    set textContent(text) { nodes = [text]; },
+    set innerHTML(html) { throw new Error('innerHTML set to ' + html); },
+    append(...items) { nodes.push(...items); },
+};
+global.window = {EventSource: true};
+global.document = {
+    getElementById: () => container,
+    createElement: tag => ({tag}),
+};
+global.EventSource = function() { this.addEventListener = (name, listener) => { onProgress = listener; }; };
+eval(script + '\\nstartLiveProgress();');
+onProgress({data});
+console.log(JSON.stringify(nodes));
+'''
+
+
+class LiveProgressTests(TestCase):
+    def setUp(self):
+        self.admin = create_admin()
+        self.quiz = Quiz.objects.create(title='Quiz', description='d', created_by=self.admin)
+        self.url = reverse('live_progress', args=[self.quiz.id])
+        live._hubs.clear()
+
+    def test_wsgi_sends_one_snapshot_and_closes(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url)
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        self.assertEqual(chunks[0], f'retry: {live.POLL_INTERVAL * 1000}\n\n')
+        self.assertEqual(len(chunks), 2)
+        self.assertIn('"started": 0', chunks[1])
+
+    async def test_asgi_streams_updates(self):
+        client = AsyncClient()
+        await client.aforce_login(self.admin)
+        response = await client.get(self.url)
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 2000\n\n')
+        self.assertIn(b'"started": 0', await anext(stream))
+
+        student = await User.objects.acreate(username='student', role='student', phone='1')
+        attempt = await QuizAttempt.objects.acreate(student=student, quiz=self.quiz)
+        live.publish_started(attempt)
+        self.assertIn(b'"started": 1', await anext(stream))
+        await stream.aclose()
+
+    @skipUnless(shutil.which('node'), 'needs node to run the page script')
+    def test_usernames_are_shown_as_text(self):
+        student = create_student('<script>alert(1)</script>')
+        attempt = QuizAttempt.objects.create(
+            student=student, quiz=self.quiz, score=1, total_marks=2, is_completed=True,
+        )
+        live.publish_submitted(attempt)
+        self.client.force_login(self.admin)
+        chunks = [chunk.decode() for chunk in self.client.get(self.url).streaming_content]
+        data = chunks[1].split('data: ', 1)[1].strip()
+
+        page = self.client.get(reverse('view_results') + f'?quiz_id={self.quiz.id}').content.decode()
+        script = re.search(r'^function startLiveProgress\(\) \{.*?^\}$', page, re.MULTILINE | re.DOTALL).group()
+        nodes = json.loads(subprocess.run(
+            ['node', '-e', LIVE_WIDGET_HARNESS, script, data], capture_output=True, text=True, check=True,
+        ).stdout)
+        self.assertEqual([node['tag'] for node in nodes if isinstance(node, dict)], ['strong'] * 3 + ['br'])
+        self.assertEqual(nodes[-1], 'Recent submissions: <script>alert(1)</script> (1/2)')
+
+    def test_watchers_share_one_recomputation(self):
+        hub = live.get_hub(self.quiz.id)
+        hub.current()
+        hub.computed_at -= live.COALESCE_INTERVAL
+        hub.publish('started')
+        before = hub.version
+
+        versions = []
+
+        def watch():
+            try:
+                versions.append(hub.current()[0])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=watch) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(set(versions), {before + 1})
+
+
+class ResultSnapshotLoadingTests(TestCase):
+    """Pages listing attempts never read the frozen result; quiz_result does"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', role='admin', phone='0')
+        self.quiz = Quiz.objects.create(title='Quiz', description='d', created_by=self.admin)
+        self.student = create_student('student')
+        self.attempt = QuizAttempt.objects.create(
+            student=self.student, quiz=self.quiz, score=1, total_marks=1, is_completed=True,
+            completed_at=timezone.now(), result_snapshot={'questions': []},
+        )
+
+    def assertSnapshotRead(self, url, read):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(any('result_snapshot' in query['sql'] for query in context.captured_queries), read, url)
+
+    def test_lists_defer_the_snapshot(self):
+        self.client.force_login(self.admin)
+        for url in [
+            reverse('view_results') + f'?quiz_id={self.quiz.id}',
+            reverse('export_results_excel', args=[self.quiz.id]),
+            reverse('export_results_pdf', args=[self.quiz.id]),
+            reverse('student_profile', args=[self.student.id]),
+            reverse('admin:quiz_quizattempt_changelist'),
+            reverse('admin:quiz_studentanswer_changelist'),
+        ]:
+            self.assertSnapshotRead(url, False)
+
+        self.client.force_login(self.student)
+        self.assertSnapshotRead(reverse('student_dashboard'), False)
+        self.assertSnapshotRead(reverse('quiz_result', args=[self.attempt.id]), True)
+
+
+class ExportEtagTests(TestCase):
+    def setUp(self):
+        self.admin = create_admin()
+        self.client.force_login(self.admin)
+        self.quiz, self.students = create_exam('etag', 5, 3, with_attempts=True)
+        QuizAttempt.objects.filter(quiz=self.quiz).update(is_completed=True, completed_at=timezone.now(), score=1)
+        self.url = reverse('export_results_excel', args=[self.quiz.id])
+
+    def etag(self, url):
+        return self.client.get(url)['ETag']
+
+    def test_results_etag_uses_aggregates(self):
+        request = mock.Mock(user=self.admin, path=self.url)
+        # Quiz stamp, attempt aggregates and the answer key, however many students
+        with self.assertNumQueries(3):
+            conditional.results_export_etag(request, self.quiz.id)
+        with self.assertNumQueries(1):
+            conditional.students_export_etag(request)
+
+    def test_results_etag_follows_answer_key(self):
+        etag = self.etag(self.url)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        question = self.quiz.questions.first()
+        Question.objects.filter(id=question.id).update(correct_answer='B' if question.correct_answer != 'B' else 'C')
+        self.assertNotEqual(self.etag(self.url), etag)
+
+    def test_students_etag_follows_roster(self):
+        url = reverse('export_students_excel')
+        etag = self.etag(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        create_student('late')
+        self.assertNotEqual(self.etag(url), etag)
+
+
+class ResultEtagTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.quiz, (self.first, self.second) = create_exam('result-etag', 2, 2, with_attempts=True)
+        self.questions = list(self.quiz.questions.order_by('order', 'id'))
+        self.attempt = QuizAttempt.objects.get(quiz=self.quiz, student=self.first)
+        self.url = reverse('quiz_result', args=[self.attempt.id])
+        self.submit(self.attempt, 'A', 'B')
+
+    def submit(self, attempt, *letters):
+        client = Client()
+        client.force_login(attempt.student)
+        client.post(reverse('submit_quiz', args=[attempt.id]), {
+            f'question_{question.id}': letter for question, letter in zip(self.questions, letters)
+        })
+
+    def cached_etag(self):
+        self.client.force_login(self.first)
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        return etag
+
+    def test_better_submission_by_someone_else(self):
+        etag = self.cached_etag()
+        self.submit(QuizAttempt.objects.get(quiz=self.quiz, student=self.second), 'A', 'A')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.context['rank']), (200, 2))
+
+    def test_regrade_of_someone_elses_score(self):
+        self.submit(QuizAttempt.objects.get(quiz=self.quiz, student=self.second), 'A', 'A')
+        etag = self.cached_etag()
+        # The first student's score stays 1; the second drops from 2 to 1
+        Question.objects.filter(id=self.questions[1].id).update(correct_answer='C')
+        with self.captureOnCommitCallbacks(execute=True):
+            regrade.regrade(self.quiz)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.context['rank']), (200, 1))
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_requests_cannot_overshoot(self):
+        limit = ratelimit.RateLimit('test', '5/60')
+        # Every caller passes the read-only check, as when all arrive together
+        with mock.patch.object(cache, 'get_many', return_value={}):
+            allowed = [limit.consume('client') == 0 for _ in range(20)]
+        self.assertEqual(allowed.count(True), 5)
+        self.assertGreater(limit.retry_after('client'), 0)
+
+
+class AdminQueryCountTests(TestCase):
+    """The attempt and answer admin pages cost the same however many rows are listed"""
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', role='admin', phone='0'))
+
+    def add_answered_exam(self, run_id, students):
+        quiz, _ = create_exam(run_id, students, 2, with_attempts=True)
+        StudentAnswer.objects.bulk_create(
+            StudentAnswer(attempt=attempt, question=question, selected_answer='A')
+            for attempt in QuizAttempt.objects.filter(quiz=quiz)
+            for question in quiz.questions.all()
+        )
+        return StudentAnswer.objects.filter(attempt__quiz=quiz).select_related('attempt').first()
+
+    def assertPageQueries(self, url, num):
+        # Warm up the content type cache, then count the session read, the
+        # signed-in user, the page's own queries and the session save (three)
+        self.client.get(url)
+        with self.assertNumQueries(num):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_changelists(self):
+        for run_id, students in [('small', 2), ('large', 30)]:
+            self.add_answered_exam(run_id, students)
+            # Quiz filter choices, row estimate, COUNT(*), the page of attempts
+            self.assertPageQueries(reverse('admin:quiz_quizattempt_changelist'), 9)
+            # Row estimate, COUNT(*), the page of answers
+            self.assertPageQueries(reverse('admin:quiz_studentanswer_changelist'), 8)
+
+    def test_change_views(self):
+        answer = self.add_answered_exam('change', 3)
+        # The attempt, its deferred snapshot, and the student and quiz widgets
+        self.assertPageQueries(reverse('admin:quiz_quizattempt_change', args=[answer.attempt_id]), 11)
+        # The answer, and the attempt (with its student and quiz) and question widgets
+        self.assertPageQueries(reverse('admin:quiz_studentanswer_change', args=[answer.id]), 14)
+
+
+class EstimatedCountTests(TestCase):
+    def test_soft_delete_filter_still_uses_the_estimate(self):
+        with mock.patch.object(admin, 'ESTIMATE_THRESHOLD', 1):
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+                cursor.execute('DELETE FROM sqlite_stat1')
+                cursor.execute("INSERT INTO sqlite_stat1 (tbl, idx, stat) VALUES ('quiz_quizattempt', NULL, '123')")
+            self.assertEqual(admin.estimated_count(QuizAttempt.objects.all()), 123)
+            self.assertEqual(admin.estimated_count(QuizAttempt.objects.defer('result_snapshot')), 123)
+            self.assertIsNone(admin.estimated_count(QuizAttempt.objects.filter(is_completed=True)))
+            self.assertIsNone(admin.estimated_count(QuizAttempt.all_objects.filter(is_deleted=False, quiz_id=1)))
+
+
+class RegradeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.quiz, students = create_exam('regrade', 4, 3, with_attempts=True)
+        self.questions = list(self.quiz.questions.order_by('order', 'id'))
+        # Every student gets the first question right; half answer B to the second
+        for index, attempt in enumerate(QuizAttempt.objects.filter(quiz=self.quiz).order_by('id')):
+            self.client.force_login(attempt.student)
+            self.client.post(reverse('submit_quiz', args=[attempt.id]), {
+                f'question_{self.questions[0].id}': 'A',
+                f'question_{self.questions[1].id}': 'B' if index % 2 else 'C',
+            })
+        # Half of the attempts were graded before packed vectors existed
+        self.legacy_ids = list(QuizAttempt.objects.filter(quiz=self.quiz).order_by('id').values_list('id', flat=True)[:2])
+        QuizAttempt.objects.filter(id__in=self.legacy_ids).update(answer_vector=None, correct_bitmap=None)
+
+    def scores(self):
+        return dict(QuizAttempt.objects.filter(quiz=self.quiz).values_list('id', 'score'))
+
+    def totals(self):
+        return set(QuizAttempt.objects.filter(quiz=self.quiz).values_list('total_marks', flat=True))
+
+    def test_marks_change_rescores_every_layout(self):
+        before = self.scores()
+        Question.objects.filter(id=self.questions[0].id).update(marks=5)
+        report = regrade.regrade(self.quiz, question_ids=[self.questions[0].id])
+        self.assertEqual(report['answers_changed'], 0)
+        self.assertEqual(self.scores(), {attempt_id: score + 4 for attempt_id, score in before.items()})
+        self.assertEqual(self.totals(), {7})
+
+    def test_answer_change(self):
+        Question.objects.filter(id=self.questions[1].id).update(correct_answer='B')
+        regrade.regrade(self.quiz, question_ids=[self.questions[1].id])
+        ordered = QuizAttempt.objects.filter(quiz=self.quiz).order_by('id').values_list('score', 'result_snapshot')
+        self.assertEqual([score for score, _ in ordered], [1, 2, 1, 2])
+        # Legacy snapshots are rebuilt on the next view, packed ones are patched
+        self.assertEqual([snapshot and snapshot['correct_count'] for _, snapshot in ordered], [None, None, 1, 2])
+        # Including the attempt whose score did not change
+        self.assertEqual(ordered[2][1]['answers'][1]['question']['correct_answer'], 'B')
+
+    def test_preview_only_reads(self):
+        Question.objects.filter(id=self.questions[1].id).update(correct_answer='B', marks=3)
+        before = self.scores()
+        with CaptureQueriesContext(connection) as context:
+            preview = regrade.regrade(self.quiz, dry_run=True)
+        self.assertTrue(all(query['sql'].startswith('SELECT') for query in context.captured_queries))
+        self.assertEqual(self.scores(), before)
+
+        report = regrade.regrade(self.quiz)
+        self.assertEqual(preview['score_changes'], report['score_changes'])
+        self.assertEqual(preview['answers_changed'], report['answers_changed'])
+        self.assertEqual(preview['attempts_changed'], report['attempts_changed'])
+        self.assertEqual(self.totals(), {5})
+
+
+class ExamCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.quiz, _ = create_exam('examcache', 0, 2)
+
+    def test_per_process_cache_warns(self):
+        self.assertEqual([warning.id for warning in checks.check_exam_cache(None)], ['quiz.W001'])
+        with self.settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}):
+            self.assertEqual(checks.check_exam_cache(None), [])
+
+    def test_change_in_another_process_is_seen(self):
+        question = exam_cache.get_questions(self.quiz.id)[0]
+        # Another worker edits the key; its invalidation never reaches this cache
+        with mock.patch.object(exam_cache, 'invalidate'):
+            edited = Question.objects.get(id=question.id)
+            edited.correct_answer = 'D'
+            edited.save()
+            Quiz.objects.filter(id=self.quiz.id).update(is_active=False)
+        self.assertEqual(exam_cache.get_questions(self.quiz.id)[0].correct_answer, 'D')
+        self.assertFalse(exam_cache.get_quiz(self.quiz.id).is_active)
+        # Unchanged since, so the check is the only query
+        with self.assertNumQueries(1):
+            exam_cache.get_questions(self.quiz.id)
+
+    def test_open_quiz_change_in_another_process_is_seen(self):
+        other = Quiz.objects.create(title='Other', description='d', created_by=self.quiz.created_by)
+        self.assertCountEqual(exam_cache.get_open_quizzes(), [other, self.quiz])
+        # Another worker closes one quiz and deletes the other
+        with mock.patch.object(exam_cache, 'invalidate'):
+            self.quiz.is_active = False
+            self.quiz.save()
+        self.assertEqual(exam_cache.get_open_quizzes(), [other])
+        Quiz.all_objects.filter(id=other.id).update(is_deleted=True)
+        self.assertEqual(exam_cache.get_open_quizzes(), [])
+        with self.assertNumQueries(1):
+            exam_cache.get_open_quizzes()
+
+
+class SubmissionClaimTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.quiz, (self.owner, self.other) = create_exam('claim', 2, 2, with_attempts=True)
+        self.attempt = QuizAttempt.objects.get(quiz=self.quiz, student=self.owner)
+        self.url = reverse('submit_quiz', args=[self.attempt.id])
+        self.data = {'submission_key': 'claim-test-key'}
+
+    def claim_key(self):
+        return submissions._cache_key(self.attempt.id, self.data['submission_key'])
+
+    def test_someone_elses_attempt_leaves_no_claim(self):
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.post(self.url, self.data).status_code, 404)
+        self.assertIsNone(cache.get(self.claim_key()))
+
+        self.client.force_login(self.owner)
+        self.assertRedirects(self.client.post(self.url, self.data), reverse('quiz_result', args=[self.attempt.id]))
+
+    def test_failed_grading_releases_the_claim(self):
+        self.client.force_login(self.owner)
+        with mock.patch.object(exam_cache, 'ordered_questions', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(self.url, self.data)
+        self.assertIsNone(cache.get(self.claim_key()))
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = create_student('student')
+        self.url = reverse('student_dashboard')
+
+    def assertSignedOutAfterDeactivation(self, deactivate):
+        self.client.force_login(self.student)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        deactivate()
+        self.assertRedirects(self.client.get(self.url), f'{reverse("login")}?next={self.url}')
+
+    def test_deactivated_user_is_signed_out(self):
+        # update() sends no signals, like a change made in another process
+        self.assertSignedOutAfterDeactivation(
+            lambda: User.objects.filter(id=self.student.id).update(is_active=False)
+        )
+
+    def test_cached_backend_reads_the_database_on_a_per_process_cache(self):
+        def deactivate_elsewhere():
+            # Another worker's save drops the record from its own cache only
+            with mock.patch.object(backends, 'invalidate'):
+                self.student.is_active = False
+                self.student.save()
+
+        with self.settings(AUTHENTICATION_BACKENDS=['quiz.backends.CachedModelBackend']):
+            self.assertSignedOutAfterDeactivation(deactivate_elsewhere)
+
+    def test_user_cache_on_a_per_process_cache_warns(self):
+        self.assertEqual(checks.check_user_cache(None), [])
+        with self.settings(USER_CACHE=True):
+            self.assertEqual([warning.id for warning in checks.check_user_cache(None)], ['quiz.W002'])
+
+
+class PayloadBudgetTests(TestCase):
+    """The main pages of a 100-question exam, as sent gzipped, fit in PAYLOAD_BUDGET"""
+
+    questions = 100
+
+    def assertWithinBudget(self, client, url):
+        response = client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200, url)
+        self.assertLessEqual(len(response.content), settings.PAYLOAD_BUDGET, url)
+
+    def test_pages_within_budget(self):
+        cache.clear()
+        quiz, (student,) = create_exam('payload', 1, self.questions)
+        student_client = Client()
+        student_client.force_login(student)
+        admin_client = Client()
+        admin_client.force_login(quiz.created_by)
+
+        # take_quiz starts the attempt the later pages need
+        self.assertWithinBudget(student_client, reverse('take_quiz', args=[quiz.id]))
+        attempt = QuizAttempt.objects.get(quiz=quiz, student=student)
+        answers = {f'question_{qid}': 'A' for qid in quiz.questions.values_list('id', flat=True)}
+        student_client.post(reverse('submit_quiz', args=[attempt.id]), answers)
+
+        for client, url in [
+            (student_client, reverse('student_dashboard')),
+            (student_client, reverse('quiz_result', args=[attempt.id])),
+            (student_client, reverse('quiz_leaderboard', args=[quiz.id])),
+            (admin_client, reverse('admin_dashboard')),
+            (admin_client, reverse('view_results')),
+        ]:
+            with self.subTest(url=url):
+                self.assertWithinBudget(client, url)
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """A second SQLite file as the replica, as for local testing with DATABASE_REPLICA_URL"""
+
+    def setUp(self):
+        self.admin = create_admin()
+        self.quiz = Quiz.objects.create(title='Primary title', description='d', created_by=self.admin)
+
+        # The replica starts as a copy of the primary, then lags behind it
+        replica_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(replica_dir.cleanup)
+        replica_path = os.path.join(replica_dir.name, 'replica.sqlite3')
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM INTO %s', [replica_path])
+        replica = dict(connections.settings['default'], NAME=replica_path)
+        for patcher in [
+            mock.patch.dict(connections.settings, {routers.REPLICA_ALIAS: replica}),
+            mock.patch.object(type(self), 'databases', {'default', routers.REPLICA_ALIAS}),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.drop_replica_connection)
+        Quiz.objects.using(routers.REPLICA_ALIAS).filter(id=self.quiz.id).update(title='Replica title')
+
+        self.client.force_login(self.admin)
+        self.results_url = reverse('view_results') + f'?quiz_id={self.quiz.id}'
+
+    def drop_replica_connection(self):
+        # The connection keeps the settings it was opened with, so the next
+        # test's replica file needs a new one
+        connections[routers.REPLICA_ALIAS].close()
+        del connections[routers.REPLICA_ALIAS]
+
+    def results_title(self):
+        return self.client.get(self.results_url).context['selected_quiz'].title
+
+    def test_reads_go_to_the_replica_only_in_wrapped_views(self):
+        self.assertEqual(self.results_title(), 'Replica title')
+        self.assertContains(self.client.get(reverse('admin_dashboard')), 'Primary title')
+
+    def test_writes_go_to_the_primary(self):
+        @routers.read_from_replica
+        def write(request):
+            return Quiz.objects.create(title='Written', description='d', created_by=self.admin)
+
+        quiz = write(None)
+        self.assertTrue(Quiz.objects.using('default').filter(id=quiz.id).exists())
+        self.assertFalse(Quiz.objects.using(routers.REPLICA_ALIAS).filter(id=quiz.id).exists())
+
+    def test_reads_stay_on_the_primary_after_a_write(self):
+        # Toggling the quiz writes, so the response pins the user to the primary
+        response = self.client.get(reverse('toggle_quiz_status', args=[self.quiz.id]))
+        self.assertIn('replica_pin', response.cookies)
+        self.assertEqual(self.results_title(), 'Primary title')
+
+        # Once the cookie is gone, reads go back to the replica
+        del self.client.cookies['replica_pin']
+        self.assertEqual(self.results_title(), 'Replica title')
+
+
+class DatabasePoolSettingsTests(SimpleTestCase):
+    """Re-read settings.py against a PostgreSQL configuration"""
+
+    def load_database(self, **env):
+        env = dict({'DB_NAME': 'quiz', 'DB_USER': 'quiz', 'DB_PASSWORD': 'secret'}, **env)
+        with mock.patch.dict(os.environ, env):
+            os.environ.pop('DATABASE_URL', None)
+            return runpy.run_path(settings.BASE_DIR / 'quiz_project' / 'settings.py')['DATABASES']['default']
+
+    def test_pool_is_off_by_default(self):
+        database = self.load_database(DB_POOL='False', DB_CONN_MAX_AGE='600')
+        self.assertNotIn('pool', database.get('OPTIONS', {}))
+        self.assertEqual(database['CONN_MAX_AGE'], 600)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+
+    def test_pool_replaces_persistent_connections_when_enabled(self):
+        database = self.load_database(DB_POOL='True', DB_POOL_MIN_SIZE='3', DB_POOL_MAX_SIZE='7')
+        self.assertEqual(database['OPTIONS']['pool'], {'min_size': 3, 'max_size': 7, 'timeout': 10})
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+
+
+@override_settings(ASYNC_STUDENT_VIEWS=True)
+class AsyncStudentViewTests(TestCase):
+    """The student exam flow through async_views.py"""
+
+    @classmethod
+    def setUpClass(cls):
+        # quiz/urls.py picks the student views when it is imported, and the
+        # project URLconf keeps the patterns it included. The cleanup is
+        # registered first so it runs after the settings are restored.
+        cls.addClassCleanup(cls.reload_urls)
+        super().setUpClass()
+        cls.reload_urls()
+
+    @staticmethod
+    def reload_urls():
+        importlib.reload(urls)
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+        clear_url_caches()
+
+    def setUp(self):
+        cache.clear()
+        self.quiz, (self.student,) = create_exam('async', 1, 3)
+
+    async def test_take_submit_and_view_result(self):
+        await self.async_client.aforce_login(self.student)
+        response = await self.async_client.get(reverse('student_dashboard'))
+        self.assertEqual(response.resolver_match.func, async_views.student_dashboard)
+        self.assertEqual(response.context['available_quizzes'], [self.quiz])
+
+        response = await self.async_client.get(reverse('take_quiz', args=[self.quiz.id]))
+        attempt = response.context['attempt']
+        data = {f'question_{question.id}': 'A' for question in response.context['questions']}
+        data['submission_key'] = 'async-flow-key'
+        submit_url = reverse('submit_quiz', args=[attempt.id])
+        result_url = reverse('quiz_result', args=[attempt.id])
+        self.assertRedirects(await self.async_client.post(submit_url, data), result_url, fetch_redirect_response=False)
+
+        # The re-sent form replays the stored result without grading again
+        with mock.patch.object(async_views, '_save_graded_attempt') as save:
+            response = await self.async_client.post(submit_url, data)
+        self.assertRedirects(response, result_url, fetch_redirect_response=False)
+        save.assert_not_called()
+        attempt = await QuizAttempt.objects.aget(id=attempt.id)
+        self.assertEqual((attempt.score, attempt.is_completed), (3, True))
+
+        response = await self.async_client.get(result_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.context['correct_count'], response.context['rank']), (3, 1))
+        response = await self.async_client.get(reverse('student_dashboard'))
+        self.assertEqual(response.context['available_quizzes'], [])
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        profiling.reset_stats()
+        self.addCleanup(profiling.reset_stats)
+        self.client.force_login(create_admin())
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_request_writes_a_profile(self):
+        with self.assertLogs('quiz.profiling', 'INFO') as logs:
+            self.client.get(reverse('admin_dashboard'))
+        profile = json.loads(logs.records[0].getMessage())
+        self.assertEqual((profile['view'], profile['status']), ('admin_dashboard', 200))
+        self.assertGreater(profile['queries'], 0)
+
+        views = self.client.get(reverse('profiling_stats')).json()['views']
+        self.assertEqual([(view['view'], view['samples']) for view in views][:1], [('admin_dashboard', 1)])
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0.0)
+    def test_unsampled_request_is_not_profiled(self):
+        self.client.get(reverse('admin_dashboard'))
+        self.assertEqual(profiling.get_stats(), [])
+
+
+@override_settings(METRICS_TOKEN='scrape-token')
+class MetricsTests(TestCase):
+    def scrape(self, **headers):
+        return self.client.get(reverse('metrics'), **headers)
+
+    def graded_total(self):
+        body = self.scrape(HTTP_AUTHORIZATION='Bearer scrape-token').content.decode()
+        return float(re.search(r'^quiz_submissions_graded_total (\S+)$', body, re.MULTILINE).group(1))
+
+    def test_counts_graded_submissions(self):
+        quiz, (student,) = create_exam('metrics', 1, 2, with_attempts=True)
+        before = self.graded_total()
+        self.client.force_login(student)
+        self.client.post(reverse('submit_quiz', args=[QuizAttempt.objects.get(quiz=quiz).id]))
+        self.assertEqual(self.graded_total(), before + 1)
+
+    def test_token_is_required(self):
+        self.assertEqual(self.scrape().status_code, 401)
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_closed_without_a_token(self):
+        self.assertEqual(self.scrape().status_code, 403)
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+
+class CaptchaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        create_student('student')
+
+    def challenge(self):
+        context = self.client.get(reverse('login')).context
+        return {'captcha': context['captcha'], 'captcha_token': context['captcha_token']}
+
+    def login_errors(self, challenge, password='wrong'):
+        response = self.client.post(reverse('login'), dict(challenge, username='student', password=password))
+        return [str(message) for message in response.context['messages']]
+
+    def test_anonymous_forms_create_no_session(self):
+        self.login_errors(self.challenge())
+        self.client.get(reverse('register'))
+        self.client.post(reverse('register'), {'username': 'new', 'password1': 'a', 'password2': 'b'})
+        self.assertEqual(Session.objects.count(), 0)
+
+    def test_token_is_single_use(self):
+        challenge = self.challenge()
+        self.assertEqual(self.login_errors(challenge), ['Login failed. Invalid username or password. Please try again.'])
+        self.assertEqual(self.login_errors(challenge), ['Invalid CAPTCHA code. Please try again.'])
+
+    def test_expired_token_is_rejected(self):
+        with mock.patch('time.time', return_value=time.time() - settings.CAPTCHA_MAX_AGE - 1):
+            challenge = self.challenge()
+        self.assertEqual(self.login_errors(challenge), ['Invalid CAPTCHA code. Please try again.'])
+
+
+class StaleAttemptTests(TestCase):
+    def test_only_attempts_past_time_limit_and_grace_are_deleted(self):
+        admin = create_admin()
+        short = Quiz.objects.create(title='Short', description='d', created_by=admin, time_limit=30)
+        long = Quiz.objects.create(title='Long', description='d', created_by=admin, time_limit=90)
+        now = timezone.now()
+        attempts = {}
+        for name, quiz, minutes_ago, completed in [
+            ('short_stale', short, 45, False),
+            ('short_in_grace', short, 35, False),
+            ('short_completed', short, 45, True),
+            ('long_in_grace', long, 95, False),
+            ('long_stale', long, 105, False),
+        ]:
+            attempt = QuizAttempt.objects.create(student=create_student(name), quiz=quiz, is_completed=completed)
+            QuizAttempt.objects.filter(id=attempt.id).update(started_at=now - timedelta(minutes=minutes_ago))
+            attempts[name] = attempt.id
+
+        self.assertEqual(maintenance.purge_stale_attempts(batch_size=1, grace_minutes=10), 2)
+        remaining = set(QuizAttempt.objects.values_list('id', flat=True))
+        self.assertEqual(remaining, {attempts[name] for name in ['short_in_grace', 'short_completed', 'long_in_grace']})
+
+
+class DeletionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.quiz, self.students = create_exam('deletion', 2, 3, with_attempts=True)
+        StudentAnswer.objects.bulk_create([
+            StudentAnswer(attempt=attempt, question=question, selected_answer='A', is_correct=True)
+            for attempt in QuizAttempt.objects.filter(quiz=self.quiz)
+            for question in self.quiz.questions.all()
+        ])
+        self.client.force_login(create_admin())
+
+    def counts(self, manager_name='all_objects'):
+        return [
+            getattr(model, manager_name).filter(**{lookup: self.quiz.id}).count()
+            for model, lookup in [(Quiz, 'id'), (Question, 'quiz_id'), (QuizAttempt, 'quiz_id')]
+        ] + [StudentAnswer.objects.filter(attempt__quiz_id=self.quiz.id).count()]
+
+    def test_quiz_is_hidden_before_the_purge(self):
+        url = reverse('delete_quiz', args=[self.quiz.id])
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(url)
+        self.assertEqual(response.json()['progress'], {'deleted': 0, 'total': None, 'percent': 0, 'done': False})
+        self.assertEqual(len(callbacks), 1)
+
+        self.assertEqual(self.counts('objects')[:3], [0, 0, 0])
+        self.assertEqual(self.counts(), [1, 3, 2, 6])
+        self.assertEqual(self.client.get(url).json()['status'], 'deleting')
+
+    def test_quiz_purge_reports_progress(self):
+        deletion.mark_quiz_deleted(self.quiz)
+        with mock.patch.object(deletion, '_set_progress', wraps=deletion._set_progress) as set_progress:
+            deletion.purge('quiz', self.quiz.id, batch_size=4)
+        self.assertEqual(self.counts(), [0, 0, 0, 0])
+        # 6 answers, 2 attempts and 3 questions in batches of 4, then the quiz
+        self.assertEqual([call.args[2] for call in set_progress.call_args_list], [0, 4, 6, 8, 11, 12])
+        self.assertEqual(deletion.get_progress('quiz', self.quiz.id), {'deleted': 12, 'total': 12, 'percent': 100, 'done': True})
+
+    def test_student_is_hidden_then_purged(self):
+        student = self.students[0]
+        with self.captureOnCommitCallbacks():
+            self.client.post(reverse('delete_student', args=[student.id]))
+        self.assertFalse(User.objects.filter(id=student.id).exists())
+        self.assertFalse(User.all_objects.get(id=student.id).is_active)
+        self.assertEqual(QuizAttempt.objects.filter(quiz=self.quiz).count(), 1)
+
+        deletion.purge('student', student.id)
+        self.assertFalse(User.all_objects.filter(id=student.id).exists())
+        self.assertEqual(self.counts(), [1, 3, 1, 3])
+        self.assertTrue(deletion.get_progress('student', student.id)['done'])
+
+    def test_registration_rejects_the_name_of_a_student_being_deleted(self):
+        student = self.students[0]
+        deletion.mark_student_deleted(student)
+        self.client.logout()
+        response = self.client.post(reverse('register'), {
+            'username': student.username, 'email': 'new@example.com', 'phone': student.phone,
+            'roll_number': '1', 'branch': 'CS', 'password1': 'pw', 'password2': 'pw',
+        })
+        self.assertEqual(response.status_code, 200)
+        errors = [str(message) for message in response.context['messages']]
+        self.assertEqual(errors, ['Username already exists', 'Phone number already exists'])
+
+
+@override_settings(ADMISSION_RATE=2)
+class AdmissionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.quiz, self.students = create_exam('admission', 3, 2)
+        self.url = reverse('take_quiz', args=[self.quiz.id])
+        self.now = time.time()
+        self.second = int(self.now)
+
+    def take(self, student):
+        client = Client()
+        client.force_login(student)
+        with mock.patch('quiz.admission.time') as clock:
+            clock.time.return_value = self.now
+            return client, client.get(self.url)
+
+    def test_each_second_admits_up_to_the_rate(self):
+        slots = [admission.reserve_slot(self.quiz, self.now) for _ in range(5)]
+        self.assertEqual(slots, [self.second] * 2 + [self.second + 1] * 2 + [self.second + 2])
+
+    def test_waiting_room_before_the_start_time(self):
+        self.quiz.start_time = datetime.fromtimestamp(self.second + 3600).astimezone()
+        self.quiz.save()
+        client, response = self.take(self.students[0])
+        self.assertRedirects(response, reverse('waiting_room', args=[self.quiz.id]) + '?wait=3600', fetch_redirect_response=False)
+        self.assertIn(f'admission_{self.quiz.id}', response.cookies)
+        self.assertFalse(QuizAttempt.objects.exists())
+        self.assertContains(client.get(reverse('waiting_room', args=[self.quiz.id])), self.quiz.title)
+
+    def test_closed_quiz_redirects_to_the_dashboard(self):
+        self.quiz.end_time = timezone.now() - timedelta(minutes=1)
+        self.quiz.save()
+        _, response = self.take(self.students[0])
+        self.assertRedirects(response, reverse('student_dashboard'), fetch_redirect_response=False)
+        self.assertFalse(QuizAttempt.objects.exists())
+
+    def test_retry_with_the_ticket_keeps_its_slot(self):
+        for student in self.students[:2]:
+            self.assertEqual(self.take(student)[1].status_code, 200)
+        client, response = self.take(self.students[2])
+        self.assertIn('?wait=1', response['Location'])
+
+        # Coming back early with the ticket reserves nothing new
+        with mock.patch('quiz.admission.time') as clock:
+            clock.time.return_value = self.now
+            self.assertIn('?wait=1', client.get(self.url)['Location'])
+            clock.time.return_value = self.second + 1
+            self.assertEqual(client.get(self.url).status_code, 200)
+        self.assertEqual(cache.get(admission._slot_key(self.quiz.id, self.second + 1)), 1)
+        self.assertEqual(QuizAttempt.objects.filter(quiz=self.quiz).count(), 3)
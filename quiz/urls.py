@@ -1,5 +1,10 @@
+from django.conf import settings
 from django.urls import path
 from . import views
+from . import async_views
+
+# Async student views for ASGI deployments, sync views everywhere else
+student_views = async_views if settings.ASYNC_STUDENT_VIEWS else views
 
 urlpatterns = [
     path('', views.login_view, name='login'),
@@ -20,17 +25,25 @@ urlpatterns = [
     path('delete-question/<int:question_id>/', views.delete_question, name='delete_question'),
     path('toggle-quiz-status/<int:quiz_id>/', views.toggle_quiz_status, name='toggle_quiz_status'),
     path('delete-quiz/<int:quiz_id>/', views.delete_quiz, name='delete_quiz'),
+    path('regrade-quiz/<int:quiz_id>/', views.regrade_quiz, name='regrade_quiz'),
     path('view-results/', views.view_results, name='view_results'),
+    path('view-results/<int:quiz_id>/distribution/', views.score_distribution, name='score_distribution'),
+    path('view-results/<int:quiz_id>/live/', views.live_progress, name='live_progress'),
+    path('conditional-get-stats/', views.conditional_get_stats, name='conditional_get_stats'),
+    path('profiling-stats/', views.profiling_stats, name='profiling_stats'),
+    path('metrics', views.prometheus_metrics, name='metrics'),
     path('export-results-excel/<int:quiz_id>/', views.export_results_excel, name='export_results_excel'),
     path('export-results-pdf/<int:quiz_id>/', views.export_results_pdf, name='export_results_pdf'),
     path('export-questions-pdf/<int:quiz_id>/', views.export_questions_pdf, name='export_questions_pdf'),
     path('export-questions-docx/<int:quiz_id>/', views.export_questions_docx, name='export_questions_docx'),
     
     # Student URLs
-    path('student-dashboard/', views.student_dashboard, name='student_dashboard'),
-    path('take-quiz/<int:quiz_id>/', views.take_quiz, name='take_quiz'),
-    path('submit-quiz/<int:attempt_id>/', views.submit_quiz, name='submit_quiz'),
-    path('quiz-result/<int:attempt_id>/', views.quiz_result, name='quiz_result'),
+    path('student-dashboard/', student_views.student_dashboard, name='student_dashboard'),
+    path('take-quiz/<int:quiz_id>/', student_views.take_quiz, name='take_quiz'),
+    path('take-quiz/<int:quiz_id>/waiting/', views.waiting_room, name='waiting_room'),
+    path('submit-quiz/<int:attempt_id>/', student_views.submit_quiz, name='submit_quiz'),
+    path('quiz-result/<int:attempt_id>/', student_views.quiz_result, name='quiz_result'),
+    path('leaderboard/<int:quiz_id>/', views.quiz_leaderboard, name='quiz_leaderboard'),
     
     # Profile
     path('profile/', views.profile_view, name='profile'),
@@ -2,43 +2,43 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Count, Avg, Q
 from django.conf import settings
 from django.views.decorators.csrf import csrf_protect
 from .models import User, Quiz, Question, QuizAttempt, StudentAnswer
 from .forms import StudentRegistrationForm, AdminRegistrationForm, LoginForm, QuizForm, QuestionForm
+from . import stats
+from . import leaderboard
+from . import live
+from . import results
+from . import deletion
+from . import answer_store
+from . import regrade
+from . import admission
+from . import exam_cache
+from . import submissions
+from . import warming
+from . import profiling
+from . import metrics
+from . import ratelimit
+from .captcha import new_challenge, retry_challenge, verify as verify_captcha
+from . import conditional
+from .conditional import conditional_page
+from .routers import read_from_replica
+from .middleware import ConditionalGetStatsMiddleware
+import hmac
 import random
 import string
-import openpyxl
+import time
 from decouple import config  # For reading environment variables
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from io import BytesIO
-from docx import Document
-from docx.shared import Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-
-
-def generate_captcha(request):
-    """Generate a random 6-character captcha with lowercase letters and digits"""
-    import random
-    import string
-    captcha = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
-    request.session['captcha'] = captcha
-    return captcha
 
 
 @csrf_protect
 def register_view(request):
-    print("Register view called")
-    print("Request method:", request.method)
-    
     if request.user.is_authenticated:
         return redirect('dashboard')
     
@@ -74,12 +74,13 @@ def register_view(request):
         if password1 != password2:
             errors.append('Passwords do not match')
         
-        # Check if user already exists
-        if User.objects.filter(username=username).exists():
+        # Check if user already exists (including accounts still being deleted,
+        # which keep their username until the row is gone)
+        if User.all_objects.filter(username=username).exists():
             errors.append('Username already exists')
-        if User.objects.filter(email=email).exists():
+        if User.all_objects.filter(email=email).exists():
             errors.append('Email already exists')
-        if User.objects.filter(phone=phone).exists():
+        if User.all_objects.filter(phone=phone).exists():
             errors.append('Phone number already exists')
         
         if not errors:
@@ -101,8 +102,6 @@ def register_view(request):
             for error in errors:
                 messages.error(request, error)
             return render(request, 'quiz/auth.html', {'show_register': True})
-    else:
-        print("GET request - showing registration form")
     
     return render(request, 'quiz/auth.html', {'show_register': True})
 
@@ -113,37 +112,43 @@ def login_view(request):
     
     # Generate a new CAPTCHA only for GET requests
     if request.method == 'GET':
-        captcha = generate_captcha(request)
+        captcha, captcha_token = new_challenge(request)
     else:
-        # For POST requests, use the existing CAPTCHA from session
-        captcha = request.session.get('captcha', '')
+        # For POST requests, show the same CAPTCHA again (or a fresh signed
+        # one, since signed tokens are single-use)
+        captcha, captcha_token = retry_challenge(request)
     
     if request.method == 'POST':
         # Get username, password, and CAPTCHA from the POST data
         username = request.POST.get('username')
         password = request.POST.get('password')
         user_captcha = request.POST.get('captcha')
-        session_captcha = request.session.get('captcha')
         
         # Validate CAPTCHA
         if not user_captcha:
+            metrics.LOGINS.labels('missing_captcha').inc()
             messages.error(request, 'Please enter the CAPTCHA code.')
-        elif user_captcha != session_captcha:
+        elif not verify_captcha(request, user_captcha):
+            metrics.LOGINS.labels('invalid_captcha').inc()
             messages.error(request, 'Invalid CAPTCHA code. Please try again.')
             # Generate a new CAPTCHA for the next attempt
-            captcha = generate_captcha(request)
+            captcha, captcha_token = new_challenge(request)
         elif username and password:
             user = authenticate(request, username=username, password=password)
             if user is not None:
                 login(request, user)
+                metrics.LOGINS.labels('success').inc()
                 messages.success(request, f'Welcome back, {user.username}! Login successful.')
                 return redirect('dashboard')
             else:
+                ratelimit.record_login_failure(request)
+                metrics.LOGINS.labels('invalid_credentials').inc()
                 messages.error(request, 'Login failed. Invalid username or password. Please try again.')
         else:
+            metrics.LOGINS.labels('missing_fields').inc()
             messages.error(request, 'Login failed. Please fill in all required fields.')
     
-    return render(request, 'quiz/auth.html', {'show_register': False, 'captcha': captcha})
+    return render(request, 'quiz/auth.html', {'show_register': False, 'captcha': captcha, 'captcha_token': captcha_token})
 
 
 @login_required
@@ -210,23 +215,16 @@ def student_dashboard(request):
         # Instead of redirecting to admin_dashboard, redirect to login to avoid loops
         return redirect('login')
     
-    # Get all active quizzes
-    all_quizzes = Quiz.objects.filter(is_active=True)
-    
-    # Get quizzes already attempted by the student
-    attempted_quiz_ids = QuizAttempt.objects.filter(
-        student=request.user, 
-        is_completed=True
-    ).values_list('quiz_id', flat=True)
-    
-    # Available quizzes (not attempted)
-    available_quizzes = all_quizzes.exclude(id__in=attempted_quiz_ids)
-    
     # Attempted quizzes with scores
-    attempted_quizzes = QuizAttempt.objects.filter(
+    attempted_quizzes = list(QuizAttempt.objects.filter(
         student=request.user,
         is_completed=True
-    ).select_related('quiz')
+    ).select_related('quiz').defer('result_snapshot'))
+    attempted_quiz_ids = {attempt.quiz_id for attempt in attempted_quizzes}
+    
+    # Available quizzes (open and not attempted); the open quiz list is
+    # shared by every student, so it comes from the cache
+    available_quizzes = [quiz for quiz in exam_cache.get_open_quizzes() if quiz.id not in attempted_quiz_ids]
     
     context = {
         'available_quizzes': available_quizzes,
@@ -249,6 +247,7 @@ def add_quiz(request):
             quiz = form.save(commit=False)
             quiz.created_by = request.user
             quiz.save()
+            warming.schedule(quiz)
             messages.success(request, 'Quiz created successfully!')
             return redirect('add_questions', quiz_id=quiz.id)
     else:
@@ -309,12 +308,21 @@ def edit_question(request, question_id):
         return redirect('student_dashboard')
     
     question = get_object_or_404(Question, id=question_id)
+    # The form writes its values onto the instance, so keep the old grading key
+    previous_key = (question.correct_answer, question.marks)
     
     if request.method == 'POST':
         form = QuestionForm(request.POST, instance=question)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                form.save()
+                report = None
+                if (question.correct_answer, question.marks) != previous_key:
+                    # Bring already graded attempts in line with the corrected key
+                    report = regrade.regrade(question.quiz, question_ids=[question.id])
             messages.success(request, 'Question updated successfully!')
+            if report and report['score_changes']:
+                messages.info(request, f'Re-graded: {len(report["score_changes"])} student score(s) changed.')
             return redirect('add_questions', quiz_id=question.quiz.id)
         else:
             messages.error(request, 'Please correct the errors below.')
@@ -338,6 +346,9 @@ def toggle_quiz_status(request, quiz_id):
     quiz.is_active = not quiz.is_active
     quiz.save()
     
+    # Load the quiz into the caches before students arrive
+    warming.schedule(quiz)
+    
     status = 'activated' if quiz.is_active else 'deactivated'
     messages.success(request, f'Quiz "{quiz.title}" has been {status} successfully!')
     return redirect('admin_dashboard')
@@ -350,19 +361,51 @@ def delete_quiz(request, quiz_id):
         messages.error(request, 'Access denied')
         return redirect('student_dashboard')
     
-    quiz = get_object_or_404(Quiz, id=quiz_id)
+    quiz = get_object_or_404(Quiz.all_objects, id=quiz_id)
+    
+    # Already hidden; its questions and results are still being removed
+    if quiz.is_deleted:
+        return JsonResponse({'status': 'deleting', 'quiz_id': quiz_id, 'quiz_title': quiz.title,
+                             'progress': deletion.get_progress('quiz', quiz_id)})
     
     if request.method == 'POST':
         quiz_title = quiz.title
-        quiz.delete()
+        if settings.BACKGROUND_DELETION:
+            progress = deletion.delete_quiz(quiz)
+        else:
+            quiz.delete()
+            leaderboard.invalidate(quiz_id)
+            progress = None
         messages.success(request, f'Quiz "{quiz_title}" has been deleted successfully!')
-        return JsonResponse({'status': 'success', 'message': f'Quiz "{quiz_title}" has been deleted successfully!'})
+        return JsonResponse({'status': 'success', 'message': f'Quiz "{quiz_title}" has been deleted successfully!',
+                             'progress': progress})
     
     # For GET requests, return JSON response for AJAX modal
     return JsonResponse({'status': 'confirm', 'quiz_id': quiz_id, 'quiz_title': quiz.title})
 
 
 @login_required
+def regrade_quiz(request, quiz_id):
+    # Allow all users with admin role AND superusers to access admin features
+    if request.user.role != 'admin' and not request.user.is_superuser:
+        messages.error(request, 'Access denied')
+        return redirect('student_dashboard')
+    
+    quiz = get_object_or_404(Quiz, id=quiz_id)
+    question_id = request.GET.get('question_id') or request.POST.get('question_id')
+    question_ids = [int(question_id)] if question_id and question_id.isdigit() else None
+    
+    # GET previews the score changes without saving them, POST applies them
+    report = regrade.regrade(quiz, question_ids=question_ids, dry_run=request.method != 'POST')
+    report['score_changes'] = [
+        {'attempt_id': attempt_id, 'student': username, 'old_score': old_score, 'new_score': new_score}
+        for attempt_id, username, old_score, new_score in report['score_changes']
+    ]
+    return JsonResponse({'status': 'preview' if report['dry_run'] else 'success', 'quiz_title': quiz.title, **report})
+
+
+@login_required
+@read_from_replica
 def view_results(request):
     # Allow all users with admin role AND superusers to access admin features
     if request.user.role != 'admin' and not request.user.is_superuser:
@@ -380,7 +423,7 @@ def view_results(request):
         attempts = QuizAttempt.objects.filter(
             quiz=selected_quiz,
             is_completed=True
-        ).select_related('student').order_by('student__roll_number')
+        ).select_related('student').defer('result_snapshot').order_by('student__roll_number')
     
     context = {
         'quizzes': quizzes,
@@ -392,6 +435,88 @@ def view_results(request):
 
 
 @login_required
+@read_from_replica
+def score_distribution(request, quiz_id):
+    # Allow all users with admin role AND superusers to access admin features
+    if request.user.role != 'admin' and not request.user.is_superuser:
+        return JsonResponse({'status': 'error', 'message': 'Access denied'}, status=403)
+
+    quiz = get_object_or_404(Quiz, id=quiz_id)
+
+    # view_results only draws the percentile bands
+    if request.GET.get('only') == 'percentiles':
+        return JsonResponse(stats.percentile_summary(quiz))
+
+    # Optionally narrow the student list down to a single student
+    student_id = request.GET.get('student_id')
+    if student_id is not None and not student_id.isdigit():
+        return JsonResponse({'status': 'error', 'message': 'Invalid student_id'}, status=400)
+
+    data = stats.score_distribution(quiz, student_id=int(student_id) if student_id else None)
+    return JsonResponse(data)
+
+
+@login_required
+def live_progress(request, quiz_id):
+    # Allow all users with admin role AND superusers to access admin features
+    if request.user.role != 'admin' and not request.user.is_superuser:
+        return JsonResponse({'status': 'error', 'message': 'Access denied'}, status=403)
+    
+    quiz = get_object_or_404(Quiz, id=quiz_id)
+    
+    # Server-sent events; every proctor on this quiz shares one snapshot.
+    # Only ASGI can hold the stream open without tying up a worker, so WSGI
+    # answers with one snapshot and the browser polls (see quiz/live.py)
+    if isinstance(request, ASGIRequest):
+        stream = live.event_stream(quiz.id)
+    else:
+        stream = live.poll_stream(quiz.id)
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required
+def conditional_get_stats(request):
+    # Allow all users with admin role AND superusers to access admin features
+    if request.user.role != 'admin' and not request.user.is_superuser:
+        return JsonResponse({'status': 'error', 'message': 'Access denied'}, status=403)
+    
+    # Counters are per worker process
+    return JsonResponse(ConditionalGetStatsMiddleware.stats())
+
+
+@login_required
+def profiling_stats(request):
+    # Allow all users with admin role AND superusers to access admin features
+    if request.user.role != 'admin' and not request.user.is_superuser:
+        return JsonResponse({'status': 'error', 'message': 'Access denied'}, status=403)
+    
+    # Samples are per worker process
+    return JsonResponse({
+        'enabled': settings.PROFILING_ENABLED,
+        'sample_rate': settings.PROFILING_SAMPLE_RATE,
+        'views': profiling.get_stats(),
+    })
+
+
+def prometheus_metrics(request):
+    # Scraped by Prometheus, so there is no session; the bearer token is
+    # always required and the endpoint stays closed until one is set
+    if not settings.METRICS_TOKEN:
+        return HttpResponse('Set METRICS_TOKEN to enable metrics', status=403, content_type='text/plain')
+    expected = f'Bearer {settings.METRICS_TOKEN}'
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), expected):
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    
+    body, content_type = metrics.render()
+    return HttpResponse(body, content_type=content_type)
+
+
+@login_required
+@read_from_replica
+@conditional_page(conditional.results_export_etag)
 def export_results_excel(request, quiz_id):
     # Allow all users with admin role AND superusers to access admin features
     if request.user.role != 'admin' and not request.user.is_superuser:
@@ -402,135 +527,16 @@ def export_results_excel(request, quiz_id):
     attempts = QuizAttempt.objects.filter(
         quiz=quiz,
         is_completed=True
-    ).select_related('student').order_by('student__roll_number')
-    
-    # Create workbook with enhanced styling
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Quiz Results"
-    
-    # Enhanced styling
-    from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-    
-    # Color palette
-    header_fill = PatternFill(start_color="2563EB", end_color="2563EB", fill_type="solid")  # Blue
-    header_font = Font(bold=True, color="FFFFFF", size=12)
-    alternate_fill1 = PatternFill(start_color="F8FAFC", end_color="F8FAFC", fill_type="solid")  # Light gray
-    alternate_fill2 = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")  # White
-    border = Border(
-        left=Side(style='thin', color='D1D5DB'),
-        right=Side(style='thin', color='D1D5DB'),
-        top=Side(style='thin', color='D1D5DB'),
-        bottom=Side(style='thin', color='D1D5DB')
-    )
-    
-    # Add title with enhanced styling
-    ws.merge_cells('A1:F1')
-    title_cell = ws['A1']
-    title_cell.value = f'Quiz Results: {quiz.title}'
-    title_cell.font = Font(bold=True, size=16, color="1E40AF")
-    title_cell.alignment = Alignment(horizontal='center', vertical='center')
-    title_cell.fill = PatternFill(start_color="DBEAFE", end_color="DBEAFE", fill_type="solid")
-    
-    # Add subtitle with date
-    from datetime import datetime
-    ws.merge_cells('A2:F2')
-    subtitle_cell = ws['A2']
-    subtitle_cell.value = f'Generated on: {datetime.now().strftime("%B %d, %Y at %I:%M %p")}'
-    subtitle_cell.font = Font(italic=True, size=10, color="6B7280")
-    subtitle_cell.alignment = Alignment(horizontal='center', vertical='center')
-    
-    # Add headers with enhanced styling
-    headers = ['S.No', 'Student Name', 'Roll Number', 'Score', 'Total Marks', 'Percentage']
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=4, column=col_num)
-        cell.value = header
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        cell.border = border
-    
-    # Add data with alternating row colors and enhanced styling
-    for idx, attempt in enumerate(attempts, 1):
-        row_num = idx + 4
-        # Alternate row colors
-        row_fill = alternate_fill1 if idx % 2 == 0 else alternate_fill2
-        
-        # S.No
-        cell = ws.cell(row=row_num, column=1, value=idx)
-        cell.fill = row_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = border
-        
-        # Student Name
-        cell = ws.cell(row=row_num, column=2, value=attempt.student.username)
-        cell.fill = row_fill
-        cell.alignment = Alignment(horizontal='left')
-        cell.border = border
-        
-        # Roll Number
-        cell = ws.cell(row=row_num, column=3, value=attempt.student.roll_number or 'N/A')
-        cell.fill = row_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = border
-        
-        # Score
-        cell = ws.cell(row=row_num, column=4, value=attempt.score)
-        cell.fill = row_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = border
-        # Highlight high scores
-        if attempt.percentage() >= 75:
-            cell.font = Font(color="16A34A", bold=True)  # Green for excellent
-        elif attempt.percentage() >= 50:
-            cell.font = Font(color="CA8A04")  # Yellow for good
-        else:
-            cell.font = Font(color="DC2626")  # Red for poor
-        
-        # Total Marks
-        cell = ws.cell(row=row_num, column=5, value=attempt.total_marks)
-        cell.fill = row_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = border
-        
-        # Percentage with color coding
-        cell = ws.cell(row=row_num, column=6, value=f"{attempt.percentage()}%")
-        cell.fill = row_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = border
-        # Color code percentages
-        if attempt.percentage() >= 75:
-            cell.font = Font(color="16A34A", bold=True)  # Green for excellent
-        elif attempt.percentage() >= 50:
-            cell.font = Font(color="CA8A04")  # Yellow for good
-        else:
-            cell.font = Font(color="DC2626")  # Red for poor
-    
-    # Adjust column widths for better readability
-    column_widths = {
-        1: 8,   # S.No
-        2: 25,  # Student Name
-        3: 15,  # Roll Number
-        4: 10,  # Score
-        5: 12,  # Total Marks
-        6: 12   # Percentage
-    }
+    ).select_related('student').defer('result_snapshot').order_by('student__roll_number')
     
-    for col_idx, width in column_widths.items():
-        column_letter = openpyxl.utils.get_column_letter(col_idx)
-        ws.column_dimensions[column_letter].width = width
-    
-    # Create response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = f'attachment; filename="{quiz.title}_results.xlsx"'
-    wb.save(response)
-    
-    return response
+    # Export libraries are only imported when an export is requested
+    from . import exports
+    return exports.results_excel(quiz, attempts)
 
 
 @login_required
+@read_from_replica
+@conditional_page(conditional.results_export_etag)
 def export_results_pdf(request, quiz_id):
     # Allow all users with admin role AND superusers to access admin features
     if request.user.role != 'admin' and not request.user.is_superuser:
@@ -542,164 +548,11 @@ def export_results_pdf(request, quiz_id):
     attempts = QuizAttempt.objects.filter(
         quiz=quiz,
         is_completed=True
-    ).select_related('student').order_by('student__roll_number')
-    
-    # Create PDF with enhanced styling
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=50, bottomMargin=50)
-    elements = []
-    
-    # Enhanced styles
-    from reportlab.lib.styles import ParagraphStyle
-    from reportlab.lib.colors import HexColor
-    from reportlab.platypus import Spacer, Table, TableStyle
-    from reportlab.lib.units import inch
-    
-    # Title style
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        fontSize=24,
-        textColor=HexColor('#1E3A8A'),
-        spaceAfter=25,
-        alignment=1,  # Center
-        fontName='Helvetica-Bold'
-    )
-    
-    # Subtitle style
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        fontSize=14,
-        textColor=HexColor('#4B5563'),
-        spaceAfter=35,
-        alignment=1,  # Center
-        fontName='Helvetica'
-    )
-    
-    # Header style
-    header_style = ParagraphStyle(
-        'Header',
-        fontSize=16,
-        textColor=HexColor('#FFFFFF'),
-        spaceAfter=20,
-        alignment=1,  # Center
-        fontName='Helvetica-Bold'
-    )
-    
-    # Add title and subtitle
-    from datetime import datetime
-    from reportlab.platypus import Paragraph
-    
-    title = Paragraph(f"Quiz Results: {quiz.title}", title_style)
-    subtitle = Paragraph(f"Generated on: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", subtitle_style)
-    
-    elements.append(title)
-    elements.append(subtitle)
-    elements.append(Spacer(1, 30))
-    
-    # Create table data with only roll number, email, and score
-    data = [['S.No', 'Roll Number', 'Email', 'Score']]
-    
-    # Add data rows - show only clean score value
-    for idx, attempt in enumerate(attempts, 1):
-        data.append([
-            str(idx),
-            attempt.student.roll_number or 'N/A',
-            attempt.student.email,
-            str(attempt.score)  # Show only the numeric score value
-        ])
-    
-    # Create table with enhanced styling
-    table = Table(data, colWidths=[0.8*inch, 1.8*inch, 2.5*inch, 1.2*inch])
-    
-    # Table styling with attractive design
-    table_style = TableStyle([
-        # Header styling with gradient-like effect
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#1E40AF')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), HexColor('#FFFFFF')),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 14),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 15),
-        ('TOPPADDING', (0, 0), (-1, 0), 15),
-        
-        # Data rows styling
-        ('ALIGN', (0, 1), (0, -1), 'CENTER'),    # S.No
-        ('ALIGN', (1, 1), (1, -1), 'CENTER'),    # Roll Number
-        ('ALIGN', (2, 1), (2, -1), 'LEFT'),      # Email
-        ('ALIGN', (3, 1), (3, -1), 'CENTER'),    # Score
-        
-        # Font styling
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (2, -1), 12),
-        
-        # Grid and borders with attractive styling
-        ('GRID', (0, 0), (-1, -1), 2, HexColor('#1E40AF')),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        
-        # Alternate row colors for better readability
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [HexColor('#EFF6FF'), HexColor('#FFFFFF')]),
-        
-        # Add some spacing
-        ('TOPPADDING', (0, 1), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 10),
-    ])
-    
-    table.setStyle(table_style)
-    elements.append(table)
-    
-    # Add summary statistics if there are attempts
-    if attempts:
-        elements.append(Spacer(1, 40))
-        
-        # Summary title
-        summary_title = Paragraph("Performance Summary", header_style)
-        elements.append(summary_title)
-        elements.append(Spacer(1, 20))
-        
-        # Calculate statistics
-        total_students = len(attempts)
-        avg_score = sum([attempt.score for attempt in attempts]) / total_students if total_students > 0 else 0
-        avg_percentage = sum([attempt.percentage() for attempt in attempts]) / total_students if total_students > 0 else 0
-        highest_score = max([attempt.score for attempt in attempts]) if attempts else 0
-        lowest_score = min([attempt.score for attempt in attempts]) if attempts else 0
-        
-        # Summary data with attractive styling
-        summary_data = [
-            ['Metric', 'Value'],
-            ['Total Students', str(total_students)],
-            ['Average Score', f"{avg_score:.2f}"],
-            ['Average Percentage', f"{avg_percentage:.2f}%"],
-            ['Highest Score', str(highest_score)],
-            ['Lowest Score', str(lowest_score)]
-        ]
-        
-        # Create summary table
-        summary_table = Table(summary_data, colWidths=[2.5*inch, 2.5*inch])
-        summary_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 2, HexColor('#1E40AF')),
-            ('BACKGROUND', (0, 0), (-1, 0), HexColor('#1E40AF')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), HexColor('#FFFFFF')),
-            ('BACKGROUND', (0, 1), (-1, -1), HexColor('#EFF6FF')),
-            ('TOPPADDING', (0, 0), (-1, -1), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ]))
-        
-        elements.append(summary_table)
+    ).select_related('student').defer('result_snapshot').order_by('student__roll_number')
     
-    # Build PDF
-    doc.build(elements)
-    
-    # Return response
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{quiz.title}_results.pdf"'
-    
-    return response
+    # Export libraries are only imported when an export is requested
+    from . import exports
+    return exports.results_pdf(quiz, attempts)
 
 
 @login_required
@@ -708,17 +561,29 @@ def take_quiz(request, quiz_id):
         messages.error(request, 'Access denied')
         return redirect('admin_dashboard')
     
-    quiz = get_object_or_404(Quiz, id=quiz_id, is_active=True)
+    quiz = exam_cache.get_quiz(quiz_id)
+    if quiz is None or not quiz.is_active:
+        raise Http404('No Quiz matches the given query.')
     
     # Check if student has already attempted this quiz
-    existing_attempt = QuizAttempt.objects.filter(student=request.user, quiz=quiz).first()
+    existing_attempt = QuizAttempt.objects.filter(student=request.user, quiz=quiz).defer('result_snapshot').first()
     if existing_attempt and existing_attempt.is_completed:
         messages.error(request, 'You have already attempted this quiz')
         return redirect('student_dashboard')
     
     # Create or get attempt
     if not existing_attempt:
-        questions = list(Question.objects.filter(quiz=quiz))
+        if admission.is_closed(quiz):
+            messages.error(request, 'This quiz is closed')
+            return redirect('student_dashboard')
+        
+        # Before the start time, or while the exam-start rush is being let in,
+        # wait for an admission slot
+        waiting = admission.admit(request, quiz)
+        if waiting:
+            return waiting
+        
+        questions = list(exam_cache.get_questions(quiz.id, quiz.updated_at))
         total_marks = sum([q.marks for q in questions])
         
         # Shuffle questions for this student's attempt
@@ -734,24 +599,13 @@ def take_quiz(request, quiz_id):
             total_marks=total_marks,
             question_order=question_order
         )
+        metrics.ATTEMPTS_STARTED.inc()
+        live.publish_started(attempt)
     else:
         attempt = existing_attempt
     
-    # Get questions in the correct order
-    if attempt.question_order:
-        # If there's a stored order, use it
-        question_ids = [int(id) for id in attempt.question_order.split(',')]
-        questions = []
-        for qid in question_ids:
-            try:
-                question = Question.objects.get(id=qid)
-                questions.append(question)
-            except Question.DoesNotExist:
-                # If a question was deleted, skip it
-                pass
-    else:
-        # Fallback to default ordering
-        questions = Question.objects.filter(quiz=quiz).order_by('order', 'id')
+    # Get questions in the attempt's stored order (deleted ones are skipped)
+    questions = exam_cache.ordered_questions(attempt, quiz.updated_at)
     
     context = {
         'quiz': quiz,
@@ -762,61 +616,108 @@ def take_quiz(request, quiz_id):
     return render(request, 'quiz/take_quiz.html', context)
 
 
+@login_required
+def waiting_room(request, quiz_id):
+    # The page is the same for every student of a quiz (the slot time is read
+    # from the URL by the page itself), so it is rendered once and cached
+    html = admission.get_waiting_page(quiz_id)
+    if html is None:
+        raise Http404('No Quiz matches the given query.')
+    
+    response = HttpResponse(html)
+    response['Cache-Control'] = f'private, max-age={admission.WAITING_PAGE_TIMEOUT}'
+    return response
+
+
 @login_required
 def submit_quiz(request, attempt_id):
     if request.user.role != 'student':
         messages.error(request, 'Access denied')
         return redirect('admin_dashboard')
     
+    # Checked before the key is claimed, so a 404 never leaves a claim behind
     attempt = get_object_or_404(QuizAttempt, id=attempt_id, student=request.user)
     
+    # A re-sent submission (double click, flaky network) replays the result
+    # of the first one instead of grading again; see quiz/submissions.py
+    submission_key = None
+    if request.method == 'POST':
+        submission_key = submissions.clean_key(request.POST.get('submission_key'))
+    if submission_key and not submissions.claim(attempt_id, submission_key):
+        result = submissions.wait_for_result(attempt_id, submission_key)
+        if result:
+            messages.success(request, f'Quiz submitted successfully! Your score: {result["score"]}/{result["total_marks"]}')
+            return redirect('quiz_result', attempt_id=result['attempt_id'])
+        # The first request failed or is stuck; carry on without the key
+        submission_key = None
+    
     if attempt.is_completed:
+        if submission_key:
+            submissions.release(attempt_id, submission_key)
         messages.error(request, 'This quiz has already been submitted')
         return redirect('student_dashboard')
     
     if request.method == 'POST':
-        # Get questions in the correct order
-        if attempt.question_order:
-            # If there's a stored order, use it
-            question_ids = [int(id) for id in attempt.question_order.split(',')]
-            questions = []
-            for qid in question_ids:
-                try:
-                    question = Question.objects.get(id=qid)
-                    questions.append(question)
-                except Question.DoesNotExist:
-                    # If a question was deleted, skip it
-                    pass
-        else:
-            # Fallback to default ordering
-            questions = Question.objects.filter(quiz=attempt.quiz).order_by('order', 'id')
-        
-        score = 0
+        grading_started = time.perf_counter()
         
-        for question in questions:
-            answer_key = f'question_{question.id}'
-            selected_answer = request.POST.get(answer_key)
+        try:
+            # Get questions in the attempt's stored order (deleted ones are skipped)
+            questions = exam_cache.ordered_questions(attempt)
             
-            # Handle unanswered questions (when selected_answer is None or empty)
-            if not selected_answer:
-                selected_answer = None
+            score = 0
+            answers = []
             
-            is_correct = False
-            if selected_answer and selected_answer == question.correct_answer:
-                is_correct = True
-                score += question.marks
+            for question in questions:
+                answer_key = f'question_{question.id}'
+                selected_answer = request.POST.get(answer_key)
+                
+                # Handle unanswered questions (when selected_answer is None or empty)
+                if not selected_answer:
+                    selected_answer = None
+                
+                is_correct = False
+                if selected_answer and selected_answer == question.correct_answer:
+                    is_correct = True
+                    score += question.marks
+                
+                answers.append(StudentAnswer(
+                    attempt=attempt,
+                    question=question,
+                    selected_answer=selected_answer,
+                    is_correct=is_correct
+                ))
             
-            StudentAnswer.objects.create(
-                attempt=attempt,
-                question=question,
-                selected_answer=selected_answer,
-                is_correct=is_correct
-            )
-        
-        attempt.score = score
-        attempt.is_completed = True
-        attempt.completed_at = timezone.now()
-        attempt.save()
+            attempt.score = score
+            attempt.is_completed = True
+            attempt.completed_at = timezone.now()
+            attempt.result_snapshot = results.build_snapshot(answers)
+            answer_store.apply(attempt, answers)
+            
+            # Write all answers and the score in a single transaction
+            with transaction.atomic():
+                # Only one request can complete the attempt; a concurrent
+                # duplicate finds it completed and writes nothing
+                completed = QuizAttempt.objects.filter(id=attempt.id, is_completed=False).update(is_completed=True)
+                if completed:
+                    if answer_store.store_rows():
+                        StudentAnswer.objects.bulk_create(answers)
+                    attempt.save()
+        except Exception:
+            # Let a retry with the same key grade again
+            if submission_key:
+                submissions.release(attempt_id, submission_key)
+            raise
+        if not completed:
+            if submission_key:
+                submissions.release(attempt_id, submission_key)
+            messages.error(request, 'This quiz has already been submitted')
+            return redirect('student_dashboard')
+        if submission_key:
+            submissions.record_result(attempt_id, submission_key, attempt)
+        leaderboard.record_attempt(attempt)
+        live.publish_submitted(attempt)
+        metrics.SUBMISSIONS_GRADED.inc()
+        metrics.GRADING_SECONDS.observe(time.perf_counter() - grading_started)
         
         messages.success(request, f'Quiz submitted successfully! Your score: {score}/{attempt.total_marks}')
         return redirect('quiz_result', attempt_id=attempt.id)
@@ -825,9 +726,10 @@ def submit_quiz(request, attempt_id):
 
 
 @login_required
+@conditional_page(conditional.quiz_result_etag, conditional.quiz_result_last_modified)
 def quiz_result(request, attempt_id):
     # Allow both students (for their own results) and admins (for viewing student results)
-    attempt = get_object_or_404(QuizAttempt, id=attempt_id)
+    attempt = get_object_or_404(QuizAttempt.objects.select_related('quiz', 'student'), id=attempt_id)
     
     # Check access permissions
     if request.user.role == 'student':
@@ -849,26 +751,51 @@ def quiz_result(request, attempt_id):
         else:
             return redirect('admin_dashboard')
     
-    answers = StudentAnswer.objects.filter(attempt=attempt).select_related('question')
+    # Answers and counts come from the snapshot frozen at grading time
+    snapshot = results.get_snapshot(attempt)
     
-    # Calculate correct, wrong, and unanswered answers
-    correct_count = answers.filter(is_correct=True).count()
-    wrong_count = answers.filter(is_correct=False, selected_answer__isnull=False).count()
-    unanswered_count = answers.filter(selected_answer__isnull=True).count()
-    total_questions = answers.count()
+    # Rank comes from the cached per-quiz leaderboard
+    rank, ranked_count = leaderboard.get_rank(attempt)
     
     context = {
         'attempt': attempt,
-        'answers': answers,
-        'correct_count': correct_count,
-        'wrong_count': wrong_count,
-        'unanswered_count': unanswered_count,
-        'total_questions': total_questions,
+        'answers': snapshot['answers'],
+        'correct_count': snapshot['correct_count'],
+        'wrong_count': snapshot['wrong_count'],
+        'unanswered_count': snapshot['unanswered_count'],
+        'total_questions': snapshot['total_questions'],
+        'rank': rank,
+        'ranked_count': ranked_count,
+        'leaderboard': leaderboard.get_leaderboard(attempt.quiz_id),
     }
     
     return render(request, 'quiz/quiz_result.html', context)
 
 
+@login_required
+def quiz_leaderboard(request, quiz_id):
+    quiz = get_object_or_404(Quiz, id=quiz_id)
+    data = {
+        'quiz_id': quiz.id,
+        'leaderboard': leaderboard.get_leaderboard(quiz.id),
+    }
+    
+    # Students only see the leaderboard once they have completed the quiz
+    if request.user.role == 'student':
+        attempt = QuizAttempt.objects.filter(
+            student=request.user, quiz=quiz, is_completed=True,
+        ).defer('result_snapshot').first()
+        if attempt is None:
+            return JsonResponse({'status': 'error', 'message': 'Complete the quiz to see the leaderboard'}, status=403)
+        rank, ranked_count = leaderboard.get_rank(attempt)
+        data['your_rank'] = rank
+        data['total_ranked'] = ranked_count
+    elif request.user.role != 'admin' and not request.user.is_superuser:
+        return JsonResponse({'status': 'error', 'message': 'Access denied'}, status=403)
+    
+    return JsonResponse(data)
+
+
 @login_required
 def profile_view(request):
     return render(request, 'quiz/profile.html', {'user': request.user})
@@ -898,19 +825,33 @@ def delete_student(request, student_id):
         messages.error(request, 'Access denied')
         return redirect('student_dashboard')
     
-    student = get_object_or_404(User, id=student_id, role='student')
+    student = get_object_or_404(User.all_objects, id=student_id, role='student')
+    
+    # Already hidden; their attempts and answers are still being removed
+    if student.is_deleted:
+        return JsonResponse({'status': 'deleting', 'student_id': student_id, 'student_name': student.username,
+                             'progress': deletion.get_progress('student', student_id)})
     
     if request.method == 'POST':
         student_name = student.username
-        student.delete()
+        if settings.BACKGROUND_DELETION:
+            progress = deletion.delete_student(student)
+        else:
+            attempted_quiz_ids = list(student.quiz_attempts.values_list('quiz_id', flat=True))
+            student.delete()
+            for attempted_quiz_id in attempted_quiz_ids:
+                leaderboard.invalidate(attempted_quiz_id)
+            progress = None
         messages.success(request, f'Student "{student_name}" has been deleted successfully!')
-        return JsonResponse({'status': 'success', 'message': f'Student "{student_name}" has been deleted successfully!'})
+        return JsonResponse({'status': 'success', 'message': f'Student "{student_name}" has been deleted successfully!',
+                             'progress': progress})
     
     # For GET requests, return JSON response for AJAX modal
     return JsonResponse({'status': 'confirm', 'student_id': student_id, 'student_name': student.username})
 
 
 @login_required
+@conditional_page(conditional.student_profile_etag, conditional.student_profile_last_modified)
 def student_profile(request, student_id):
     # Allow all users with admin role AND superusers to access admin features
     if request.user.role != 'admin' and not request.user.is_superuser:
@@ -920,7 +861,9 @@ def student_profile(request, student_id):
     student = get_object_or_404(User, id=student_id, role='student')
     
     # Get student's quiz attempts (both completed and pending ones for the profile view)
-    quiz_attempts = QuizAttempt.objects.filter(student=student).select_related('quiz').order_by('-started_at')
+    quiz_attempts = QuizAttempt.objects.filter(student=student).select_related('quiz').defer(
+        'result_snapshot'
+    ).order_by('-started_at')
     
     context = {
         'student': student,
@@ -931,6 +874,8 @@ def student_profile(request, student_id):
 
 
 @login_required
+@read_from_replica
+@conditional_page(conditional.students_export_etag)
 def export_students_excel(request):
     # Allow all users with admin role AND superusers to access admin features
     if request.user.role != 'admin' and not request.user.is_superuser:
@@ -940,109 +885,14 @@ def export_students_excel(request):
     # Get all students sorted by roll number in ascending order
     students = User.objects.filter(role='student').order_by('roll_number')
     
-    # Create workbook with attractive styling
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Student List"
-    
-    # Modern color palette
-    header_fill = PatternFill(start_color="4361EE", end_color="4361EE", fill_type="solid")  # Modern blue
-    header_font = Font(bold=True, color="FFFFFF", size=12)
-    alternate_fill1 = PatternFill(start_color="F8F9FA", end_color="F8F9FA", fill_type="solid")  # Light gray
-    alternate_fill2 = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")  # White
-    border = Border(
-        left=Side(style='thin', color='DEE2E6'),
-        right=Side(style='thin', color='DEE2E6'),
-        top=Side(style='thin', color='DEE2E6'),
-        bottom=Side(style='thin', color='DEE2E6')
-    )
-    
-    # Add title with attractive styling
-    ws.merge_cells('A1:E1')
-    title_cell = ws['A1']
-    title_cell.value = 'JNTU Quiz Portal - Student List Report'
-    title_cell.font = Font(bold=True, size=18, color="4361EE")
-    title_cell.alignment = Alignment(horizontal='center', vertical='center')
-    title_cell.fill = PatternFill(start_color="F1F3F9", end_color="F1F3F9", fill_type="solid")
-    
-    # Add subtitle with date
-    from datetime import datetime
-    ws.merge_cells('A2:E2')
-    subtitle_cell = ws['A2']
-    subtitle_cell.value = f'Generated on: {datetime.now().strftime("%B %d, %Y at %I:%M %p")}'
-    subtitle_cell.font = Font(italic=True, size=11, color="6C757D")
-    subtitle_cell.alignment = Alignment(horizontal='center', vertical='center')
-    
-    # Add headers with enhanced styling
-    headers = ['No.', 'Roll Number', 'Phone', 'Email', 'Branch']
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=4, column=col_num)
-        cell.value = header
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        cell.border = border
-    
-    # Add data with alternating row colors and enhanced styling
-    for idx, student in enumerate(students, 1):
-        row_num = idx + 4
-        # Alternate row colors
-        row_fill = alternate_fill1 if idx % 2 == 0 else alternate_fill2
-        
-        # No.
-        cell = ws.cell(row=row_num, column=1, value=idx)
-        cell.fill = row_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = border
-        
-        # Roll Number
-        cell = ws.cell(row=row_num, column=2, value=student.roll_number or 'N/A')
-        cell.fill = row_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = border
-        
-        # Phone
-        cell = ws.cell(row=row_num, column=3, value=student.phone)
-        cell.fill = row_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = border
-        
-        # Email
-        cell = ws.cell(row=row_num, column=4, value=student.email)
-        cell.fill = row_fill
-        cell.alignment = Alignment(horizontal='left')
-        cell.border = border
-        
-        # Branch
-        cell = ws.cell(row=row_num, column=5, value=student.branch or 'N/A')
-        cell.fill = row_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = border
-    
-    # Adjust column widths for better readability
-    column_widths = {
-        1: 8,   # No.
-        2: 15,  # Roll Number
-        3: 15,  # Phone
-        4: 25,  # Email
-        5: 20   # Branch
-    }
-    
-    for col_idx, width in column_widths.items():
-        column_letter = openpyxl.utils.get_column_letter(col_idx)
-        ws.column_dimensions[column_letter].width = width
-    
-    # Create response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = 'attachment; filename="student_list.xlsx"'
-    wb.save(response)
-    
-    return response
+    # Export libraries are only imported when an export is requested
+    from . import exports
+    return exports.students_excel(students)
 
 
 @login_required
+@read_from_replica
+@conditional_page(conditional.students_export_etag)
 def export_students_pdf(request):
     # Allow all users with admin role AND superusers to access admin features
     if request.user.role != 'admin' and not request.user.is_superuser:
@@ -1052,124 +902,14 @@ def export_students_pdf(request):
     # Get all students sorted by roll number in ascending order
     students = User.objects.filter(role='student').order_by('roll_number')
     
-    # Create PDF with enhanced styling
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=50, bottomMargin=50)
-    elements = []
-    
-    # Enhanced styles
-    from reportlab.lib.styles import ParagraphStyle
-    from reportlab.lib.colors import HexColor
-    from reportlab.platypus import Spacer, Table, TableStyle
-    from reportlab.lib.units import inch
-    
-    # Title style
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        fontSize=24,
-        textColor=HexColor('#1E3A8A'),
-        spaceAfter=25,
-        alignment=1,  # Center
-        fontName='Helvetica-Bold'
-    )
-    
-    # Subtitle style
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        fontSize=14,
-        textColor=HexColor('#4B5563'),
-        spaceAfter=35,
-        alignment=1,  # Center
-        fontName='Helvetica'
-    )
-    
-    # Header style
-    header_style = ParagraphStyle(
-        'Header',
-        fontSize=16,
-        textColor=HexColor('#FFFFFF'),
-        spaceAfter=20,
-        alignment=1,  # Center
-        fontName='Helvetica-Bold'
-    )
-    
-    # Add title and subtitle
-    from datetime import datetime
-    from reportlab.platypus import Paragraph
-    
-    title = Paragraph("JNTU Quiz Portal - Student List Report", title_style)
-    subtitle = Paragraph(f"Generated on: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", subtitle_style)
-    
-    elements.append(title)
-    elements.append(subtitle)
-    elements.append(Spacer(1, 30))
-    
-    # Create table data
-    data = [['No.', 'Roll Number', 'Phone', 'Email', 'Branch']]
-    
-    # Add data rows
-    for idx, student in enumerate(students, 1):
-        data.append([
-            str(idx),
-            student.roll_number or 'N/A',
-            student.phone,
-            student.email,
-            student.branch or 'N/A'
-        ])
-    
-    # Create table with enhanced styling
-    table = Table(data, colWidths=[0.5*inch, 1.2*inch, 1.2*inch, 2.1*inch, 1.6*inch])
-    
-    # Table styling with attractive design
-    table_style = TableStyle([
-        # Header styling with gradient-like effect
-        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#1E40AF')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), HexColor('#FFFFFF')),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('TOPPADDING', (0, 0), (-1, 0), 12),
-        
-        # Data rows styling
-        ('ALIGN', (0, 1), (0, -1), 'CENTER'),    # No.
-        ('ALIGN', (1, 1), (1, -1), 'CENTER'),    # Roll Number
-        ('ALIGN', (2, 1), (2, -1), 'CENTER'),    # Phone
-        ('ALIGN', (3, 1), (3, -1), 'LEFT'),      # Email
-        ('ALIGN', (4, 1), (4, -1), 'CENTER'),    # Branch
-        ('FONTSIZE', (4, 1), (4, -1), 11),       # Slightly larger font for Branch
-        
-        # Font styling
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (4, -1), 10),
-        
-        # Grid and borders with attractive styling
-        ('GRID', (0, 0), (-1, -1), 2, HexColor('#1E40AF')),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        
-        # Alternate row colors for better readability
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [HexColor('#EFF6FF'), HexColor('#FFFFFF')]),
-        
-        # Add some spacing
-        ('TOPPADDING', (0, 1), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 10),
-    ])
-    
-    table.setStyle(table_style)
-    elements.append(table)
-    
-    # Build PDF
-    doc.build(elements)
-    
-    # Return response
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="student_list.pdf"'
-    
-    return response
+    # Export libraries are only imported when an export is requested
+    from . import exports
+    return exports.students_pdf(students)
 
 
 @login_required
+@read_from_replica
+@conditional_page(conditional.questions_export_etag)
 def export_questions_pdf(request, quiz_id):
     # Allow all users with admin role AND superusers to access admin features
     if request.user.role != 'admin' and not request.user.is_superuser:
@@ -1179,112 +919,14 @@ def export_questions_pdf(request, quiz_id):
     quiz = get_object_or_404(Quiz, id=quiz_id)
     questions = Question.objects.filter(quiz=quiz).order_by('order', 'id')
     
-    # Create PDF
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=50, bottomMargin=50)
-    elements = []
-    
-    # Enhanced styles
-    from reportlab.lib.styles import ParagraphStyle
-    from reportlab.lib.colors import HexColor
-    from reportlab.platypus import Spacer, Table, TableStyle
-    from reportlab.lib.units import inch
-    
-    # Title style
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        fontSize=24,
-        textColor=HexColor('#1E3A8A'),
-        spaceAfter=25,
-        alignment=1,  # Center
-        fontName='Helvetica-Bold'
-    )
-    
-    # Subtitle style
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        fontSize=14,
-        textColor=HexColor('#4B5563'),
-        spaceAfter=35,
-        alignment=1,  # Center
-        fontName='Helvetica'
-    )
-    
-    # Question style
-    question_style = ParagraphStyle(
-        'Question',
-        fontSize=12,
-        textColor=HexColor('#000000'),
-        spaceAfter=15,
-        fontName='Helvetica-Bold'
-    )
-    
-    # Option style
-    option_style = ParagraphStyle(
-        'Option',
-        fontSize=11,
-        textColor=HexColor('#374151'),
-        leftIndent=20,
-        spaceAfter=8,
-        fontName='Helvetica'
-    )
-    
-    # Answer style
-    answer_style = ParagraphStyle(
-        'Answer',
-        fontSize=11,
-        textColor=HexColor('#059669'),
-        spaceAfter=20,
-        fontName='Helvetica-Bold'
-    )
-    
-    # Add title and subtitle
-    from datetime import datetime
-    from reportlab.platypus import Paragraph
-    
-    title = Paragraph(f"Quiz Questions: {quiz.title}", title_style)
-    subtitle = Paragraph(f"Generated on: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", subtitle_style)
-    
-    elements.append(title)
-    elements.append(subtitle)
-    elements.append(Spacer(1, 30))
-    
-    # Add questions
-    for idx, question in enumerate(questions, 1):
-        # Question text
-        question_text = Paragraph(f"<b>Q{idx}:</b> {question.question_text}", question_style)
-        elements.append(question_text)
-        elements.append(Spacer(1, 10))
-        
-        # Options
-        option_a = Paragraph(f"<b>A.</b> {question.option_a}", option_style)
-        option_b = Paragraph(f"<b>B.</b> {question.option_b}", option_style)
-        option_c = Paragraph(f"<b>C.</b> {question.option_c}", option_style)
-        option_d = Paragraph(f"<b>D.</b> {question.option_d}", option_style)
-        
-        elements.append(option_a)
-        elements.append(option_b)
-        elements.append(option_c)
-        elements.append(option_d)
-        elements.append(Spacer(1, 10))
-        
-        # Correct answer
-        correct_answer = Paragraph(f"<b>Correct Answer:</b> Option {question.correct_answer}", answer_style)
-        elements.append(correct_answer)
-        elements.append(Spacer(1, 20))
-    
-    # Build PDF
-    doc.build(elements)
-    
-    # Return response
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{quiz.title}_questions.pdf"'
-    
-    return response
+    # Export libraries are only imported when an export is requested
+    from . import exports
+    return exports.questions_pdf(quiz, questions)
 
 
 @login_required
+@read_from_replica
+@conditional_page(conditional.questions_export_etag)
 def export_questions_docx(request, quiz_id):
     # Allow all users with admin role AND superusers to access admin features
     if request.user.role != 'admin' and not request.user.is_superuser:
@@ -1294,45 +936,6 @@ def export_questions_docx(request, quiz_id):
     quiz = get_object_or_404(Quiz, id=quiz_id)
     questions = Question.objects.filter(quiz=quiz).order_by('order', 'id')
     
-    # Create DOCX document
-    document = Document()
-    
-    # Add title
-    title = document.add_heading(f'Quiz Questions: {quiz.title}', 0)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    # Add subtitle with date
-    from datetime import datetime
-    subtitle = document.add_paragraph(f'Generated on: {datetime.now().strftime("%B %d, %Y at %I:%M %p")}')
-    subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    # Add a line break
-    document.add_paragraph()
-    
-    # Add questions
-    for idx, question in enumerate(questions, 1):
-        # Question text
-        document.add_paragraph(f'Q{idx}: {question.question_text}', style='Heading 2')
-        
-        # Options
-        document.add_paragraph(f'A. {question.option_a}', style='Normal')
-        document.add_paragraph(f'B. {question.option_b}', style='Normal')
-        document.add_paragraph(f'C. {question.option_c}', style='Normal')
-        document.add_paragraph(f'D. {question.option_d}', style='Normal')
-        
-        # Correct answer
-        document.add_paragraph(f'Correct Answer: Option {question.correct_answer}', style='Normal')
-        
-        # Add spacing between questions
-        document.add_paragraph()
-    
-    # Save document to BytesIO buffer
-    buffer = BytesIO()
-    document.save(buffer)
-    buffer.seek(0)
-    
-    # Return response
-    response = HttpResponse(buffer.getvalue(), content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
-    response['Content-Disposition'] = f'attachment; filename="{quiz.title}_questions.docx"'
-    
-    return response
+    # Export libraries are only imported when an export is requested
+    from . import exports
+    return exports.questions_docx(quiz, questions)
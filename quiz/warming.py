@@ -0,0 +1,131 @@
+"""
+Cache warming ahead of an exam.
+
+warm_quiz() loads everything the first minute of an exam reads, so the first
+students don't all miss at once: the quiz and its questions (with the answer
+key) into the exam cache, the leaderboard, and the rendered waiting room. It
+also compiles the exam templates into the cached template loader and opens a
+connection to each database, which checks it is reachable and pulls the
+quiz's rows into its page cache.
+
+Cache entries are shared with the web workers only when the cache is
+(Redis, Memcached, database); compiled templates are per process. That is
+why activating a quiz warms it inside the worker that served the request,
+and why a scheduled start is warmed again QUIZ_WARMING_LEAD seconds before it.
+The warm_quiz command does the same from cron or a deploy script.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import Quiz
+from . import admission
+from . import exam_cache
+from . import leaderboard
+
+logger = logging.getLogger(__name__)
+
+EXAM_TEMPLATES = [
+    'quiz/student_dashboard.html',
+    'quiz/take_quiz.html',
+    'quiz/quiz_result.html',
+    'quiz/waiting_room.html',
+]
+
+_timers_lock = threading.Lock()
+_timers = {}
+
+
+def warm_quiz(quiz_id):
+    """Warm one quiz; returns a report of each step as (name, detail, seconds)"""
+    started = time.perf_counter()
+    steps = []
+
+    def step(name, warm):
+        step_started = time.perf_counter()
+        detail = warm()
+        steps.append((name, detail, round(time.perf_counter() - step_started, 4)))
+
+    def open_connections():
+        for connection in connections.all():
+            connection.ensure_connection()
+        return f'{len(connections.all())} database(s)'
+
+    def templates():
+        for name in EXAM_TEMPLATES:
+            get_template(name)
+        return f'{len(EXAM_TEMPLATES)} templates'
+
+    step('connections', open_connections)
+    step('quiz', lambda: exam_cache.refresh_quiz(quiz_id))
+    quiz = steps[-1][1]
+    if quiz is None:
+        return {'quiz_id': quiz_id, 'found': False, 'steps': steps, 'total_seconds': 0}
+    steps[-1] = ('quiz', 'active' if quiz.is_active else 'inactive', steps[-1][2])
+    step('questions', lambda: f'{len(exam_cache.refresh_questions(quiz_id))} questions and answer key')
+    step('leaderboard', lambda: f'{len(leaderboard.get_entries(quiz_id))} entries')
+    if quiz.is_active:
+        step('waiting room', lambda: f'{len(admission.render_waiting_page(quiz))} bytes')
+    step('templates', templates)
+
+    return {
+        'quiz_id': quiz_id,
+        'found': True,
+        'title': quiz.title,
+        'steps': steps,
+        'total_seconds': round(time.perf_counter() - started, 4),
+    }
+
+
+def _warm_in_thread(quiz_id):
+    try:
+        report = warm_quiz(quiz_id)
+        logger.info('Warmed quiz %s in %.3fs', quiz_id, report['total_seconds'])
+    except Exception:
+        logger.exception('Warming quiz %s failed', quiz_id)
+    finally:
+        with _timers_lock:
+            if _timers.get(quiz_id) is threading.current_thread():
+                del _timers[quiz_id]
+        for connection in connections.all(initialized_only=True):
+            connection.close()
+
+
+def schedule(quiz):
+    """
+    Warm an activated quiz in the background now, or QUIZ_WARMING_LEAD seconds
+    before its start_time if that is further away.
+    """
+    if not getattr(settings, 'QUIZ_WARMING', True) or not quiz.is_active:
+        return
+    delay = 0
+    if quiz.start_time is not None:
+        delay = max(0, (quiz.start_time - timezone.now()).total_seconds() - settings.QUIZ_WARMING_LEAD)
+
+    def start():
+        timer = threading.Timer(delay, _warm_in_thread, args=(quiz.id,))
+        timer.daemon = True
+        with _timers_lock:
+            # Rescheduling replaces the pending warm-up
+            previous = _timers.pop(quiz.id, None)
+            if previous is not None:
+                previous.cancel()
+            _timers[quiz.id] = timer
+        timer.start()
+
+    # The warm-up reads what the request is about to commit
+    transaction.on_commit(start)
+
+
+def upcoming_quiz_ids(minutes):
+    """Active quizzes whose start_time falls within the next `minutes`"""
+    now = timezone.now()
+    return list(Quiz.objects.filter(
+        is_active=True, start_time__gte=now, start_time__lte=now + timedelta(minutes=minutes),
+    ).values_list('id', flat=True))
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import dj_database_url
 import os
+import tempfile
 from pathlib import Path
 from decouple import config
 
@@ -72,15 +73,51 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'quiz.middleware.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'quiz.middleware.CompressionMiddleware',
+    'quiz.middleware.RateLimitMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'quiz.middleware.ReplicaStickinessMiddleware',
+    'quiz.middleware.ConditionalGetStatsMiddleware',
 ]
 
+# Compress HTML/JSON responses of at least COMPRESSION_MIN_SIZE bytes
+# (CompressionMiddleware); brotli is used if the package is installed.
+# PayloadBudgetTests (quiz/tests.py) fail when a page is larger than
+# PAYLOAD_BUDGET bytes as sent, i.e. after compression
+COMPRESSION_ENABLED = config('COMPRESSION_ENABLED', default=True, cast=bool)
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)  # bytes
+PAYLOAD_BUDGET = config('PAYLOAD_BUDGET', default=50 * 1024, cast=int)  # bytes
+
+# Sampled request profiling (RequestProfilingMiddleware); results at /profiling-stats/
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.01, cast=float)  # fraction of requests
+
+# Prometheus scrapes /metrics with "Authorization: Bearer <token>"; /metrics
+# answers 403 until a token is set
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Login and registration rate limits, as "tokens/seconds" (quiz/ratelimit.py)
+RATE_LIMIT_ENABLED = config('RATE_LIMIT_ENABLED', default=True, cast=bool)
+RATE_LIMITS = {
+    'login_ip': config('LOGIN_IP_RATE', default='20/60'),  # login POSTs per client IP
+    'login_failures': config('LOGIN_FAILURE_RATE', default='10/900'),  # failed logins per username
+    'register_ip': config('REGISTER_IP_RATE', default='5/60'),  # registration POSTs per client IP
+}
+# Only enable behind a proxy that sets X-Forwarded-For (e.g. Render)
+RATE_LIMIT_TRUST_X_FORWARDED_FOR = config('RATE_LIMIT_TRUST_X_FORWARDED_FOR', default=False, cast=bool)
+
+# Login captcha: "signed" keeps the challenge in a signed form token so the
+# login page writes no session; "session" stores it in the session
+CAPTCHA_MODE = config('CAPTCHA_MODE', default='signed')
+CAPTCHA_MAX_AGE = config('CAPTCHA_MAX_AGE', default=600, cast=int)  # seconds
+
 ROOT_URLCONF = 'quiz_project.urls'
 
 TEMPLATES = [
@@ -99,6 +136,12 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'quiz_project.wsgi.application'
+ASGI_APPLICATION = 'quiz_project.asgi.application'
+
+# Serve the student exam views (dashboard, take, submit, result) as async views.
+# Enable when running under an ASGI server, e.g.
+#   uvicorn quiz_project.asgi:application --workers 4
+ASYNC_STUDENT_VIEWS = config('ASYNC_STUDENT_VIEWS', default=False, cast=bool)
 
 
 # Email Configuration for OTP
@@ -129,7 +172,6 @@ if database_url:
     else:
         db_config = dj_database_url.config(
             default=database_url,
-            conn_max_age=600,
             ssl_require=True
         )
 else:
@@ -155,12 +197,84 @@ else:
         db_config = {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Tests use a temporary file rather than an in-memory database, so
+            # concurrent requests in tests meet real SQLite file locking
+            'TEST': {'NAME': Path(tempfile.gettempdir()) / 'quiz_test_db.sqlite3'},
         }
 
+# SQLite tuning for campuses running on the db.sqlite3 fallback. The PRAGMAs
+# (WAL, synchronous, mmap and cache size) are applied on connection creation
+# in quiz/signals.py.
+SQLITE_TUNING = config('SQLITE_TUNING', default=True, cast=bool)
+SQLITE_BUSY_TIMEOUT = config('SQLITE_BUSY_TIMEOUT', default=20, cast=int)  # seconds
+SQLITE_MMAP_SIZE = config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int)  # bytes
+SQLITE_CACHE_SIZE = config('SQLITE_CACHE_SIZE', default=-64000, cast=int)  # negative = KiB
+
+if SQLITE_TUNING and db_config['ENGINE'] == 'django.db.backends.sqlite3':
+    db_config.setdefault('OPTIONS', {})['timeout'] = SQLITE_BUSY_TIMEOUT
+    # Take the write lock when the transaction starts instead of failing
+    # with "database is locked" when a reader tries to upgrade mid-way
+    db_config['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+
 DATABASES = {
     'default': db_config
 }
 
+# Optional read replica for reporting pages and exports
+# e.g. DATABASE_REPLICA_URL=sqlite:///replica.sqlite3 for local testing
+database_replica_url = os.getenv('DATABASE_REPLICA_URL')
+if database_replica_url:
+    DATABASES['replica'] = dj_database_url.parse(database_replica_url)
+    # Tests run against the primary only
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+# Connection reuse, applied to every PostgreSQL alias whichever way it was configured
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+DB_CONN_HEALTH_CHECKS = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+
+# Server-side connection pool (psycopg 3 only: pip install "psycopg[pool]")
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+DB_POOL_MIN_SIZE = config('DB_POOL_MIN_SIZE', default=2, cast=int)
+DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=10, cast=int)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=10, cast=int)
+
+for alias_config in DATABASES.values():
+    if alias_config['ENGINE'] != 'django.db.backends.postgresql':
+        continue
+    if DB_POOL:
+        # The pool hands connections back at the end of each request, so
+        # Django's own persistent connections must be switched off
+        alias_config['CONN_MAX_AGE'] = 0
+        alias_config.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+        }
+    else:
+        alias_config['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+        alias_config['CONN_HEALTH_CHECKS'] = DB_CONN_HEALTH_CHECKS
+
+DATABASE_ROUTERS = ['quiz.routers.ReplicaRouter']
+
+# Seconds a user's reads stay on the primary after they write
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+
+# Housekeeping (quiz/maintenance.py): run with "manage.py run_maintenance",
+# or every MAINTENANCE_INTERVAL seconds in a background thread (0 = off)
+MAINTENANCE_INTERVAL = config('MAINTENANCE_INTERVAL', default=0, cast=int)
+MAINTENANCE_BATCH_SIZE = config('MAINTENANCE_BATCH_SIZE', default=1000, cast=int)
+# Minutes past the quiz time limit before an unsubmitted attempt is deleted
+MAINTENANCE_STALE_ATTEMPT_GRACE = config('MAINTENANCE_STALE_ATTEMPT_GRACE', default=1440, cast=int)
+
+# delete_quiz / delete_student hide the object at once and remove its
+# dependents in a background thread (quiz/deletion.py)
+BACKGROUND_DELETION = config('BACKGROUND_DELETION', default=True, cast=bool)
+DELETION_BATCH_SIZE = config('DELETION_BATCH_SIZE', default=2000, cast=int)  # rows per DELETE
+
+# "rows" writes a StudentAnswer row per question as well as the packed answer
+# vector on the attempt; "packed" writes only the vector (quiz/answer_store.py)
+ANSWER_STORAGE = config('ANSWER_STORAGE', default='rows')
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -205,6 +319,17 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Custom User Model
 AUTH_USER_MODEL = 'quiz.User'
 
+# Load request.user from the cache instead of the database (quiz/backends.py).
+# Only for a shared cache (Redis, Memcached): with the local-memory cache a
+# deactivated user would stay signed in on other workers, so the backend
+# then reads the database anyway. Sessions remember their backend, so
+# switching this signs everyone out once
+USER_CACHE = config('USER_CACHE', default=False, cast=bool)
+USER_CACHE_TIMEOUT = config('USER_CACHE_TIMEOUT', default=900, cast=int)  # seconds
+AUTHENTICATION_BACKENDS = [
+    'quiz.backends.CachedModelBackend' if USER_CACHE else 'django.contrib.auth.backends.ModelBackend',
+]
+
 # Login URLs
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
@@ -213,4 +338,32 @@ LOGOUT_REDIRECT_URL = 'login'
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+# Logging
+# Profiling samples are written as one JSON object per line
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        'quiz': {'handlers': ['console'], 'level': config('QUIZ_LOG_LEVEL', default='INFO')},
+    },
+}
+
+# Exam-start admission control: new attempts are let in at most
+# ADMISSION_RATE per second per quiz; the rest wait on a countdown page for
+# their slot (quiz/admission.py). Slots are shared between workers only with
+# a shared cache.
+ADMISSION_CONTROL = config('ADMISSION_CONTROL', default=True, cast=bool)
+ADMISSION_RATE = config('ADMISSION_RATE', default=20, cast=int)  # new attempts per second per quiz
+ADMISSION_TICKET_MAX_AGE = config('ADMISSION_TICKET_MAX_AGE', default=3600, cast=int)  # seconds
+
+# Warm a quiz's caches when it is activated, and again QUIZ_WARMING_LEAD
+# seconds before a scheduled start (quiz/warming.py)
+QUIZ_WARMING = config('QUIZ_WARMING', default=True, cast=bool)
+QUIZ_WARMING_LEAD = config('QUIZ_WARMING_LEAD', default=120, cast=int)  # seconds